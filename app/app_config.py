@@ -50,11 +50,86 @@ class AppConfig:
     FONT_NOTE = ("Roboto Italic", 11)
 
     # Scheduler
-    SCHEDULER_CHECK_INTERVAL = 30  # seconds
+    SCHEDULER_MAX_SLEEP = 300  # seconds; the engine re-checks the clock at least this often
+    SCHEDULER_DEFAULT_JITTER = 60  # max seconds a cron job is shifted by (stable per server and job)
+    RESTART_DEFER_WINDOW = 60      # minutes before a deferrable restart it may happen once the server is empty
+    RESTART_DEFER_DEADLINE = 60    # minutes after its time a deferred restart is forced despite players
+    RESTART_EMPTY_SETTLE = 60      # seconds a server must stay empty (rejoins after a relog don't count)
     DEFAULT_RESTART_TIME = "03:00"
     DEFAULT_INTERVAL_HOURS = 6
 
     # Timeouts
     SERVER_STOP_TIMEOUT = 30
+    STOP_STALL_TIMEOUT = 15        # silent seconds during shutdown before escalating
+    STOP_SAVE_STALL_TIMEOUT = 60   # same, once the server has reported save progress
+    STOP_HARD_TIMEOUT = 600        # escalate regardless after this long
     SERVER_START_WAIT = 10
     RESTART_COOLDOWN = 5
+
+    # Multi-server supervisor
+    SUPERVISOR_STAGGER_SECONDS = 15  # minimum gap between two server launches
+    SUPERVISOR_BOOT_TIMEOUT = 180    # max wait for a booting server before launching the next
+    CONSOLE_BUFFER_LINES = 2000      # console lines kept per server
+
+    # Fleet orchestration of scheduled restarts/backups
+    FLEET_MAX_CONCURRENT = 1        # servers allowed in a restart or backup phase at once
+    FLEET_DEADLINE = 900            # seconds a queued phase may wait before it goes ahead of all others
+    FLEET_HISTORY_SIZE = 100        # finished phases kept for reporting
+
+    # A/B benchmark harness
+    BENCHMARK_FORCELOAD_RADIUS = 256  # blocks around spawn force-loaded as the workload
+    BENCHMARK_LOAD_SECONDS = 60       # how long the chunks are held while MSPT is sampled
+    BENCHMARK_SAMPLE_INTERVAL = 5     # seconds between two MSPT readings
+
+    # Chunk pre-generation
+    PREGEN_TILE_CHUNKS = 8          # side of one force-loaded square, in chunks (vanilla allows 256 per command)
+    PREGEN_MAX_BATCH = 4            # squares loaded at once when the server keeps up
+    PREGEN_TARGET_MSPT = 40         # ms per tick above which the rate is halved (50 = lagging)
+    PREGEN_MIN_DWELL = 2            # seconds a batch stays loaded before MSPT is checked
+    PREGEN_SETTLE_TIMEOUT = 30      # max seconds a batch is held while MSPT stays above target
+    PREGEN_SAMPLE_INTERVAL = 1      # seconds between MSPT readings while settling
+    PREGEN_SAMPLE_TIMEOUT = 5       # seconds to wait for a "tick query" / "execute if loaded" reply
+    PREGEN_LOAD_RETRIES = 3         # retries of a batch not confirmed loaded before it is skipped
+    PREGEN_BACKOFF_DELAY = 5        # first pause after lag, doubled while it persists...
+    PREGEN_MAX_DELAY = 60           # ...up to this many seconds
+    PREGEN_DEFAULT_RADIUS = 1000    # blocks
+
+    # World analyzer
+    WORLD_ANALYZER_BATCH = 256           # region files per worker task
+    WORLD_ANALYZER_POOL_MIN_FILES = 512  # smaller worlds are read without a process pool
+    WORLD_HEATMAP_WIDTH = 64             # max heatmap columns; larger worlds merge regions per cell
+    WORLD_CHUNK_MAPS = 3                 # largest regions shown chunk by chunk in the report
+
+    # Event bus
+    EVENT_QUEUE_SIZE = 256          # default bound of a queued listener
+
+    # Console command dispatcher
+    COMMAND_BATCH_WINDOW = 0.02     # seconds a burst may accumulate before one write+flush
+    COMMAND_BATCH_SIZE = 32         # max commands per write
+    COMMAND_REPLY_TIMEOUT = 30      # seconds to wait for a command's confirming output line
+
+    # Crash supervision
+    CRASH_RESTART_BASE_DELAY = 5    # seconds before the first restart, doubled per failure
+    CRASH_RESTART_MAX_DELAY = 300
+    CRASH_MAX_FAILURES = 3          # give up after this many crashes...
+    CRASH_FAILURE_WINDOW = 900      # ...within this many seconds
+
+    # Config persistence
+    CONFIG_SAVE_DELAY = 0.5         # seconds a burst of config saves is coalesced into one write
+    METADATA_SAVE_DELAY = 1.0       # same for each server's metadata.json
+
+    # Tunnel health
+    TUNNEL_HEALTH_INTERVAL = 60     # seconds between probes of the public address
+    TUNNEL_HEALTH_TIMEOUT = 10      # connect/read timeout of one probe
+    TUNNEL_HEALTH_WINDOW = 30       # probes kept for rolling statistics
+    TUNNEL_HEALTH_FAILURES = 3      # consecutive failed probes before the agent is restarted
+    TUNNEL_RESTART_BASE_DELAY = 10  # seconds, doubled per restart without a successful probe
+    TUNNEL_RESTART_MAX_DELAY = 600
+
+    # Server List Ping status polling
+    STATUS_POLL_INTERVAL = 10       # seconds between polls of each known server
+    STATUS_POLL_WORKERS = 4         # concurrent pings across all servers
+    STATUS_POLL_TIMEOUT = 3         # connect/read timeout of one ping
+
+    # Boot metrics
+    BOOT_HISTORY_LIMIT = 20  # start-to-READY records kept per server
@@ -0,0 +1,342 @@
+import collections
+import os
+import shutil
+import socket
+import statistics
+import threading
+import time
+
+import psutil
+
+import app.jvm_profiles as jvm_profiles
+import app.logic as logic
+from app.app_config import AppConfig
+from app.command_dispatcher import MSPT_PATTERN
+from app.constants import SERVERS_DIR
+from app.server_events import ServerEvent
+from app.server_metadata import get_server_metadata
+from app.server_properties import get_server_properties
+from app.world_analyzer import get_world_dir, world_spawn
+
+# Copies live next to the real servers; dot-folders are not listed as servers
+BENCHMARK_PREFIX = ".benchmark-"
+COPY_IGNORE = shutil.ignore_patterns("logs", "crash-reports", "session.lock")
+
+FORCELOAD_REPLY = r"force loaded|Too many chunks|No chunks"
+# Vanilla refuses to forceload more than 256 chunks per command: 16x16 chunk tiles
+TILE_BLOCKS = 256
+
+# label: shown in the report; properties: server.properties overrides;
+# jvm_profile / ram_mb: None keeps the server's own setting
+BenchmarkConfig = collections.namedtuple("BenchmarkConfig", "label properties jvm_profile ram_mb")
+
+BenchmarkResult = collections.namedtuple(
+    "BenchmarkResult", "label boot_seconds mspt_avg mspt_max peak_rss_mb save_seconds error"
+)
+
+# (field, title, unit) of the compared metrics; lower is better for all of them
+METRICS = [
+    ("boot_seconds", "Boot time", "s"),
+    ("mspt_avg", "MSPT (avg)", "ms"),
+    ("mspt_max", "MSPT (worst sample)", "ms"),
+    ("peak_rss_mb", "Peak RSS", "MB"),
+    ("save_seconds", "World save", "s"),
+]
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _forceload_tiles(radius, center=(0, 0)):
+    """
+    Block-coordinate squares (x1, z1, x2, z2) covering radius blocks around center.
+    Squares start on chunk borders so none spans more than 16x16 chunks.
+    """
+    x_start, z_start = (center[0] - radius) // 16 * 16, (center[1] - radius) // 16 * 16
+    x_end, z_end = center[0] + radius, center[1] + radius
+    tiles = []
+    for x in range(x_start, x_end, TILE_BLOCKS):
+        for z in range(z_start, z_end, TILE_BLOCKS):
+            tiles.append((x, z, min(x + TILE_BLOCKS, x_end) - 1, min(z + TILE_BLOCKS, z_end) - 1))
+    return tiles
+
+
+class _RssSampler:
+    """Tracks the peak resident memory of a process from a background thread."""
+
+    def __init__(self, pid, interval=0.5):
+        self.peak = 0
+        self._stop = threading.Event()
+        try:
+            self._process = psutil.Process(pid)
+        except psutil.Error:
+            self._process = None
+        threading.Thread(target=self._loop, args=(interval,), daemon=True).start()
+
+    def _loop(self, interval):
+        while self._process and not self._stop.wait(interval):
+            try:
+                self.peak = max(self.peak, self._process.memory_info().rss)
+            except psutil.Error:
+                return
+
+    def stop(self):
+        self._stop.set()
+        return round(self.peak / (1024 * 1024)) if self.peak else None
+
+
+def _copy_world(server_name, copy_path, runner):
+    """
+    Copies the server folder. A running server is flushed first and keeps autosave
+    off while the files are copied, so the copy isn't a half-written world.
+    """
+    live = runner is not None and runner.running
+    if live:
+        runner.send_command("save-off")
+        handle = runner.send_command("save-all flush")
+        if not (handle and handle.wait(AppConfig.STOP_SAVE_STALL_TIMEOUT) and handle.error is None):
+            runner.send_command("save-on")
+            raise RuntimeError("The running server did not confirm saving its world; not copying it.")
+    try:
+        shutil.copytree(os.path.join(SERVERS_DIR, server_name), copy_path, ignore=COPY_IGNORE)
+    finally:
+        if live:
+            runner.send_command("save-on")
+
+
+def prepare_copy(server_name, config, runner=None, copy_name=None):
+    """
+    Copies a server (world included) to a benchmark folder and applies a config.
+    The copy gets a free port and no RCON/query listener, so it can't clash with
+    running servers.
+
+    Args:
+        runner (ServerRunner): The server's runner if it may be running (its world is flushed first).
+        copy_name (str): Folder name of the copy (default: BENCHMARK_PREFIX + server_name).
+
+    Returns:
+        str: Server name of the copy.
+    """
+    copy_name = copy_name or f"{BENCHMARK_PREFIX}{server_name}"
+    copy_path = os.path.join(SERVERS_DIR, copy_name)
+    shutil.rmtree(copy_path, ignore_errors=True)
+    _copy_world(server_name, copy_path, runner)
+
+    props = dict(config.properties)
+    props.update({"server-port": _free_port(), "enable-rcon": False, "enable-query": False})
+    get_server_properties(copy_name).update(props)
+
+    updates = {"crash_restart": False, "pending_settings": {}}
+    if config.jvm_profile:
+        updates["jvm_profile"] = config.jvm_profile
+    if config.ram_mb:
+        updates["ram"] = int(config.ram_mb)
+    get_server_metadata(copy_name).update(updates, immediate=True)
+    return copy_name
+
+
+def run_config(server_name, config, console_callback, get_runner=None, radius=None, load_seconds=None):
+    """
+    Boots a copy of the server under one config, loads the world around its spawn
+    and measures it. Blocks until the copy is stopped and removed. Never raises:
+    failures are returned in .error.
+
+    Args:
+        server_name (str): Server whose world is benchmarked (may be running).
+        config (BenchmarkConfig): Settings to apply to the copy.
+        console_callback: func(str) -> None (Log message)
+        get_runner: func(str) -> ServerRunner or None (The running server of a name.)
+        radius (int): Blocks around the world spawn force-loaded as the workload.
+        load_seconds (int): How long the chunks are held loaded while MSPT is sampled.
+
+    Returns:
+        BenchmarkResult
+    """
+    radius = AppConfig.BENCHMARK_FORCELOAD_RADIUS if radius is None else radius
+    load_seconds = AppConfig.BENCHMARK_LOAD_SECONDS if load_seconds is None else load_seconds
+    log = lambda text: console_callback(f"[Benchmark {config.label}] {text}")
+    failed = lambda error, peak_rss=None: BenchmarkResult(config.label, None, None, None, peak_rss, None, error)
+
+    copy_name = f"{BENCHMARK_PREFIX}{server_name}"
+    runner = sampler = None
+    try:
+        try:
+            prepare_copy(server_name, config, get_runner(server_name) if get_runner else None)
+        except Exception as e:
+            log(f"Failed to copy the server: {e}")
+            return failed(str(e))
+
+        ready = threading.Event()
+        runner = logic.ServerRunner(copy_name, f"{logic.get_server_ram(copy_name)}M", console_callback)
+        runner.events.on(ServerEvent.READY, ready.set)
+        log("Booting...")
+        started_at = time.monotonic()
+        runner.start()
+        if not runner.running:
+            return failed("Server failed to start")
+        sampler = _RssSampler(runner.process.pid)
+
+        if not ready.wait(AppConfig.SUPERVISOR_BOOT_TIMEOUT):
+            return failed("Boot timed out", sampler.stop())
+        boot_seconds = runner.boot_seconds or round(time.monotonic() - started_at, 2)
+        spawn = world_spawn(get_world_dir(copy_name)) or (0, 0)
+        log(f"Ready in {boot_seconds}s. Force-loading {radius} blocks around spawn ({spawn[0]}, {spawn[1]})...")
+
+        for x1, z1, x2, z2 in _forceload_tiles(radius, spawn):
+            handle = runner.send_command(f"forceload add {x1} {z1} {x2} {z2}", expect=FORCELOAD_REPLY)
+            if handle:
+                handle.wait(AppConfig.COMMAND_REPLY_TIMEOUT)
+
+        samples = []
+        deadline = time.monotonic() + load_seconds
+        while time.monotonic() < deadline and runner.running:
+            handle = runner.send_command("tick query", expect=MSPT_PATTERN)
+            line = handle.result(AppConfig.BENCHMARK_SAMPLE_INTERVAL) if handle else None
+            match = MSPT_PATTERN.search(line or "")
+            if match:
+                samples.append(float(match.group(1)))
+            elif not samples:
+                log("No MSPT readings ('tick query' needs Minecraft 1.20.3+).")
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                break
+            time.sleep(AppConfig.BENCHMARK_SAMPLE_INTERVAL)
+
+        runner.send_command("forceload remove all")
+        save_started = time.monotonic()
+        handle = runner.send_command("save-all flush")
+        saved = handle and handle.wait(AppConfig.STOP_SAVE_STALL_TIMEOUT)
+        save_seconds = round(time.monotonic() - save_started, 2) if saved else None
+
+        mspt_avg = round(statistics.fmean(samples), 2) if samples else None
+        mspt_max = round(max(samples), 2) if samples else None
+        peak_rss = sampler.stop()
+        log(f"MSPT avg {mspt_avg} ms, peak RSS {peak_rss} MB, save {save_seconds}s")
+        return BenchmarkResult(config.label, boot_seconds, mspt_avg, mspt_max, peak_rss, save_seconds, None)
+    except Exception as e:
+        log(f"Benchmark failed: {e}")
+        return failed(str(e), sampler.stop() if sampler else None)
+    finally:
+        if sampler:
+            sampler.stop()
+        if runner and runner.running:
+            try:
+                runner.stop().result(timeout=AppConfig.STOP_HARD_TIMEOUT + AppConfig.SERVER_STOP_TIMEOUT)
+            except Exception as e:
+                log(f"Failed to stop the copy: {e}")
+        get_server_metadata(copy_name).flush()
+        shutil.rmtree(os.path.join(SERVERS_DIR, copy_name), ignore_errors=True)
+
+
+def run_ab(server_name, config_a, config_b, console_callback, **kwargs):
+    """Benchmarks config A, then config B, each on a fresh copy of the same world."""
+    return [run_config(server_name, config, console_callback, **kwargs) for config in (config_a, config_b)]
+
+
+def benchmark_jvm_profiles(server_name, profiles, console_callback, ready_timeout=300, is_running=None):
+    """
+    Boots a copy of the server once per profile and compares startup time and GC
+    pauses. The copy is never seen by the supervisor, so it runs on its own folder
+    and port: the real server can be started, backed up or restarted meanwhile.
+    The server must not be running when the benchmark starts (it would skew the
+    timings). Blocks until every profile has been tested and the copy is removed.
+
+    Args:
+        server_name (str): Server to benchmark.
+        profiles (list): Concrete profile names (e.g. ["aikar_g1", "zgc"]).
+        console_callback: func(str) -> None (Log message)
+        ready_timeout (int): Seconds to wait for READY before giving up on a profile.
+        is_running: func(str) -> bool (Whether the server is running, e.g. ServerSupervisor.is_running.)
+
+    Returns:
+        list: One dict per profile with 'profile', 'startup_seconds', 'gc_pauses',
+              'gc_pause_total_ms' and 'gc_pause_max_ms'.
+
+    Raises:
+        RuntimeError: If the server is running.
+        TimeoutError: If a profile's server does not stop in time (it is still being killed).
+        OSError: If the server can't be copied.
+    """
+    if is_running and is_running(server_name):
+        raise RuntimeError("Stop the server before benchmarking JVM profiles.")
+    copy_name = f"{BENCHMARK_PREFIX}{server_name}-jvm"
+    results = []
+    try:
+        console_callback("[Benchmark] Copying the server...")
+        prepare_copy(server_name, BenchmarkConfig("JVM", {}, None, None), copy_name=copy_name)
+        ram = f"{logic.get_server_ram(copy_name)}M"
+        logs_dir = os.path.join(SERVERS_DIR, copy_name, "logs")
+        os.makedirs(logs_dir, exist_ok=True)
+
+        for profile in profiles:
+            gc_log = os.path.join(logs_dir, f"gc-benchmark-{profile}.log")
+            ready = threading.Event()
+            stopped = threading.Event()
+            runner = logic.ServerRunner(
+                copy_name, ram, console_callback, jvm_profile=profile,
+                extra_jvm_args=[f"-Xlog:gc*:file={gc_log}"]
+            )
+            runner.events.on(ServerEvent.READY, ready.set)
+            runner.events.on(ServerEvent.STOPPED, stopped.set)
+
+            console_callback(f"[Benchmark] Booting with profile '{profile}'...")
+            started_at = time.monotonic()
+            runner.start()
+            if not runner.running:
+                results.append({"profile": profile, "startup_seconds": None, "gc_pauses": 0,
+                                "gc_pause_total_ms": 0.0, "gc_pause_max_ms": 0.0})
+                continue
+
+            startup_seconds = None
+            try:
+                if ready.wait(ready_timeout):
+                    startup_seconds = round(time.monotonic() - started_at, 2)
+                else:
+                    console_callback(f"[Benchmark] '{profile}' did not become ready within {ready_timeout}s.")
+                runner.stop().result(timeout=AppConfig.STOP_HARD_TIMEOUT + 30)
+                stopped.wait(5)
+            finally:
+                if runner.running:
+                    runner.stop()  # Whatever failed, the JVM must not outlive the benchmark (stop() escalates to kill)
+
+            pauses = jvm_profiles.parse_gc_pauses(gc_log)
+            # Kept with the real server's logs; the copy is removed
+            try:
+                live_logs = os.path.join(SERVERS_DIR, server_name, "logs")
+                os.makedirs(live_logs, exist_ok=True)
+                shutil.copy2(gc_log, live_logs)
+            except OSError:
+                pass
+            results.append({
+                "profile": profile,
+                "startup_seconds": startup_seconds,
+                "gc_pauses": len(pauses),
+                "gc_pause_total_ms": round(sum(pauses), 2),
+                "gc_pause_max_ms": round(max(pauses), 2) if pauses else 0.0
+            })
+            console_callback(f"[Benchmark] {profile}: startup {startup_seconds}s, "
+                             f"{len(pauses)} GC pauses ({round(sum(pauses), 2)} ms total)")
+    finally:
+        get_server_metadata(copy_name).flush()
+        shutil.rmtree(os.path.join(SERVERS_DIR, copy_name), ignore_errors=True)
+    return results
+
+
+def format_report(result_a, result_b):
+    """Comparison table of two BenchmarkResults (lower is better for every metric)."""
+    lines = [f"{'':<20} {result_a.label:>10} {result_b.label:>10}   Change"]
+    for field, title, unit in METRICS:
+        a, b = getattr(result_a, field), getattr(result_b, field)
+        cells = [f"{v}{unit}" if v is not None else "n/a" for v in (a, b)]
+        change = ""
+        if a and b is not None:
+            percent = (b - a) / a * 100
+            change = f"{percent:+.0f}%" + (f" ({result_b.label} better)" if percent < -2 else
+                                          f" ({result_a.label} better)" if percent > 2 else "")
+        lines.append(f"{title:<20} {cells[0]:>10} {cells[1]:>10}   {change}")
+    for result in (result_a, result_b):
+        if result.error:
+            lines.append(f"{result.label}: {result.error}")
+    return "\n".join(lines)
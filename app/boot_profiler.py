@@ -0,0 +1,79 @@
+import re
+import time
+
+# Console markers that open a boot phase, in the order they appear during a
+# vanilla/Fabric boot. Each marker closes the phase opened by the previous one.
+BOOT_PHASE_MARKERS = [
+    ("libraries", "Library loading", ("",)),  # Any first output line
+    ("datapacks", "Datapack reload", ("Reloading ResourceManager", "recipes", "Loading datapacks")),
+    ("server_init", "Server init", ("Starting minecraft server version",)),
+    ("world", "World loading", ("Preparing level",)),
+    ("spawn", "Spawn area", ("Preparing start region", "Preparing spawn area")),
+]
+
+SPAWN_PROGRESS_PATTERN = re.compile(r"Preparing spawn area: (\d+)%")
+
+
+class BootProfiler:
+    """Timestamps boot phases from the server console stream."""
+
+    def __init__(self):
+        self.started_at = None
+        self.phases = []
+        self.spawn_progress = []
+        self._marker_index = -1
+
+    def start(self):
+        """Marks the JVM launch. The first phase lasts until the first output line."""
+        self.started_at = time.monotonic()
+        self.phases = [{"key": "jvm", "phase": "JVM start", "start": 0.0, "end": None}]
+        self.spawn_progress = []
+        self._marker_index = -1
+
+    def _elapsed(self):
+        return round(time.monotonic() - self.started_at, 3)
+
+    def _open_phase(self, key, label):
+        now = self._elapsed()
+        if self.phases and self.phases[-1]["end"] is None:
+            self.phases[-1]["end"] = now
+        self.phases.append({"key": key, "phase": label, "start": now, "end": None})
+
+    def feed(self, line):
+        """Processes one console line. Markers are only honoured in forward order."""
+        if self.started_at is None:
+            return
+
+        for index in range(self._marker_index + 1, len(BOOT_PHASE_MARKERS)):
+            key, label, needles = BOOT_PHASE_MARKERS[index]
+            if any(n in line for n in needles):
+                self._marker_index = index
+                self._open_phase(key, label)
+                break
+
+        match = SPAWN_PROGRESS_PATTERN.search(line)
+        if match:
+            self.spawn_progress.append([self._elapsed(), int(match.group(1))])
+
+    def finish(self):
+        """
+        Closes the last phase (called on READY).
+
+        Returns:
+            dict: 'total_seconds', 'phases' (list of dicts with 'phase', 'start', 'end',
+                  in seconds since launch) and 'spawn_progress' ([seconds, percent] pairs).
+        """
+        if self.started_at is None:
+            return None
+
+        total = self._elapsed()
+        if self.phases and self.phases[-1]["end"] is None:
+            self.phases[-1]["end"] = total
+
+        timeline = {
+            "total_seconds": round(total, 2),
+            "phases": [p for p in self.phases if p["end"] is not None],
+            "spawn_progress": self.spawn_progress,
+        }
+        self.started_at = None
+        return timeline
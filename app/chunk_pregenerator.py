@@ -0,0 +1,331 @@
+import datetime
+import math
+import re
+import threading
+import time
+
+import app.command_dispatcher as command_dispatcher
+from app.app_config import AppConfig
+from app.server_events import ServerEvent
+from app.server_metadata import get_server_metadata
+
+# Progress lives in metadata.json under this key, so a job survives restarts of the server and the app
+METADATA_KEY = "pregen"
+
+STATUS_RUNNING = "running"  # Runs whenever the server is up
+STATUS_PAUSED = "paused"
+STATUS_DONE = "done"
+
+# Reply to "execute if loaded" (1.19.4+); older servers reject the command
+LOADED_REPLY = re.compile(r"Test (passed|failed)|Unknown or incomplete command|Incorrect argument for command")
+
+
+def spiral_tiles(radius_chunks, tile_chunks):
+    """
+    Splits the square of chunks -radius..radius-1 into tiles of tile_chunks x tile_chunks
+    (the last row/column clipped), ordered ring by ring from the centre outwards.
+
+    Returns:
+        list: (cx1, cz1, cx2, cz2) chunk squares relative to the centre chunk (inclusive).
+    """
+    count = -(-radius_chunks // tile_chunks)  # Tiles on each side of the centre
+    tiles = [(tx, tz) for tx in range(-count, count) for tz in range(-count, count)]
+    # Doubled tile centres keep the rings symmetric around the centre chunk corner
+    tiles.sort(key=lambda t: (max(abs(2 * t[0] + 1), abs(2 * t[1] + 1)),
+                              math.atan2(2 * t[1] + 1, 2 * t[0] + 1)))
+    squares = []
+    for tx, tz in tiles:
+        cx1, cz1 = max(tx * tile_chunks, -radius_chunks), max(tz * tile_chunks, -radius_chunks)
+        cx2 = min(tx * tile_chunks + tile_chunks, radius_chunks) - 1
+        cz2 = min(tz * tile_chunks + tile_chunks, radius_chunks) - 1
+        squares.append((cx1, cz1, cx2, cz2))
+    return squares
+
+
+def _block(state, cx, cz):
+    """Block coordinates (x, z) of a chunk relative to the centre chunk (any block inside a chunk selects it)."""
+    center_x, center_z = state["center"]
+    return (center_x // 16 + cx) * 16, (center_z // 16 + cz) * 16
+
+
+def _forceload_args(state, square):
+    """Block coordinates of a chunk square for /forceload."""
+    cx1, cz1, cx2, cz2 = square
+    (x1, z1), (x2, z2) = _block(state, cx1, cz1), _block(state, cx2, cz2)
+    return f"{x1} {z1} {x2} {z2}"
+
+
+def _corner_blocks(state, square):
+    cx1, cz1, cx2, cz2 = square
+    return [_block(state, cx, cz) for cx, cz in {(cx1, cz1), (cx2, cz1), (cx1, cz2), (cx2, cz2)}]
+
+
+class ChunkPregenerator:
+    """
+    Pre-generates worlds through the console of running servers: squares of chunks
+    are force-loaded (which generates them), held until the server has caught up,
+    then released so they are saved and unloaded. Squares are walked in a spiral
+    from the centre, and the number loaded at once follows the server's tick time:
+    it grows while MSPT stays low and halves on a "Can't keep up!" warning or when
+    MSPT goes over PREGEN_TARGET_MSPT.
+    """
+
+    def __init__(self, get_runner, console_callback, on_progress=None):
+        """
+        Args:
+            get_runner: func(str) -> ServerRunner or None (The running server of a name.)
+            console_callback: func(str, str) -> None (Server name, log message)
+            on_progress: func(str, dict) -> None (Server name, progress; see get_progress())
+        """
+        self.get_runner = get_runner
+        self.console_callback = console_callback
+        self.on_progress = on_progress or (lambda server_name, progress: None)
+        self._jobs = {}  # server name -> stop Event of the running job thread
+        self._lock = threading.Lock()
+
+    def get_state(self, server_name):
+        return get_server_metadata(server_name).get(METADATA_KEY)
+
+    def get_progress(self, server_name):
+        """
+        Returns:
+            dict: status, done, total, percent, batch and active (a thread is working on it),
+                  or None if the server has no pre-generation job.
+        """
+        state = self.get_state(server_name)
+        if not state:
+            return None
+        total = state["total"] or 1
+        return {
+            "status": state["status"],
+            "done": state["next"],
+            "total": state["total"],
+            "percent": round(state["next"] * 100 / total, 1),
+            "batch": state.get("batch", 1),
+            "active": self.is_active(server_name),
+        }
+
+    def is_active(self, server_name):
+        with self._lock:
+            return server_name in self._jobs
+
+    def start(self, server_name, radius, center=(0, 0)):
+        """
+        Starts pre-generating radius blocks around center (x, z). An unfinished job with the
+        same area is resumed instead of started over. The job begins now if the server is
+        running, otherwise at its next start.
+        """
+        radius_chunks = max(1, -(-int(radius) // 16))
+        center = [int(center[0]), int(center[1])]
+        state = self.get_state(server_name)
+        if (state and state["status"] != STATUS_DONE and state["radius_chunks"] == radius_chunks
+                and state["center"] == center):
+            self.resume(server_name)
+            return
+
+        tile_chunks = AppConfig.PREGEN_TILE_CHUNKS
+        state = {
+            "status": STATUS_RUNNING,
+            "radius_chunks": radius_chunks,
+            "center": center,
+            "tile_chunks": tile_chunks,
+            "next": 0,
+            "total": len(spiral_tiles(radius_chunks, tile_chunks)),
+            "loaded": None,
+            "batch": 1,
+            "started": datetime.datetime.now().isoformat(),
+        }
+        get_server_metadata(server_name).update({METADATA_KEY: state}, immediate=True)
+        self.console_callback(server_name, f"[System] Chunk pre-generation queued: {radius_chunks * 16} blocks "
+                                           f"around {center[0]}, {center[1]} ({state['total']} squares).")
+        self._notify(server_name)
+        self.on_server_ready(server_name)
+
+    def resume(self, server_name):
+        state = self.get_state(server_name)
+        if not state or state["status"] == STATUS_DONE:
+            return
+        self._set_status(server_name, STATUS_RUNNING)
+        self.on_server_ready(server_name)
+
+    def pause(self, server_name):
+        """Stops the job after the current step; it stays paused across restarts until resumed."""
+        if self.get_state(server_name):
+            self._set_status(server_name, STATUS_PAUSED)
+        self._stop_thread(server_name)
+
+    def cancel(self, server_name):
+        """Stops the job and forgets its progress."""
+        self._stop_thread(server_name)
+        get_server_metadata(server_name).update(remove=[METADATA_KEY], immediate=True)
+        self._notify(server_name)
+
+    def on_server_ready(self, server_name):
+        """Picks up a running job once the server is ready (called after every start)."""
+        state = self.get_state(server_name)
+        runner = self.get_runner(server_name)
+        if not state or state["status"] != STATUS_RUNNING or not runner or not runner.running:
+            return
+        with self._lock:
+            if server_name in self._jobs:
+                return
+            stop = self._jobs[server_name] = threading.Event()
+        threading.Thread(target=self._run, args=(server_name, runner, stop), daemon=True).start()
+
+    def _stop_thread(self, server_name):
+        with self._lock:
+            stop = self._jobs.get(server_name)
+        if stop:
+            stop.set()
+
+    def _set_status(self, server_name, status):
+        def _apply(data):
+            if METADATA_KEY in data:
+                data[METADATA_KEY]["status"] = status
+        get_server_metadata(server_name).mutate(_apply, immediate=True)
+        self._notify(server_name)
+
+    def _notify(self, server_name):
+        try:
+            self.on_progress(server_name, self.get_progress(server_name))
+        except Exception as e:
+            print(f"[Error] Pre-generation progress callback failed: {e}")
+
+    def _save(self, server_name, state, immediate=False):
+        # The user may have paused or cancelled meanwhile: only the progress fields are ours
+        def _apply(data):
+            current = data.get(METADATA_KEY)
+            if current and current.get("started") == state["started"]:
+                current.update({key: state[key] for key in ("next", "loaded", "batch")})
+                if state["status"] == STATUS_DONE:
+                    current["status"] = STATUS_DONE
+        get_server_metadata(server_name).mutate(_apply, immediate=immediate)
+
+    def _query_mspt(self, runner):
+        pattern = command_dispatcher.MSPT_PATTERN
+        handle = runner.send_command("tick query", priority=command_dispatcher.PRIORITY_LOW, expect=pattern)
+        match = pattern.search((handle.result(AppConfig.PREGEN_SAMPLE_TIMEOUT) if handle else None) or "")
+        return float(match.group(1)) if match else None
+
+    def _forceload(self, runner, state, squares, action):
+        handles = [runner.send_command(f"forceload {action} {_forceload_args(state, square)}",
+                                       priority=command_dispatcher.PRIORITY_LOW) for square in squares]
+        for handle in handles:
+            if handle:
+                handle.wait(AppConfig.COMMAND_REPLY_TIMEOUT)
+
+    def _squares_loaded(self, runner, state, squares):
+        """
+        Asks the server whether the corner chunks of every square are fully loaded
+        (generated), with "execute if loaded".
+
+        Returns:
+            bool: False also when a reply doesn't come in time. None if the server
+                  doesn't know the command (before 1.19.4).
+        """
+        handles = [runner.send_command(f"execute if loaded {x} 0 {z}", priority=command_dispatcher.PRIORITY_LOW,
+                                       expect=LOADED_REPLY)
+                   for square in squares for x, z in _corner_blocks(state, square)]
+        loaded = True
+        for handle in handles:
+            match = LOADED_REPLY.search((handle.result(AppConfig.PREGEN_SAMPLE_TIMEOUT) if handle else None) or "")
+            if match and not match.group(1):
+                return None
+            loaded = loaded and bool(match) and match.group(1) == "passed"
+        return loaded
+
+    def _run(self, server_name, runner, stop):
+        log = lambda text: self.console_callback(server_name, text)
+        lag_warnings = []
+        on_lag = runner.events.on(ServerEvent.LAG, lambda data: lag_warnings.append(data))
+        state = dict(self.get_state(server_name))
+        squares = spiral_tiles(state["radius_chunks"], state["tile_chunks"])
+        delay = 0.0
+        check_loaded = True  # Until the server turns out not to support "execute if loaded"
+        unconfirmed = 0      # Consecutive batches released before they were confirmed loaded
+        started_at, started_next = time.monotonic(), state["next"]
+        log(f"[System] Chunk pre-generation running: {state['next']}/{state['total']} squares done.")
+
+        try:
+            # Squares still force-loaded when the server last stopped
+            if state["loaded"]:
+                self._forceload(runner, state, squares[state["loaded"][0]:state["loaded"][1]], "remove")
+                state["loaded"] = None
+
+            while state["next"] < state["total"] and not stop.is_set() and runner.running:
+                batch = squares[state["next"]:state["next"] + state["batch"]]
+                state["loaded"] = [state["next"], state["next"] + len(batch)]
+                self._save(server_name, state)
+                lag_count = len(lag_warnings)
+
+                self._forceload(runner, state, batch, "add")
+                # Hold the squares until the server has caught up with generating them
+                stop.wait(AppConfig.PREGEN_MIN_DWELL)
+                mspt = self._query_mspt(runner)
+                settle_until = time.monotonic() + AppConfig.PREGEN_SETTLE_TIMEOUT
+                while (mspt is not None and mspt > AppConfig.PREGEN_TARGET_MSPT and runner.running
+                       and time.monotonic() < settle_until and not stop.wait(AppConfig.PREGEN_SAMPLE_INTERVAL)):
+                    mspt = self._query_mspt(runner)
+                # Released too early, chunks would be left ungenerated: confirm the squares are loaded first
+                loaded = self._squares_loaded(runner, state, batch) if check_loaded else None
+                while (loaded is False and runner.running and time.monotonic() < settle_until
+                       and not stop.wait(AppConfig.PREGEN_SAMPLE_INTERVAL)):
+                    loaded = self._squares_loaded(runner, state, batch)
+                if loaded is None and check_loaded:
+                    check_loaded = False
+                    log("[Warning] This server can't report loaded chunks (execute if loaded needs 1.19.4+). "
+                        "Pre-generation paces itself on tick time only.")
+                self._forceload(runner, state, batch, "remove")
+                if not runner.running:
+                    break  # Redone at the next start, after releasing "loaded"
+                if stop.is_set() and loaded is False:
+                    break  # Paused before the batch finished: it is redone on resume
+
+                if loaded is False and unconfirmed < AppConfig.PREGEN_LOAD_RETRIES:
+                    # Not generated within PREGEN_SETTLE_TIMEOUT: retry the batch, smaller and slower
+                    unconfirmed += 1
+                    log(f"[Warning] Squares {state['next'] + 1}-{state['next'] + len(batch)} were not loaded in time, "
+                        f"retrying ({unconfirmed}/{AppConfig.PREGEN_LOAD_RETRIES}).")
+                    state["batch"] = max(1, state["batch"] // 2)
+                    delay = min(max(delay * 2, AppConfig.PREGEN_BACKOFF_DELAY), AppConfig.PREGEN_MAX_DELAY)
+                    state["loaded"] = None
+                    self._save(server_name, state)
+                    stop.wait(delay)
+                    continue
+                if loaded is False:
+                    log(f"[Warning] Squares {state['next'] + 1}-{state['next'] + len(batch)} still not loaded after "
+                        f"{AppConfig.PREGEN_LOAD_RETRIES} retries; skipping them.")
+                unconfirmed = 0
+
+                state["next"] += len(batch)
+                state["loaded"] = None
+                lagging = len(lag_warnings) > lag_count or (mspt is not None and mspt > AppConfig.PREGEN_TARGET_MSPT)
+                # Additive increase, multiplicative decrease
+                if lagging:
+                    state["batch"] = max(1, state["batch"] // 2)
+                    delay = min(max(delay * 2, AppConfig.PREGEN_BACKOFF_DELAY), AppConfig.PREGEN_MAX_DELAY)
+                elif mspt is None or mspt < AppConfig.PREGEN_TARGET_MSPT / 2:
+                    state["batch"] = min(state["batch"] + 1, AppConfig.PREGEN_MAX_BATCH)
+                    delay /= 2
+                self._save(server_name, state)
+                self._notify(server_name)
+                if delay >= 0.1:
+                    stop.wait(delay)
+
+            if state["next"] >= state["total"]:
+                state["status"] = STATUS_DONE
+                self._save(server_name, state, immediate=True)
+                log(f"[System] Chunk pre-generation finished ({state['total']} squares).")
+            else:
+                self._save(server_name, state, immediate=True)
+                elapsed_min = max(time.monotonic() - started_at, 1) / 60
+                log(f"[System] Chunk pre-generation stopped at {state['next']}/{state['total']} squares "
+                    f"({(state['next'] - started_next) / elapsed_min:.1f}/min).")
+        except Exception as e:
+            log(f"[Error] Chunk pre-generation failed: {e}")
+        finally:
+            runner.events.off(ServerEvent.LAG, on_lag)
+            with self._lock:
+                if self._jobs.get(server_name) is stop:
+                    del self._jobs[server_name]
+            self._notify(server_name)
@@ -0,0 +1,208 @@
+import heapq
+import itertools
+import re
+import threading
+import time
+
+from app.app_config import AppConfig
+
+PRIORITY_HIGH = 0    # Typed by the user, stop
+PRIORITY_NORMAL = 1  # Restart warnings, countdowns
+PRIORITY_LOW = 2     # Background resyncs
+
+# Broadcasts: identical pending copies are coalesced into one write
+BROADCAST_PREFIXES = ("say ", "tellraw @a ", "title @a ")
+
+# Console lines that confirm common commands, used when no `expect` is given.
+# Commands without an entry resolve as soon as they are written.
+DEFAULT_EXPECTATIONS = [
+    (re.compile(r"^say (.+)$"), lambda m: re.escape(f"[Server] {m.group(1)}")),
+    (re.compile(r"^list$"), lambda m: r"There are \d+ of a max"),
+    (re.compile(r"^save-all"), lambda m: r"Saved the game"),
+    (re.compile(r"^forceload (add|remove)"), lambda m: r"(?:Marked|Unmarked|No chunks were|Chunk at|Too many chunks)"),
+]
+
+# /tick query (1.20.3+): "Average time per tick: 3.2ms (Target: 50.0ms)"
+MSPT_PATTERN = re.compile(r"Average time per tick: ([\d.]+)ms")
+
+
+class CommandHandle:
+    """Completion handle for a queued command."""
+
+    def __init__(self, command, priority, expect=None):
+        self.command = command
+        self.priority = priority
+        self.expect = re.compile(expect) if isinstance(expect, str) else expect
+        self.written_at = None
+        self.line = None
+        self.error = None
+        self._event = threading.Event()
+
+    @property
+    def done(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """Blocks until the command completed. Returns False on timeout."""
+        return self._event.wait(timeout)
+
+    def result(self, timeout=None):
+        """Returns the matched output line (None if no output was expected or on timeout)."""
+        self._event.wait(timeout)
+        return self.line
+
+    def _resolve(self, line=None, error=None):
+        if self._event.is_set():
+            return
+        self.line = line
+        self.error = error
+        self._event.set()
+
+
+class CommandDispatcher:
+    """Single writer thread for a server's stdin with a priority queue and batched writes."""
+
+    def __init__(self, write_callback, console_callback=None):
+        """
+        Args:
+            write_callback: func(str) -> None (Writes and flushes text to stdin. May raise.)
+            console_callback: func(str) -> None (Log message)
+        """
+        self.write_callback = write_callback
+        self.console_callback = console_callback or (lambda text: None)
+        self._queue = []
+        self._seq = itertools.count()
+        self._pending_broadcasts = {}
+        self._awaiting = []
+        self._cond = threading.Condition()
+        self._closed = False
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def submit(self, command, priority=PRIORITY_NORMAL, expect=None):
+        """
+        Queues a command.
+
+        Args:
+            command (str): Console command without trailing newline.
+            priority (int): PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW. FIFO within a priority.
+            expect (str|Pattern): Output pattern that completes the handle. Defaults to
+                                  DEFAULT_EXPECTATIONS; without one the handle completes on write.
+
+        Returns:
+            CommandHandle
+        """
+        with self._cond:
+            if command.startswith(BROADCAST_PREFIXES) and command in self._pending_broadcasts:
+                return self._pending_broadcasts[command]
+
+            if expect is None:
+                expect = self._default_expectation(command)
+            handle = CommandHandle(command, priority, expect)
+
+            if self._closed:
+                handle._resolve(error="Server is not running.")
+                return handle
+
+            if command.startswith(BROADCAST_PREFIXES):
+                self._pending_broadcasts[command] = handle
+            heapq.heappush(self._queue, (priority, next(self._seq), handle))
+            self._cond.notify()
+            return handle
+
+    def _default_expectation(self, command):
+        for pattern, build in DEFAULT_EXPECTATIONS:
+            match = pattern.match(command)
+            if match:
+                return build(match)
+        return None
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    # Also wakes up when the oldest awaiting handle times out, so a silent
+                    # console can't leave it pending until the next line arrives
+                    self._cond.wait(self._expiry_wait())
+                    self._expire(time.monotonic())
+                if self._closed:
+                    return
+
+            # Give a burst (countdown + warning + user command) a moment to accumulate
+            time.sleep(AppConfig.COMMAND_BATCH_WINDOW)
+
+            with self._cond:
+                batch = []
+                while self._queue and len(batch) < AppConfig.COMMAND_BATCH_SIZE:
+                    batch.append(heapq.heappop(self._queue)[2])
+                for handle in batch:
+                    self._pending_broadcasts.pop(handle.command, None)
+                # Registered before the write: a fast reply must not arrive before its handle
+                now = time.monotonic()
+                for handle in batch:
+                    handle.written_at = now
+                    if handle.expect is not None:
+                        self._awaiting.append(handle)
+
+            try:
+                self.write_callback("".join(f"{h.command}\n" for h in batch))
+            except Exception as e:
+                self.console_callback(f"[Error] Failed to send command: {e}")
+                with self._cond:
+                    self._awaiting = [h for h in self._awaiting if h not in batch]
+                for handle in batch:
+                    handle._resolve(error=str(e))
+                continue
+
+            for handle in batch:
+                if handle.expect is None:
+                    handle._resolve()
+
+    def _expiry_wait(self):
+        """Seconds until the oldest awaiting handle times out (None if nothing awaits). Caller holds _cond."""
+        if not self._awaiting:
+            return None
+        return max(0.0, self._awaiting[0].written_at + AppConfig.COMMAND_REPLY_TIMEOUT - time.monotonic())
+
+    def _expire(self, now):
+        """Fails handles that waited longer than COMMAND_REPLY_TIMEOUT. Caller holds _cond."""
+        if not self._awaiting or now - self._awaiting[0].written_at <= AppConfig.COMMAND_REPLY_TIMEOUT:
+            return
+        still_waiting = []
+        for handle in self._awaiting:
+            if now - handle.written_at > AppConfig.COMMAND_REPLY_TIMEOUT:
+                handle._resolve(error="No matching output.")
+            else:
+                still_waiting.append(handle)
+        self._awaiting = still_waiting
+
+    def feed(self, line):
+        """Matches a console line against commands still waiting for their output."""
+        if not self._awaiting:
+            return
+        with self._cond:
+            now = time.monotonic()
+            still_waiting = []
+            matched = False
+            for handle in self._awaiting:
+                # Oldest matching command wins, so each line completes at most one handle
+                if not matched and handle.expect.search(line):
+                    handle._resolve(line)
+                    matched = True
+                elif now - handle.written_at > AppConfig.COMMAND_REPLY_TIMEOUT:
+                    handle._resolve(error="No matching output.")
+                else:
+                    still_waiting.append(handle)
+            self._awaiting = still_waiting
+
+    def close(self):
+        """Fails everything still queued or awaiting output and stops the writer thread."""
+        with self._cond:
+            self._closed = True
+            for _, _, handle in self._queue:
+                handle._resolve(error="Server stopped.")
+            for handle in self._awaiting:
+                handle._resolve(error="Server stopped.")
+            self._queue = []
+            self._awaiting = []
+            self._pending_broadcasts.clear()
+            self._cond.notify_all()
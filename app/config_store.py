@@ -0,0 +1,212 @@
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+
+from app.app_config import AppConfig
+from app.constants import APP_CONFIG_PATH
+
+DEFAULT_CONFIG = {
+    "java_path": "auto",
+    "ram_allocation": "2G",
+    "accepted_eula": False,
+    "last_server": None,
+    "playit_dns": None
+}
+
+
+def atomic_write_json(path, data, indent=4):
+    """Writes JSON atomically (see atomic_write_text)."""
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+def atomic_write_text(path, text, encoding=None):
+    """
+    Writes text to a temporary file next to path and renames it into place, so
+    readers never see a half-written file and a crash keeps the old contents.
+    Line endings in text are written as they are.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigStore:
+    """
+    In-memory config.json. Reads are revalidated against the file's mtime (so
+    external edits are picked up), saves are coalesced into one atomic write.
+    """
+
+    def __init__(self, path, defaults, save_delay=None, write_defaults=True):
+        """
+        Args:
+            path (Path): JSON file.
+            defaults (dict): Used when the file is missing or corrupted.
+            save_delay (float): Seconds a burst of saves is coalesced before writing.
+            write_defaults (bool): Write the defaults back when the file is missing or
+                                   corrupted (otherwise it is left alone until the next save).
+        """
+        self.path = path
+        self.defaults = defaults
+        self.write_defaults = write_defaults
+        self.save_delay = AppConfig.CONFIG_SAVE_DELAY if save_delay is None else save_delay
+        self._data = None
+        self._signature = None
+        self._dirty = False
+        self._timer = None
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        # Unsaved changes win over the file until they are flushed
+        if self._dirty:
+            return
+        signature = self._stat_signature()
+        if self._data is not None and signature == self._signature:
+            return
+
+        if signature is None:
+            self._data = copy.deepcopy(self.defaults)
+            self._signature = None
+            if self.write_defaults:
+                self._write()
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self._signature = signature
+        except (json.JSONDecodeError, OSError):
+            self._data = copy.deepcopy(self.defaults)
+            if self.write_defaults:
+                print("[Warning] Config file corrupted. Resetting to defaults.")
+                self._write()
+            else:
+                print(f"[Warning] {self.path} is unreadable. Using defaults.")
+                self._signature = signature
+            return
+
+        previous, self._data = self._data, data
+        if previous is not None and previous != data:
+            self._notify(previous)
+
+    def get(self, key=None, default=None):
+        """
+        Returns a copy of the current config (safe to modify and pass to save()),
+        or a copy of one key's value.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            if key is None:
+                return copy.deepcopy(self._data)
+            return copy.deepcopy(self._data.get(key, default))
+
+    def save(self, config, immediate=False):
+        """
+        Replaces the config. The file is written after save_delay seconds, so a burst
+        of saves results in one write; immediate=True writes right away.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            previous, self._data = self._data, copy.deepcopy(config)
+            self._dirty = True
+            if immediate or self.save_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            changed = previous != self._data
+        if changed:
+            self._notify(previous)
+
+    def update(self, updates=None, remove=(), immediate=False):
+        """Merges `updates` and deletes the keys in `remove`, then saves."""
+        def _apply(data):
+            data.update(updates or {})
+            for key in remove:
+                data.pop(key, None)
+        self.mutate(_apply, immediate=immediate)
+
+    def mutate(self, func, immediate=False):
+        """
+        Read-modify-write under the store lock: func(data) edits the config in place.
+        Use this when the new value depends on the current one.
+        """
+        with self._lock:
+            data = self.get()
+            func(data)
+            self.save(data, immediate=immediate)
+
+    def flush(self):
+        """Writes pending changes now."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                self._write()
+
+    def _write(self):
+        try:
+            atomic_write_json(self.path, self._data)
+            self._dirty = False
+            self._signature = self._stat_signature()
+        except OSError as e:
+            print(f"Failed to save {self.path}: {e}")
+
+    def subscribe(self, callback):
+        """
+        Registers callback(config, changed_keys), called after every change made
+        through save() or picked up from disk.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self, previous):
+        previous = previous or {}
+        current = self._data
+        changed = {k for k in set(previous) | set(current) if previous.get(k) != current.get(k)}
+        for callback in list(self._subscribers):
+            try:
+                callback(copy.deepcopy(current), changed)
+            except Exception as e:
+                print(f"Config subscriber failed: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_config_store():
+    """Returns the process-wide store for config.json."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConfigStore(APP_CONFIG_PATH, DEFAULT_CONFIG)
+            atexit.register(_store.flush)
+        return _store
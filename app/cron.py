@@ -0,0 +1,134 @@
+import datetime
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# (name, min, max, names)
+FIELDS = [
+    ("minute", 0, 59, None),
+    ("hour", 0, 23, None),
+    ("day of month", 1, 31, None),
+    ("month", 1, 12, MONTH_NAMES),
+    ("day of week", 0, 7, DAY_NAMES),
+]
+
+# Give up searching after this many years (e.g. "0 0 30 2 *" never matches)
+SEARCH_YEARS = 5
+
+
+class CronError(ValueError):
+    """Raised for a malformed cron expression."""
+
+
+def _parse_value(text, names, name):
+    text = text.lower()
+    if names and text in names:
+        return names[text]
+    if not text.isdigit():
+        raise CronError(f"Invalid {name} value '{text}'.")
+    return int(text)
+
+
+def _parse_field(text, name, low, high, names):
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Invalid step '{step_text}' in {name}.")
+            step = int(step_text)
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _parse_value(start_text, names, name), _parse_value(end_text, names, name)
+        else:
+            start = end = _parse_value(part, names, name)
+            if step > 1:
+                end = high  # "5/15" means from 5 to the end, every 15
+
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise CronError(f"{name.capitalize()} '{part}' is out of range {low}-{high}.")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """
+    A standard 5-field cron expression (minute hour day-of-month month day-of-week)
+    with lists, ranges, steps, month/day names and @daily-style macros.
+    As in classic cron, when both day fields are restricted a day matching
+    either one qualifies.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        text = MACROS.get(self.expression.lower(), self.expression)
+        parts = text.split()
+        if len(parts) != 5:
+            raise CronError(f"Expected 5 fields, got {len(parts)}: '{expression}'.")
+
+        fields = [_parse_field(p, name, low, high, names) for p, (name, low, high, names) in zip(parts, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        if 7 in weekdays:
+            weekdays = (weekdays - {7}) | {0}  # 7 is Sunday too
+        self.weekdays = weekdays
+        self.days_restricted = parts[2] != "*"
+        self.weekdays_restricted = parts[4] != "*"
+
+    def __repr__(self):
+        return f"CronExpression('{self.expression}')"
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after):
+        """
+        Returns the first matching minute strictly after `after` (a naive local datetime),
+        or None if the expression never matches.
+        """
+        dt = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = after + datetime.timedelta(days=366 * SEARCH_YEARS)
+
+        # Jump field by field instead of testing every minute
+        while dt <= limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            if dt.minute not in self.minutes:
+                dt += datetime.timedelta(minutes=1)
+                continue
+            return dt
+        return None
+
+
+def validate(expression):
+    """Returns None if the expression is valid, else the error message."""
+    try:
+        CronExpression(expression)
+        return None
+    except CronError as e:
+        return str(e)
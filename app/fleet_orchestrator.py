@@ -0,0 +1,164 @@
+import collections
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from app.app_config import AppConfig
+from app.server_events import ServerEventEmitter
+
+PHASE_RESTART = "restart"
+PHASE_BACKUP = "backup"
+
+# Events on FleetOrchestrator.events, both with a PhaseRecord
+EVENT_PHASE_STARTED = "phase_started"
+EVENT_PHASE_FINISHED = "phase_finished"
+
+# Times are epoch seconds; started_at/finished_at are None until they happen
+PhaseRecord = collections.namedtuple(
+    "PhaseRecord", "server phase queued_at deadline started_at finished_at players ok"
+)
+
+
+class _Ticket:
+    __slots__ = ("seq", "server", "phase", "func", "deadline", "queued_at", "started_at", "future")
+
+    def __init__(self, seq, server, phase, func, deadline):
+        self.seq = seq
+        self.server = server
+        self.phase = phase
+        self.func = func
+        self.deadline = deadline
+        self.queued_at = time.time()
+        self.started_at = None
+        self.future = Future()
+
+
+class FleetOrchestrator:
+    """
+    Limits how many servers can be in a disruptive phase (restart or backup) at
+    the same time, so servers sharing a schedule don't all stop, save and boot
+    at once. Waiting servers are let in by priority when a slot frees up:
+    first those past their deadline, then those with nobody online, then the
+    rest, earliest deadline first within each group.
+    """
+
+    def __init__(self, player_count, console_callback, max_concurrent=None):
+        """
+        Args:
+            player_count: func(str) -> int (Players online on a server; 0 if stopped)
+            console_callback: func(str, str) -> None (Server name, log message)
+            max_concurrent (int): Servers allowed in a phase at once.
+        """
+        self.player_count = player_count
+        self.console_callback = console_callback
+        self.max_concurrent = AppConfig.FLEET_MAX_CONCURRENT if max_concurrent is None else max_concurrent
+
+        self.events = ServerEventEmitter()
+        self.history = collections.deque(maxlen=AppConfig.FLEET_HISTORY_SIZE)
+        self._waiting = []
+        self._active = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, server_name, phase, func, deadline=None):
+        """
+        Queues a phase for a server. func() performs it and blocks until it is over.
+
+        Args:
+            server_name (str): Server to run the phase for.
+            phase (str): PHASE_RESTART or PHASE_BACKUP.
+            func: func() -> None (Runs the phase; an exception marks it failed)
+            deadline (float): Epoch time by which the phase should start
+                              (default: now + FLEET_DEADLINE).
+
+        Returns:
+            concurrent.futures.Future: Resolves with the PhaseRecord once the phase
+                                       ended. Submitting a phase that is already queued
+                                       or running for the server returns its future.
+        """
+        if deadline is None:
+            deadline = time.time() + AppConfig.FLEET_DEADLINE
+
+        with self._lock:
+            for ticket in itertools.chain(self._waiting, self._active.values()):
+                if ticket.server == server_name and ticket.phase == phase:
+                    return ticket.future
+
+            ticket = _Ticket(next(self._seq), server_name, phase, func, deadline)
+            self._waiting.append(ticket)
+            busy = len(self._active) >= self.max_concurrent
+            ahead = len(self._waiting) - 1
+
+        if busy:
+            self.console_callback(server_name, f"[System] {phase.capitalize()} queued: {len(self._active)} server(s) "
+                                               f"busy, {ahead} waiting ahead.")
+        self._dispatch()
+        return ticket.future
+
+    def pending(self):
+        """Queued (server, phase, deadline) tuples, in the order they would start now."""
+        with self._lock:
+            now = time.time()
+            return [(t.server, t.phase, t.deadline) for t in sorted(self._waiting, key=lambda t: self._priority(t, now))]
+
+    def active(self):
+        """(server, phase, started_at) of the phases currently running."""
+        with self._lock:
+            return [(t.server, t.phase, t.started_at) for t in self._active.values()]
+
+    def _priority(self, ticket, now):
+        if ticket.deadline <= now:
+            group = 0
+        elif self._players(ticket.server) == 0:
+            group = 1
+        else:
+            group = 2
+        return group, ticket.deadline, ticket.seq
+
+    def _players(self, server_name):
+        try:
+            return self.player_count(server_name) or 0
+        except Exception:
+            return 0
+
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            now = time.time()
+            while self._waiting and len(self._active) < self.max_concurrent:
+                ticket = min(self._waiting, key=lambda t: self._priority(t, now))
+                self._waiting.remove(ticket)
+                ticket.started_at = now
+                self._active[ticket.seq] = ticket
+                started.append(ticket)
+
+        for ticket in started:
+            threading.Thread(target=self._run, args=(ticket,), daemon=True).start()
+
+    def _run(self, ticket):
+        started_at = ticket.started_at
+        record = PhaseRecord(ticket.server, ticket.phase, ticket.queued_at, ticket.deadline,
+                             started_at, None, self._players(ticket.server), None)
+        waited = started_at - ticket.queued_at
+        late = " (past its deadline)" if started_at > ticket.deadline else ""
+        self.console_callback(ticket.server, f"[System] {ticket.phase.capitalize()} phase started after "
+                                             f"waiting {waited:.0f}s{late}.")
+        self.events.emit(EVENT_PHASE_STARTED, record)
+
+        ok = True
+        try:
+            ticket.func()
+        except Exception as e:
+            ok = False
+            self.console_callback(ticket.server, f"[Error] {ticket.phase.capitalize()} phase failed: {e}")
+
+        record = record._replace(finished_at=time.time(), ok=ok)
+        self.console_callback(ticket.server, f"[System] {ticket.phase.capitalize()} phase finished in "
+                                             f"{record.finished_at - started_at:.0f}s.")
+        with self._lock:
+            self._active.pop(ticket.seq, None)
+            self.history.append(record)
+        self.events.emit(EVENT_PHASE_FINISHED, record)
+        ticket.future.set_result(record)
+        self._dispatch()
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import re
+
+# Selectable JVM flag profiles. "auto" is resolved per start from the RAM
+# allocation in metadata.json and the host core count.
+JVM_PROFILES = {
+    "auto": {"desc": "Pick a profile from the RAM allocation and CPU cores."},
+    "aikar_g1": {"desc": "Aikar's G1 flags. Short, predictable pauses for most servers."},
+    "zgc": {"desc": "ZGC for large heaps (16 GB+). Sub-millisecond pauses, needs spare cores."},
+    "minimal": {"desc": "Serial GC for small servers (under 2 GB or 2 cores)."},
+    "none": {"desc": "No GC tuning (JVM defaults)."},
+}
+
+DEFAULT_JVM_PROFILE = "auto"
+
+# Flags shared by every profile (Java 24+ compatibility)
+BASE_JVM_FLAGS = [
+    "--enable-native-access=ALL-UNNAMED",
+    "-Dorg.lwjgl.util.NoChecks=true",
+]
+
+# Per-server folder holding class-data-sharing archives
+CDS_DIR_NAME = ".cds"
+
+# Matches unified GC log pauses, e.g. G1 "Pause Young (Normal) ... 3.456ms"
+# or ZGC "Pause Mark Start 0.012ms".
+GC_PAUSE_PATTERN = re.compile(r"Pause.*?(\d+(?:\.\d+)?)ms")
+
+
+def ram_to_mb(ram):
+    """Converts a RAM string like '2G', '2048M' or an int (MB) to megabytes."""
+    if isinstance(ram, (int, float)):
+        return int(ram)
+    ram = str(ram).strip().upper()
+    try:
+        if ram.endswith("G"):
+            return int(float(ram[:-1]) * 1024)
+        if ram.endswith("M"):
+            return int(float(ram[:-1]))
+        return int(ram)
+    except ValueError:
+        return 2048
+
+
+def recommend_profile(ram_mb, cores=None):
+    """Returns the profile name best suited to a heap size and core count."""
+    if cores is None:
+        cores = os.cpu_count() or 1
+
+    if ram_mb < 2048 or cores <= 2:
+        return "minimal"
+    if ram_mb >= 16384 and cores >= 8:
+        return "zgc"
+    return "aikar_g1"
+
+
+def resolve_profile(profile, ram_mb, cores=None):
+    """Turns 'auto' (or an unknown name) into a concrete profile name."""
+    if profile not in JVM_PROFILES or profile == "auto":
+        return recommend_profile(ram_mb, cores)
+    return profile
+
+
+def _aikar_flags(ram_mb):
+    # Aikar recommends bigger young generations and regions above 12 GB
+    if ram_mb >= 12288:
+        new_size, max_new_size, region, reserve, ihop = 40, 50, "16M", 15, 20
+    else:
+        new_size, max_new_size, region, reserve, ihop = 30, 40, "8M", 20, 15
+
+    return [
+        "-XX:+UseG1GC",
+        "-XX:+ParallelRefProcEnabled",
+        "-XX:MaxGCPauseMillis=200",
+        "-XX:+UnlockExperimentalVMOptions",
+        "-XX:+DisableExplicitGC",
+        "-XX:+AlwaysPreTouch",
+        f"-XX:G1NewSizePercent={new_size}",
+        f"-XX:G1MaxNewSizePercent={max_new_size}",
+        f"-XX:G1HeapRegionSize={region}",
+        f"-XX:G1ReservePercent={reserve}",
+        "-XX:G1HeapWastePercent=5",
+        "-XX:G1MixedGCCountTarget=4",
+        f"-XX:InitiatingHeapOccupancyPercent={ihop}",
+        "-XX:G1MixedGCLiveThresholdPercent=90",
+        "-XX:G1RSetUpdatingPauseTimePercent=5",
+        "-XX:SurvivorRatio=32",
+        "-XX:+PerfDisableSharedMem",
+        "-XX:MaxTenuringThreshold=1",
+    ]
+
+
+def get_profile_flags(profile, ram_mb):
+    """Returns the GC tuning flags for a concrete profile."""
+    if profile == "aikar_g1":
+        return _aikar_flags(ram_mb)
+    if profile == "zgc":
+        return [
+            "-XX:+UseZGC",
+            "-XX:+AlwaysPreTouch",
+            "-XX:+DisableExplicitGC",
+            "-XX:+PerfDisableSharedMem",
+        ]
+    if profile == "minimal":
+        return ["-XX:+UseSerialGC"]
+    return []
+
+
+def build_java_command(jar_file, ram_mb, profile, java_cmd="java", extra_args=None):
+    """
+    Builds the full java launch command.
+
+    Args:
+        jar_file (str): Jar to run, relative to the server directory.
+        ram_mb (int): Heap size in MB (used for both -Xms and -Xmx).
+        profile (str): A concrete profile name (see resolve_profile).
+        java_cmd (str): Java executable.
+        extra_args (list): Additional JVM flags placed before -jar.
+    """
+    cmd = [java_cmd, f"-Xms{ram_mb}M", f"-Xmx{ram_mb}M"]
+    cmd += get_profile_flags(profile, ram_mb)
+    cmd += BASE_JVM_FLAGS
+    if extra_args:
+        cmd += list(extra_args)
+    cmd += ["-jar", jar_file, "nogui"]
+    return cmd
+
+
+def parse_gc_pauses(gc_log_path):
+    """Returns a list of GC pause durations (ms) from a unified JVM GC log."""
+    pauses = []
+    if not os.path.exists(gc_log_path):
+        return pauses
+    with open(gc_log_path, "r", errors="replace") as f:
+        for line in f:
+            match = GC_PAUSE_PATTERN.search(line)
+            if match:
+                pauses.append(float(match.group(1)))
+    return pauses
+
+
+def _cds_fingerprint(jar_path, java_version):
+    """Identifies a jar build + Java runtime pair. Changes when either changes."""
+    stat = os.stat(jar_path)
+    key = f"{stat.st_size}:{stat.st_mtime_ns}:{java_version}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def get_cds_args(server_path, jar_file, java_version):
+    """
+    Returns the JVM flags for an AppCDS (class-data-sharing) archive.
+
+    The first run for a given jar/Java pair dumps an archive at exit
+    (-XX:ArchiveClassesAtExit); later runs map it (-XX:SharedArchiveFile).
+    Archives for an older jar or Java version are deleted.
+
+    Args:
+        server_path (str): Server directory.
+        jar_file (str): Jar being launched, relative to server_path.
+        java_version (str): Java version string (e.g. from check_java()).
+
+    Returns:
+        tuple: (list of JVM flags, mode) where mode is "create" or "reuse".
+    """
+    cds_dir = os.path.join(server_path, CDS_DIR_NAME)
+    os.makedirs(cds_dir, exist_ok=True)
+
+    jar_stem = os.path.splitext(os.path.basename(jar_file))[0]
+    fingerprint = _cds_fingerprint(os.path.join(server_path, jar_file), java_version or "unknown")
+    archive_name = f"{jar_stem}-{fingerprint}.jsa"
+
+    # Invalidate archives built from a different jar or Java version
+    for name in os.listdir(cds_dir):
+        if name.startswith(f"{jar_stem}-") and name.endswith(".jsa") and name != archive_name:
+            try:
+                os.remove(os.path.join(cds_dir, name))
+            except OSError:
+                pass
+
+    # Relative to the server directory, which is the JVM's working directory
+    archive_path = os.path.join(CDS_DIR_NAME, archive_name)
+    if os.path.exists(os.path.join(cds_dir, archive_name)):
+        return [f"-XX:SharedArchiveFile={archive_path}"], "reuse"
+    return [f"-XX:ArchiveClassesAtExit={archive_path}"], "create"
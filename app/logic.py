@@ -1,43 +1,32 @@
-import json
 import os
 import subprocess
 import shutil
 import requests
 import threading
 import platform
+import re
+import time
+import itertools
+from concurrent.futures import Future
 
-from app.constants import APP_CONFIG_PATH, SERVERS_DIR, MINECRAFT_VERSIONS, BACKUPS_DIR
+from app.constants import SERVERS_DIR, MINECRAFT_VERSIONS, BACKUPS_DIR
 from app.server_events import ServerEvent, ServerEventEmitter
+from app.app_config import AppConfig
+from app.boot_profiler import BootProfiler
+from app.config_store import get_config_store
+from app.server_metadata import get_server_metadata
+from app.server_properties import get_server_properties
+import app.jvm_profiles as jvm_profiles
+import app.command_dispatcher as command_dispatcher
+import app.cron as cron
 
 def load_config():
-    """Loads the configuration from config.json."""
-    default_config = {
-        "java_path": "auto",
-        "ram_allocation": "2G",
-        "accepted_eula": False,
-        "last_server": None,
-        "playit_dns": None
-    }
+    """Returns the configuration from config.json (cached in memory, revalidated by mtime)."""
+    return get_config_store().get()
 
-    if not os.path.exists(APP_CONFIG_PATH):
-        save_config(default_config)
-        return default_config
-    
-    try:
-        with open(APP_CONFIG_PATH, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        # FIX: Do not recurse. Reset file and return default.
-        print("[Warning] Config file corrupted. Resetting to defaults.")
-        save_config(default_config)
-        return default_config
-
-def save_config(config):
-    """Saves the configuration to config.json."""
-    # Ensure the parent directory exists
-    APP_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(APP_CONFIG_PATH, "w") as f:
-        json.dump(config, f, indent=4)
+def save_config(config, immediate=False):
+    """Saves the configuration to config.json (atomic; bursts of saves are coalesced)."""
+    get_config_store().save(config, immediate=immediate)
 
 def check_java():
     """
@@ -165,69 +154,75 @@ def install_fabric(server_name, mc_version, progress_callback=None):
 
 
 class ServerRunner:
-    def __init__(self, server_name, ram_allocation, console_callback):
+    def __init__(self, server_name, ram_allocation, console_callback, jvm_profile=None, extra_jvm_args=None):
         self.server_name = server_name
         self.console_callback = console_callback
         self.process = None
         self.running = False
+        # Optional overrides (used by benchmarks); None means use metadata.json
+        self.jvm_profile = jvm_profile
+        self.extra_jvm_args = extra_jvm_args or []
+
+        # RAM from metadata wins over the global default
+        ram_mb = get_server_metadata(server_name).get("ram")
+        self.ram_allocation = f"{ram_mb}M" if ram_mb else ram_allocation
 
-        # Try to load RAM from metadata
-        try:
-            with open(os.path.join(SERVERS_DIR, server_name, "metadata.json"), "r") as f:
-                meta = json.load(f)
-                if "ram" in meta:
-                    self.ram_allocation = f"{meta['ram']}M"
-                else:
-                    self.ram_allocation = ram_allocation
-        except:
-            self.ram_allocation = ram_allocation
-            
         self.player_count = 0
+        self.last_status = None
         self.events = ServerEventEmitter()
 
+        # Boot metrics
+        self.active_jvm_profile = None
+        self.cds_mode = None
+        self.boot_profiler = BootProfiler()
+        self.boot_seconds = None
+        self.boot_timeline = None
+
+        self.commands = None
+
+        # Crash detection / graceful stop
+        self.stop_requested = False
+        self.crashed = False  # Set before STOPPED when the exit was a crash (ERROR follows)
+        self._stop_future = None
+        self._saw_save_progress = False
+        self._last_output_at = 0.0
+        self.started_at_wall = None
+        self.last_exit_code = None
+
     def _apply_pending_settings(self):
         """Checks for and applies initial settings from the wizard, creating the properties file if needed."""
-        metadata_path = os.path.join(SERVERS_DIR, self.server_name, "metadata.json")
-        if not os.path.exists(metadata_path):
+        meta = get_server_metadata(self.server_name)
+        pending = meta.get("pending_settings")
+        if not pending or not any(pending.values()):
             return
 
         try:
-            with open(metadata_path, "r+") as f:
-                meta = json.load(f)
-                pending = meta.get("pending_settings")
+            self.console_callback("[System] Applying initial server settings from wizard...")
 
-                if not pending or not any(pending.values()):
-                    return
+            # Load existing properties or create an empty dictionary
+            props = load_server_properties(self.server_name)
 
-                self.console_callback("[System] Applying initial server settings from wizard...")
-                
-                # Load existing properties or create an empty dictionary
-                props = load_server_properties(self.server_name)
-                
-                # If props is empty, it's the first time, so set defaults
-                if not props:
-                    props["network-compression-threshold"] = "256"
-                    props["sync-chunk-writes"] = "false"
-                    props["entity-broadcast-range-percentage"] = "75"
-                    props["allow-flight"] = "true"
-                    props["force-gamemode"] = "true"
-
-                # Map wizard keys to server.properties keys
-                if pending.get("seed"): props["level-seed"] = pending.get("seed")
-                if pending.get("game_mode"): props["gamemode"] = pending.get("game_mode")
-                if pending.get("difficulty"): props["difficulty"] = pending.get("difficulty")
-                if pending.get("view_distance"): props["view-distance"] = pending.get("view_distance")
-                if pending.get("simulation_distance"): props["simulation-distance"] = pending.get("simulation_distance")
-                
-                # Save the updated properties. This will create the file if it doesn't exist.
-                save_server_properties(self.server_name, props)
-                
-                # Clear pending settings to prevent re-application
-                meta["pending_settings"] = {}
-                f.seek(0)
-                f.truncate()
-                json.dump(meta, f, indent=4)
-                self.console_callback("[System] Initial settings applied successfully.")
+            # If props is empty, it's the first time, so set defaults
+            if not props:
+                props["network-compression-threshold"] = "256"
+                props["sync-chunk-writes"] = "false"
+                props["entity-broadcast-range-percentage"] = "75"
+                props["allow-flight"] = "true"
+                props["force-gamemode"] = "true"
+
+            # Map wizard keys to server.properties keys
+            if pending.get("seed"): props["level-seed"] = pending.get("seed")
+            if pending.get("game_mode"): props["gamemode"] = pending.get("game_mode")
+            if pending.get("difficulty"): props["difficulty"] = pending.get("difficulty")
+            if pending.get("view_distance"): props["view-distance"] = pending.get("view_distance")
+            if pending.get("simulation_distance"): props["simulation-distance"] = pending.get("simulation_distance")
+
+            # Save the updated properties. This will create the file if it doesn't exist.
+            save_server_properties(self.server_name, props)
+
+            # Clear pending settings to prevent re-application
+            meta.update({"pending_settings": {}}, immediate=True)
+            self.console_callback("[System] Initial settings applied successfully.")
 
         except Exception as e:
             self.console_callback(f"[Error] Failed to apply pending settings: {e}")
@@ -255,22 +250,38 @@ class ServerRunner:
             self.console_callback(f"[Error] Server jar not found: {jar_file}")
             return
 
-        # Build command with Java 24+ compatibility flags
-        cmd = [
-            "java",
-            f"-Xms{self.ram_allocation}",
-            f"-Xmx{self.ram_allocation}",
-            "--enable-native-access=ALL-UNNAMED",
-            "-Dorg.lwjgl.util.NoChecks=true",
-            "-jar",
-            jar_file,
-            "nogui"
-        ]
+        # Build command with the selected GC profile and Java 24+ compatibility flags
+        ram_mb = jvm_profiles.ram_to_mb(self.ram_allocation)
+        profile = jvm_profiles.resolve_profile(
+            self.jvm_profile or get_server_jvm_profile(self.server_name), ram_mb
+        )
+        self.active_jvm_profile = profile
+        extra_args = list(self.extra_jvm_args)
+
+        # Class-data-sharing archive: dump on first run, map it on later runs
+        self.cds_mode = None
+        if get_server_cds_enabled(self.server_name):
+            try:
+                cds_args, self.cds_mode = jvm_profiles.get_cds_args(server_path, jar_file, check_java())
+                extra_args += cds_args
+                self.console_callback(f"[System] Class-data-sharing archive: {self.cds_mode}")
+            except OSError as e:
+                self.console_callback(f"[Warning] Class-data-sharing disabled for this start: {e}")
+
+        cmd = jvm_profiles.build_java_command(jar_file, ram_mb, profile, extra_args=extra_args)
         
+        self.console_callback(f"[System] JVM profile: {profile}")
         self.console_callback(f"[System] Starting server with: {' '.join(cmd)}")
         self.events.emit(ServerEvent.STARTING)
         
         try:
+            self.boot_profiler.start()
+            self.boot_seconds = None
+            self.boot_timeline = None
+            self.stop_requested = False
+            self.crashed = False
+            self.started_at_wall = time.time()
+            self.commands = command_dispatcher.CommandDispatcher(self._write_stdin, self.console_callback)
             self.process = subprocess.Popen(
                 cmd,
                 cwd=server_path,
@@ -288,49 +299,102 @@ class ServerRunner:
         except Exception as e:
             self.console_callback(f"[Error] Failed to start server: {e}")
             self.running = False
+            self.commands.close()
 
-    def stop(self):
-        if not self.running or not self.process:
-            return
+    # Console lines that show the world is still being written during shutdown
+    SAVE_PROGRESS_MARKERS = ("Saving chunks", "Saving players", "Saving worlds", "All chunks are saved", "ThreadedAnvilChunkStorage")
+
+    def stop(self, callback=None):
+        """
+        Asks the server to stop without blocking the caller.
 
+        Sends "stop", then a watcher thread follows the console. While output keeps
+        coming (save progress gets a longer allowance) the server is left alone; once
+        output stalls it escalates to terminate() (SIGTERM on Linux, runs the JVM
+        shutdown hooks) and then kill().
+
+        Args:
+            callback: func(int) -> None, called with the exit code once the process exits.
+
+        Returns:
+            concurrent.futures.Future: Resolves with the exit code (None if not running).
+        """
+        if self._stop_future and not self._stop_future.done():
+            future = self._stop_future
+        elif not self.running or not self.process:
+            future = Future()
+            future.set_result(self.last_exit_code)
+        else:
+            future = self._begin_stop()
+
+        if callback:
+            future.add_done_callback(lambda f: callback(f.result()))
+        return future
+
+    def _begin_stop(self):
+        self.stop_requested = True
+        self._stop_future = Future()
+        self._saw_save_progress = False
         self.console_callback("[System] Stopping server...")
-        try:
-            # FIX: Handle case where process is already dead/pipe broken
-            if self.process.stdin and self.process.poll() is None:
-                try:
-                    self.process.stdin.write("stop\n")
-                    self.process.stdin.flush()
-                except (IOError, BrokenPipeError):
-                    pass # Process likely dead already
-            
-            # Wait for graceful exit (up to 10 seconds)
+
+        process = self.process
+        # FIX: Handle case where process is already dead/pipe broken (the dispatcher reports write errors)
+        if process.stdin and process.poll() is None:
+            self.commands.submit("stop", priority=command_dispatcher.PRIORITY_HIGH)
+
+        threading.Thread(target=self._stop_watchdog, args=(process,), daemon=True).start()
+        return self._stop_future
+
+    def _stop_watchdog(self, process):
+        """Escalates stop -> terminate -> kill only when console output stalls."""
+        started = time.monotonic()
+        self._last_output_at = started
+        escalation = 0
+
+        while process.poll() is None:
+            time.sleep(0.5)
+            now = time.monotonic()
+            allowance = AppConfig.STOP_SAVE_STALL_TIMEOUT if self._saw_save_progress else AppConfig.STOP_STALL_TIMEOUT
+            stalled = now - self._last_output_at > allowance
+            hard_timeout = escalation == 0 and now - started >= AppConfig.STOP_HARD_TIMEOUT
+            if not stalled and not hard_timeout:
+                continue
+
             try:
-                self.process.wait(timeout=10)
-            except subprocess.TimeoutExpired:
-                self.console_callback("[System] Server unresponsive, force killing...")
-                self.process.kill()
-                self.process.wait()
-                
-        except Exception as e:
-            self.console_callback(f"[Error] Failed to stop server: {e}")
-            # Ensure it's dead if an error occurred during stop
-            if self.process:
-                try:
-                    self.process.kill()
-                except:
-                    pass
+                if escalation == 0:
+                    self.console_callback("[System] Server stopped responding while shutting down, sending SIGTERM...")
+                    process.terminate()
+                else:
+                    self.console_callback("[System] Server unresponsive, force killing...")
+                    process.kill()
+                    break
+            except Exception as e:
+                self.console_callback(f"[Error] Failed to stop server: {e}")
+                break
+            escalation += 1
+            self._last_output_at = now
+
+    def send_command(self, command, priority=command_dispatcher.PRIORITY_NORMAL, expect=None):
+        """
+        Queues a command for the server stdin.
 
-    def send_command(self, command):
-        """Sends a command to the server stdin."""
+        Returns:
+            CommandHandle: Resolves when the matching output line is seen (see
+                           CommandDispatcher.submit), or None if the server is not running.
+        """
         if not self.running or not self.process or not self.process.stdin:
-            return
-            
-        try:
-            self.console_callback(f"> {command}")
-            self.process.stdin.write(command + "\n")
-            self.process.stdin.flush()
-        except Exception as e:
-            self.console_callback(f"[Error] Failed to send command: {e}")
+            return None
+
+        self.console_callback(f"> {command}")
+        return self.commands.submit(command, priority, expect)
+
+    def _write_stdin(self, text):
+        """Writes a batch of newline-terminated commands in one write+flush."""
+        process = self.process
+        if not process or not process.stdin or process.poll() is not None:
+            raise BrokenPipeError("Server process is not running.")
+        process.stdin.write(text)
+        process.stdin.flush()
 
     def _read_output(self):
         """Reads stdout from the process and sends it to the callback."""
@@ -338,18 +402,89 @@ class ServerRunner:
             return
 
         for line in self.process.stdout:
+            self._last_output_at = time.monotonic()
+            if self.stop_requested and any(m in line for m in self.SAVE_PROGRESS_MARKERS):
+                self._saw_save_progress = True
             self.console_callback(line.strip())
+            self.commands.feed(line)
+            self.boot_profiler.feed(line)
             self._parse_player_count(line.strip())
+            self._parse_lag(line)
             
             if "Done (" in line and "For help, type" in line:
+                self._record_boot_time()
                 self.events.emit(ServerEvent.READY)
         
-        self.process.wait()
+        exit_code = self.process.wait()
+        self.last_exit_code = exit_code
+        self.commands.close()
         self.running = False
         self.process = None
         self.console_callback("[System] Server process exited.")
+
+        # A clean stop exits with 0 and leaves no new crash report
+        crash_report = self.find_crash_report()
+        crashed = self.crashed = not self.stop_requested and (exit_code != 0 or crash_report is not None)
+        if self._stop_future and not self._stop_future.done():
+            self._stop_future.set_result(exit_code)
         self.events.emit(ServerEvent.STOPPED)
 
+        if crashed:
+            self.console_callback(f"[Error] Server crashed (exit code {exit_code}).")
+            if crash_report:
+                self.console_callback(f"[Error] Crash report: {crash_report}")
+            self.events.emit(ServerEvent.ERROR, {"exit_code": exit_code, "crash_report": crash_report})
+
+    def find_crash_report(self):
+        """Returns the newest crash report written since this start, or None."""
+        crash_dir = os.path.join(SERVERS_DIR, self.server_name, "crash-reports")
+        if not self.started_at_wall or not os.path.isdir(crash_dir):
+            return None
+
+        newest, newest_mtime = None, self.started_at_wall
+        for name in os.listdir(crash_dir):
+            path = os.path.join(crash_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if name.endswith(".txt") and mtime >= newest_mtime:
+                newest, newest_mtime = path, mtime
+        return newest
+
+    def _record_boot_time(self):
+        """Stores the start-to-READY time and boot phase timeline in metadata.json."""
+        timeline = self.boot_profiler.finish()
+        if not timeline:
+            return
+        self.boot_timeline = timeline
+        self.boot_seconds = timeline["total_seconds"]
+        self.console_callback(f"[System] Server ready in {self.boot_seconds}s.")
+
+        record = {
+            "date": datetime.datetime.now().isoformat(),
+            "seconds": self.boot_seconds,
+            "jvm_profile": self.active_jvm_profile,
+            "cds": self.cds_mode,
+            "phases": timeline["phases"],
+            "spawn_progress": timeline["spawn_progress"]
+        }
+        def _append(meta):
+            history = meta.get("boot_history", []) + [record]
+            meta["boot_history"] = history[-AppConfig.BOOT_HISTORY_LIMIT:]
+        get_server_metadata(self.server_name).mutate(_append)
+
+    def update_status(self, status):
+        """
+        Applies a Server List Ping result (None when the ping failed). The pinged
+        player count is authoritative and corrects the join/leave based count.
+        """
+        self.last_status = status
+        if status is not None and status.players_online != self.player_count:
+            self.player_count = status.players_online
+            self.events.emit(ServerEvent.PLAYER_COUNT, self.player_count)
+        self.events.emit(ServerEvent.STATUS, status)
+
     def _parse_player_count(self, line):
         # Regex for "Player joined" and "Player left"
         # Vanilla/Fabric: "Player joined the game" / "Player left the game"
@@ -360,6 +495,16 @@ class ServerRunner:
             self.player_count = max(0, self.player_count - 1)
             self.events.emit(ServerEvent.PLAYER_COUNT, self.player_count)
 
+    # "Can't keep up! Is the server overloaded? Running 2043ms or 40 ticks behind"
+    LAG_PATTERN = re.compile(r"Can't keep up!.*?(\d+)ms or (\d+) ticks behind")
+
+    def _parse_lag(self, line):
+        if "Can't keep up!" not in line:
+            return
+        match = self.LAG_PATTERN.search(line)
+        self.events.emit(ServerEvent.LAG, {"behind_ms": int(match.group(1)) if match else None,
+                                           "ticks": int(match.group(2)) if match else None})
+
 def save_server_icon(server_name, image_path):
     """
     Resizes and saves the server icon.
@@ -390,59 +535,15 @@ def check_eula(server_name):
         return "eula=true" in content
 
 def load_server_properties(server_name):
-    """Reads server.properties into a dict."""
-    props_path = os.path.join(SERVERS_DIR, server_name, "server.properties")
-    properties = {}
-    
-    if not os.path.exists(props_path):
-        return properties
-        
-    with open(props_path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#"):
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    properties[key.strip()] = value.strip()
-    return properties
+    """Reads server.properties into a dict (parsed once, re-read only when the file changes)."""
+    return get_server_properties(server_name).as_dict()
 
 def save_server_properties(server_name, new_properties):
-    """Updates server.properties while preserving comments/order if possible."""
-    props_path = os.path.join(SERVERS_DIR, server_name, "server.properties")
-    
-    if not os.path.exists(props_path):
-        # Create new
-        with open(props_path, "w") as f:
-            for k, v in new_properties.items():
-                f.write(f"{k}={v}\n")
-        return
-
-    # Read existing lines to preserve comments
-    with open(props_path, "r") as f:
-        lines = f.readlines()
-        
-    updated_keys = set()
-    new_lines = []
-    
-    for line in lines:
-        stripped = line.strip()
-        if stripped and not stripped.startswith("#") and "=" in stripped:
-            key = stripped.split("=", 1)[0].strip()
-            if key in new_properties:
-                new_lines.append(f"{key}={new_properties[key]}\n")
-                updated_keys.add(key)
-            else:
-                new_lines.append(line)
-        else:
-            new_lines.append(line)
-            
-    # Append new keys that weren't in the file
-    for k, v in new_properties.items():
-        if k not in updated_keys:
-            new_lines.append(f"{k}={v}\n")
-            
-    with open(props_path, "w") as f:
-        f.writelines(new_lines)
+    """
+    Updates server.properties, keeping comments, order and untouched lines as they are.
+    The file is only written if a value actually changed.
+    """
+    return get_server_properties(server_name).update(new_properties)
 
 import datetime
 import zipfile
@@ -466,6 +567,9 @@ class BackupManager:
         abs_server_path = self.server_path.resolve()
         abs_backup_dir = self.backup_dir.resolve()
 
+        # Include metadata changes that are still waiting for their delayed write
+        get_server_metadata(self.server_name).flush()
+
         try:
             with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 for root, dirs, files in os.walk(self.server_path):
@@ -474,6 +578,9 @@ class BackupManager:
                     # FIX: Safe exclusion. Check if current root starts with the backup dir path
                     if os.path.commonpath([root_path, str(abs_backup_dir)]) == str(abs_backup_dir):
                         continue
+
+                    # Class-data-sharing archives are rebuilt on demand, no need to back them up
+                    dirs[:] = [d for d in dirs if d != jvm_profiles.CDS_DIR_NAME]
                         
                     for file in files:
                         file_path = os.path.join(root, file)
@@ -514,6 +621,9 @@ class BackupManager:
         if not backup_path.exists():
             return False
             
+        # Write pending metadata now so a delayed write can't overwrite the restored file
+        get_server_metadata(self.server_name).flush()
+
         try:
             # 1. Clear server directory
             for item in self.server_path.iterdir():
@@ -531,111 +641,168 @@ class BackupManager:
             print(f"Restore failed: {e}")
             return False
 
+# Actions a scheduled job can run
+JOB_ACTIONS = ["restart", "backup", "broadcast", "command", "pregen"]
+# What happens to runs missed while the app was closed: skip them, or run once right away
+CATCH_UP_POLICIES = ["skip", "once"]
+RESTART_JOB_ID = "restart"
+
+
 class Scheduler:
+    """
+    Scheduled jobs of a server, stored as a "jobs" list in metadata.json:
+
+        {"id": str, "action": one of JOB_ACTIONS, "cron": "m h dom mon dow" or
+         "interval_hours": int, "enabled": bool, "catch_up": one of CATCH_UP_POLICIES,
+         "jitter": int (seconds), "args": dict, "last_run": ISO timestamp or None}
+
+    The single restart schedule of older versions (a "scheduler" key) is migrated
+    into a job with id "restart" the first time it is read.
+    """
+
     def __init__(self, server_name):
         self.server_name = server_name
         self.server_path = os.path.join(SERVERS_DIR, server_name)
-        self.metadata_path = os.path.join(self.server_path, "metadata.json")
-        
-    def _load_metadata(self):
-        if not os.path.exists(self.metadata_path):
-            return {}
-        try:
-            with open(self.metadata_path, "r") as f:
-                return json.load(f)
-        except:
-            return {}
+        # Shared in-memory metadata: the engine reads jobs without disk I/O
+        self.metadata = get_server_metadata(server_name)
 
-    def _save_metadata(self, data):
-        with open(self.metadata_path, "w") as f:
-            json.dump(data, f)
+    @staticmethod
+    def _migrate(data):
+        legacy = data.pop("scheduler", None)
+        if not legacy:
+            return
+        job = {"id": RESTART_JOB_ID, "action": "restart", "enabled": True, "last_run": legacy.get("last_run")}
+        if legacy.get("type") == "time":
+            hour, minute = map(int, legacy["restart_time"].split(":"))
+            job.update({"cron": f"{minute} {hour} * * *", "catch_up": "skip"})
+        else:
+            # Overdue interval restarts used to run as soon as the app came back
+            job.update({"interval_hours": legacy.get("interval_hours", AppConfig.DEFAULT_INTERVAL_HOURS), "catch_up": "once"})
+        jobs = data.setdefault("jobs", [])
+        if not any(j.get("id") == RESTART_JOB_ID for j in jobs):
+            jobs.insert(0, job)
+
+    def get_jobs(self):
+        """Returns a copy of the server's jobs, migrating a legacy schedule first."""
+        if self.metadata.get("scheduler"):
+            self.metadata.mutate(self._migrate, immediate=True)
+        return self.metadata.get("jobs", [])
+
+    def get_job(self, job_id):
+        return next((job for job in self.get_jobs() if job.get("id") == job_id), None)
+
+    def save_job(self, job):
+        """Adds a job, or replaces the one with the same id. Returns the job id."""
+        if job.get("action") not in JOB_ACTIONS:
+            raise ValueError(f"Unknown job action '{job.get('action')}'.")
+        if not job.get("cron") and not job.get("interval_hours"):
+            raise ValueError("A job needs a cron expression or an interval.")
+        if job.get("cron"):
+            error = cron.validate(job["cron"])
+            if error:
+                raise ValueError(error)
+
+        job = dict(job)
+        job.setdefault("enabled", True)
+        job.setdefault("catch_up", "skip")
+        job.setdefault("args", {})
+        job.setdefault("last_run", None)
+
+        self.get_jobs()  # migrate first so the legacy restart isn't lost
+
+        def _save(data):
+            jobs = data.setdefault("jobs", [])
+            if not job.get("id"):
+                taken = {j.get("id") for j in jobs}
+                job["id"] = next(f"{job['action']}-{i}" for i in itertools.count(1) if f"{job['action']}-{i}" not in taken)
+            for i, existing in enumerate(jobs):
+                if existing.get("id") == job["id"]:
+                    jobs[i] = job
+                    break
+            else:
+                jobs.append(job)
+        self.metadata.mutate(_save)
+        return job["id"]
+
+    def remove_job(self, job_id):
+        self.get_jobs()
+        def _remove(data):
+            data["jobs"] = [j for j in data.get("jobs", []) if j.get("id") != job_id]
+        self.metadata.mutate(_remove)
+
+    def update_job_last_run(self, job_id, when=None):
+        when = (when or datetime.datetime.now()).isoformat()
+        def _stamp(data):
+            for job in data.get("jobs", []):
+                if job.get("id") == job_id:
+                    job["last_run"] = when
+        self.metadata.mutate(_stamp)
 
     def set_restart_schedule(self, enabled, interval_hours=None, restart_time=None):
         """
-        Sets the restart schedule.
+        Sets the restart schedule (the job with id "restart").
         enabled: bool
         interval_hours: int (e.g., 6, 12, 24) for interval mode
         restart_time: str (e.g., "03:00") for time mode
         """
-        data = self._load_metadata()
-        
         if not enabled:
-            if "scheduler" in data:
-                del data["scheduler"]
+            self.remove_job(RESTART_JOB_ID)
+            return
+
+        # Keep tuning such as jitter and catch-up of an existing restart job
+        job = self.get_job(RESTART_JOB_ID) or {"id": RESTART_JOB_ID, "action": "restart"}
+        job.pop("cron", None)
+        job.pop("interval_hours", None)
+        job["enabled"] = True
+        if restart_time:
+            # Time-based schedule
+            hour, minute = map(int, restart_time.split(":"))
+            job["cron"] = f"{minute} {hour} * * *"
+            job["last_run"] = None  # Will be set after first restart
         else:
-            if restart_time:
-                # Time-based schedule
-                data["scheduler"] = {
-                    "type": "time",
-                    "restart_time": restart_time,
-                    "last_run": None  # Will be set after first restart
-                }
-            else:
-               # Interval-based schedule
-                data["scheduler"] = {
-                    "type": "interval",
-                    "interval_hours": interval_hours,
-                    "last_run": datetime.datetime.now().isoformat()
-                }
-            
-        self._save_metadata(data)
+            # Interval-based schedule
+            job["interval_hours"] = interval_hours
+            job["last_run"] = datetime.datetime.now().isoformat()
+        self.save_job(job)
 
     def get_schedule(self):
-        data = self._load_metadata()
-        return data.get("scheduler", None)
+        """
+        The restart job in the shape of the legacy schedule:
+        {"type": "interval"|"time"|"cron", "interval_hours"|"restart_time"|"cron", "last_run", "defer"},
+        or None if there is no enabled restart job.
+        """
+        job = self.get_job(RESTART_JOB_ID)
+        if not job or not job.get("enabled", True):
+            return None
+        if job.get("interval_hours"):
+            return {"type": "interval", "interval_hours": job["interval_hours"], "last_run": job.get("last_run"),
+                    "defer": job.get("defer")}
 
-    def check_due(self):
-        """Checks if a restart is due. Returns True if yes."""
-        data = self._load_metadata()
-        scheduler = data.get("scheduler")
-        
-        if not scheduler:
-            return False
-            
-        if scheduler["type"] == "interval":
-            last_run_str = scheduler.get("last_run")
-            if not last_run_str:
-                self.update_last_run()
-                return False
-                
-            last_run = datetime.datetime.fromisoformat(last_run_str)
-            interval = datetime.timedelta(hours=scheduler["interval_hours"])
-            
-            if datetime.datetime.now() >= last_run + interval:
-                return True
-                
-        elif scheduler["type"] == "time":
-            # Time-based restart (e.g., daily at 03:00)
-            restart_time_str = scheduler["restart_time"]  # "HH:MM"
-            last_run_str = scheduler.get("last_run")
-            
-            # Parse target time for today
-            hour, minute = map(int, restart_time_str.split(":"))
-            now = datetime.datetime.now()
-            target_time_today = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            # Check if we've already restarted today
-            if last_run_str:
-                last_run = datetime.datetime.fromisoformat(last_run_str)
-                # If last restart was today and within 5 minutes of target, don't restart again
-                if last_run.date() == now.date():
-                    time_since_last = (now - last_run).total_seconds()
-                    if time_since_last < 300:  # 5 minutes
-                        return False
-            
-            # Check if we're within the 2-minute window around target time
-            time_diff = (now - target_time_today).total_seconds()
-            # Trigger if we're past the target time but within 2 minutes
-            if 0 <= time_diff < 120:
-                return True
+        fields = job["cron"].split()
+        if len(fields) == 5 and fields[2:] == ["*", "*", "*"] and fields[0].isdigit() and fields[1].isdigit():
+            restart_time = f"{int(fields[1]):02d}:{int(fields[0]):02d}"
+            return {"type": "time", "restart_time": restart_time, "last_run": job.get("last_run"), "defer": job.get("defer")}
+        return {"type": "cron", "cron": job["cron"], "last_run": job.get("last_run"), "defer": job.get("defer")}
 
-        return False
+    def set_restart_defer(self, enabled, window_minutes=None, deadline_minutes=None):
+        """
+        Makes the restart job player-aware: it happens at the first moment nobody is
+        online from window_minutes before its time, and is forced deadline_minutes after.
+        """
+        job = self.get_job(RESTART_JOB_ID)
+        if not job:
+            return
+        if enabled:
+            job["defer"] = {
+                "window_minutes": AppConfig.RESTART_DEFER_WINDOW if window_minutes is None else window_minutes,
+                "deadline_minutes": AppConfig.RESTART_DEFER_DEADLINE if deadline_minutes is None else deadline_minutes,
+            }
+        elif job.pop("defer", None) is None:
+            return
+        self.save_job(job)
 
     def update_last_run(self):
-        data = self._load_metadata()
-        if "scheduler" in data:
-            data["scheduler"]["last_run"] = datetime.datetime.now().isoformat()
-            self._save_metadata(data)
+        self.update_job_last_run(RESTART_JOB_ID)
 
 
 def apply_server_settings(server_name, ram, seed, game_mode, difficulty, view_distance, simulation_distance):
@@ -644,8 +811,6 @@ def apply_server_settings(server_name, ram, seed, game_mode, difficulty, view_di
     Creates metadata.json and accepts EULA.
     Server properties will be configured after first server start.
     """
-    server_path = os.path.join(SERVERS_DIR, server_name)
-    
     # 1. Create metadata.json with RAM and other settings
     metadata = {
         "ram": ram,
@@ -658,9 +823,8 @@ def apply_server_settings(server_name, ram, seed, game_mode, difficulty, view_di
             "simulation_distance": simulation_distance
         }
     }
-    metadata_path = os.path.join(server_path, "metadata.json")
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=4)
+    meta = get_server_metadata(server_name)
+    meta.save(metadata, immediate=True)
     
     # 2. Accept EULA so server can start
     accept_eula(server_name)
@@ -684,40 +848,67 @@ def apply_server_settings(server_name, ram, seed, game_mode, difficulty, view_di
     save_server_properties(server_name, props)
     
     # Clear pending settings since we just applied them
-    metadata["pending_settings"] = {}
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=4)
+    meta.update({"pending_settings": {}}, immediate=True)
 
 def get_server_ram(server_name):
     """Gets the RAM allocation (MB) from metadata.json."""
-    try:
-        with open(os.path.join(SERVERS_DIR, server_name, "metadata.json"), "r") as f:
-            meta = json.load(f)
-            return meta.get("ram", 2048)
-    except:
-        return 2048
+    return get_server_metadata(server_name).get("ram", 2048)
 
 def set_server_ram(server_name, ram_mb):
     """Sets the RAM allocation (MB) in metadata.json."""
-    metadata_path = os.path.join(SERVERS_DIR, server_name, "metadata.json")
     try:
-        if os.path.exists(metadata_path):
-            with open(metadata_path, "r") as f:
-                meta = json.load(f)
-        else:
-            meta = {}
-            
-        meta["ram"] = int(ram_mb)
-        
-        with open(metadata_path, "w") as f:
-            json.dump(meta, f, indent=4)
+        get_server_metadata(server_name).update({"ram": int(ram_mb)})
         return True
-    except Exception as e:
+    except (TypeError, ValueError) as e:
         print(f"Failed to set RAM: {e}")
         return False
 
 
 
+def get_server_jvm_profile(server_name):
+    """Gets the JVM flag profile name from metadata.json (default: 'auto')."""
+    return get_server_metadata(server_name).get("jvm_profile", jvm_profiles.DEFAULT_JVM_PROFILE)
+
+def set_server_jvm_profile(server_name, profile):
+    """Sets the JVM flag profile name in metadata.json."""
+    if profile not in jvm_profiles.JVM_PROFILES:
+        print(f"Unknown JVM profile: {profile}")
+        return False
+    get_server_metadata(server_name).update({"jvm_profile": profile})
+    return True
+
+def get_server_cds_enabled(server_name):
+    """Whether class-data-sharing archives are enabled in metadata.json."""
+    return bool(get_server_metadata(server_name).get("cds_enabled", False))
+
+def set_server_cds_enabled(server_name, enabled):
+    """Enables or disables class-data-sharing archives in metadata.json."""
+    get_server_metadata(server_name).update({"cds_enabled": bool(enabled)})
+    return True
+
+def get_server_resource_limits(server_name):
+    """
+    Gets per-server process limits from metadata.json.
+
+    Returns:
+        tuple: (cpu_affinity list or None, process_priority str or None)
+    """
+    meta = get_server_metadata(server_name)
+    return meta.get("cpu_affinity"), meta.get("process_priority")
+
+def get_server_crash_restart(server_name):
+    """Whether a crashed server should be restarted automatically (default: True)."""
+    return bool(get_server_metadata(server_name).get("crash_restart", True))
+
+def set_server_crash_restart(server_name, enabled):
+    """Enables or disables automatic restarts after a crash in metadata.json."""
+    get_server_metadata(server_name).update({"crash_restart": bool(enabled)})
+    return True
+
+def get_boot_history(server_name):
+    """Returns recorded start-to-READY times, oldest first."""
+    return get_server_metadata(server_name).get("boot_history", [])
+
 def play_sound(sound_path):
     if not os.path.exists(sound_path):
         return
@@ -1,9 +1,11 @@
 import customtkinter as ctk
+import multiprocessing
 import os
 import sys
 import threading
 import webbrowser
 import time
+from concurrent.futures import TimeoutError as FuturesTimeout, wait as wait_futures
 
 # --- Tcl/Tk Fix for Windows Virtual Environments ---
 if sys.platform == "win32" and hasattr(sys, 'base_prefix'):
@@ -17,14 +19,22 @@ if sys.platform == "win32" and hasattr(sys, 'base_prefix'):
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.ui_components import ConsoleWidget, ServerListItem, DownloadProgressDialog, TunnelSetupDialog
-from app.logic import load_config, check_java, save_config, download_server, accept_eula, install_fabric, ServerRunner
+from app.logic import load_config, check_java, save_config, download_server, accept_eula, install_fabric
 import app.logic as logic
+from app.config_store import get_config_store
+import app.rcon_client as rcon_client
 from app.constants import SERVERS_DIR, ASSETS_DIR
 from app.playit_manager import PlayitManager
+from app.tunnel_health import TunnelHealthMonitor
 from app.server_wizard import ServerWizard
 from app.server_properties_editor import ServerPropertiesEditor
-from app.scheduler_service import SchedulerService
-from app.server_events import ServerEvent
+from app.server_supervisor import ServerSupervisor
+from app.status_poller import StatusPoller
+from app.command_dispatcher import PRIORITY_HIGH
+from app.scheduler_engine import SchedulerEngine
+from app.fleet_orchestrator import FleetOrchestrator, PHASE_RESTART, PHASE_BACKUP
+from app.chunk_pregenerator import ChunkPregenerator, STATUS_RUNNING, STATUS_PAUSED, STATUS_DONE
+from app.server_events import ServerEvent, OVERFLOW_COALESCE_LATEST
 from app.app_config import AppConfig
 
 ctk.set_appearance_mode("Dark")
@@ -49,18 +59,47 @@ class MCTunnelApp(ctk.CTk):
         self.grid_rowconfigure(0, weight=1)
 
     def _init_state_variables(self):
-        self.server_runner = None
         self.current_server = None
-        self.restart_warnings_sent = set()
         self.claim_url = None
+        self.closing = False
+        self.schedule_cron = None  # Cron expression of the selected server's restart job, if it isn't interval/daily
+        self.runner_listeners = {}  # server name -> (runner, [(event, callback)]) subscribed by start_server_action
 
     def _init_managers(self):
+        self.supervisor = ServerSupervisor(console_callback=self.on_server_console)
+        self.status_poller = StatusPoller(self.supervisor, servers_callback=self.list_server_names)
+        self.status_poller.events.on(ServerEvent.STATUS, self.on_server_status, queued=True)
+        get_config_store().subscribe(self.on_config_changed)
+        self.fleet = FleetOrchestrator(player_count=self._player_count, console_callback=self.on_server_console)
+        self.pregen = ChunkPregenerator(get_runner=self.supervisor.get, console_callback=self.on_server_console,
+                                        on_progress=self.on_pregen_progress)
+        self.scheduler_engine = SchedulerEngine(
+            servers_callback=self.list_server_names,
+            is_running=self.supervisor.is_running,
+            on_warning=self.send_restart_warning,
+            on_restart=self.on_scheduled_restart,
+            on_job=self.run_scheduled_job,
+            player_count=self._player_count
+        )
         self.playit_manager = PlayitManager(
             console_callback=self.update_tunnel_console,
             status_callback=self.update_playit_status,
             claim_callback=self.on_playit_claim,
             on_ready_callback=self.play_notification_sound
         )
+        self.tunnel_health = TunnelHealthMonitor(
+            self.playit_manager,
+            console_callback=self.update_tunnel_console,
+            health_callback=self.update_tunnel_health,
+            local_server_up=lambda: bool(self.supervisor.ready_servers())
+        )
+
+    @property
+    def server_runner(self):
+        """Runner of the selected server (the supervisor owns one per server)."""
+        if not self.current_server:
+            return None
+        return self.supervisor.get(self.current_server)
 
     # ... [Keep _build_sidebar, _build_layout, _build_main_area unchanged] ...
     def _build_layout(self):
@@ -150,6 +189,8 @@ class MCTunnelApp(ctk.CTk):
         self.lbl_tunnel_status.pack(side="left", padx=20)
         self.lbl_public_ip = ctk.CTkLabel(self.tunnel_frame, text="Public IP: N/A", font=("Roboto Medium", 12))
         self.lbl_public_ip.pack(side="left", padx=20)
+        self.lbl_tunnel_latency = ctk.CTkLabel(self.tunnel_frame, text="", text_color=AppConfig.COLOR_TEXT_GRAY, font=AppConfig.FONT_BODY)
+        self.lbl_tunnel_latency.pack(side="left", padx=10)
 
         self.tunnel_toolbar = ctk.CTkFrame(self.tunnel_frame, fg_color="transparent")
         self.tunnel_toolbar.pack(side="right", padx=10)
@@ -188,6 +229,20 @@ class MCTunnelApp(ctk.CTk):
         self.btn_apply_schedule = ctk.CTkButton(scheduler_container, text="Apply", width=70, command=self.save_scheduler_dashboard, fg_color=AppConfig.COLOR_BTN_PRIMARY, hover_color=AppConfig.COLOR_BTN_PRIMARY_HOVER, corner_radius=8, height=32)
         self.btn_apply_schedule.grid(row=1, column=4, padx=5)
 
+        # Replaces the mode/value inputs for cron restart jobs, which only the editor can change
+        self.lbl_schedule_cron = ctk.CTkLabel(scheduler_container, text="", text_color=AppConfig.COLOR_TEXT_GRAY, font=("Roboto", 12))
+
+        pregen_container = ctk.CTkFrame(self.management_frame, fg_color="transparent")
+        pregen_container.pack(side="left", padx=20)
+
+        ctk.CTkLabel(pregen_container, text="Pre-generation:", font=("Roboto Medium", 12)).grid(row=0, column=0, padx=5, sticky="w", columnspan=3)
+        self.lbl_pregen = ctk.CTkLabel(pregen_container, text="Idle", text_color=AppConfig.COLOR_TEXT_GRAY, font=("Roboto", 12), width=110, anchor="w")
+        self.lbl_pregen.grid(row=1, column=0, padx=5)
+        self.btn_pregen = ctk.CTkButton(pregen_container, text="Start", width=70, command=self.pregen_action, fg_color=AppConfig.COLOR_BTN_PRIMARY, hover_color=AppConfig.COLOR_BTN_PRIMARY_HOVER, corner_radius=8, height=32)
+        self.btn_pregen.grid(row=1, column=1, padx=2)
+        self.btn_pregen_cancel = ctk.CTkButton(pregen_container, text="✕", width=32, command=self.cancel_pregen_action, fg_color="gray", hover_color="gray30", corner_radius=8, height=32)
+        self.btn_pregen_cancel.grid(row=1, column=2, padx=2)
+
         self.backup_frame = ctk.CTkFrame(self.management_frame, fg_color="transparent")
         self.backup_frame.pack(side="right", padx=20, fill="x", expand=True)
         self.backup_frame.grid_columnconfigure(1, weight=1)
@@ -223,87 +278,135 @@ class MCTunnelApp(ctk.CTk):
         self.tunnel_console = ConsoleWidget(self.console_tabs.tab("Tunnel Log"))
         self.tunnel_console.pack(fill="both", expand=True)
 
-    # ... [Keep init_background_services, start_scheduler, etc. unchanged until send_restart_warning] ...
+    # ... [Keep init_background_services, etc. unchanged until send_restart_warning] ...
     def _init_background_services(self):
         self.check_java_startup()
         self.load_servers()
-        self.start_scheduler()
-
-    def start_scheduler(self):
-        def _scheduler_loop():
-            while True:
-                time.sleep(AppConfig.SCHEDULER_CHECK_INTERVAL)
-                if not (self.server_runner and self.server_runner.running and self.current_server):
-                    continue
-                
-                # ... (rest of logic same as before)
-                service = SchedulerService(self.current_server)
-                status = service.get_status()
-                if not status: continue
-
-                key, message = service.get_warning_message(status["remaining_seconds"], self.restart_warnings_sent)
-                if key:
-                    self.send_restart_warning(message)
-                    self.restart_warnings_sent.add(key)
-                
-                if status["is_due"]:
-                    self.server_console.log("[System] Scheduled restart due. Initiating final countdown...")
-                    self.restart_server_sequence()
-                    service.scheduler.update_last_run()
-                    self.restart_warnings_sent.clear()
+        self.status_poller.start()
+        self.scheduler_engine.start()
 
-        threading.Thread(target=_scheduler_loop, daemon=True).start()
-
-    def send_restart_warning(self, message):
+    def send_restart_warning(self, server_name, message):
         """Sends a restart warning to players safely."""
-        if self.server_runner and self.server_runner.running:
-            self.server_console.log(f"[System] {message}")
-            # FIX: Use safe method instead of raw stdin access
-            self.server_runner.send_command(f"say {message}")
+        runner = self.supervisor.get(server_name)
+        if runner and runner.running:
+            self.on_server_console(server_name, f"[System] {message}")
+            runner.send_command(f"say {message}")
+
+    def _player_count(self, server_name):
+        runner = self.supervisor.get(server_name)
+        return runner.player_count if runner and runner.running else 0
+
+    def on_scheduled_restart(self, server_name):
+        self.on_server_console(server_name, "[System] Scheduled restart due. Initiating final countdown...")
+        self.restart_server_sequence(server_name)
+
+    def run_scheduled_job(self, server_name, job):
+        """Runs a scheduled backup, broadcast, console command or chunk pre-generation."""
+        action, args = job["action"], job.get("args", {})
+        log = lambda text: self.on_server_console(server_name, text)
+        runner = self.supervisor.get(server_name)
+
+        if action == "backup":
+            def _backup():
+                # Looked up again: the backup may have waited in the fleet queue
+                runner = self.supervisor.get(server_name)
+                running = bool(runner and runner.running)
+                log("[System] Scheduled backup started.")
+                if running:
+                    # Pause autosaves and flush the world so the zip holds a consistent save
+                    runner.send_command("save-off")
+                    handle = runner.send_command("save-all flush")
+                    if handle and not handle.wait(AppConfig.COMMAND_REPLY_TIMEOUT):
+                        log("[Warning] World save did not confirm in time. Backing up anyway.")
+                try:
+                    path = logic.BackupManager(server_name).create_backup()
+                finally:
+                    if running and runner.running:
+                        runner.send_command("save-on")
+                if not path:
+                    raise RuntimeError("Scheduled backup failed.")
+                log(f"[System] Scheduled backup created: {os.path.basename(path)}")
+                if server_name == self.current_server:
+                    self.after(0, self.update_management_ui)
+            # Backups share the fleet's slots with restarts so disks aren't saturated
+            self.fleet.submit(server_name, PHASE_BACKUP, _backup)
+        elif action in ("broadcast", "command"):
+            # The server may have stopped since the engine checked it
+            if not (runner and runner.running):
+                log(f"[System] Scheduled {action} skipped: the server is not running.")
+            elif action == "broadcast":
+                message = args.get("message", "")
+                log(f"[System] Broadcast: {message}")
+                runner.send_command(f"say {message}")
+            else:
+                runner.send_command(args.get("command", ""))
+        elif action == "pregen":
+            radius = int(args.get("radius", AppConfig.PREGEN_DEFAULT_RADIUS))
+            log(f"[System] Scheduled chunk pre-generation (radius {radius}).")
+            self.pregen.start(server_name, radius)
+
+    def restart_server_sequence(self, server_name=None):
+        """
+        Handles the automated restart sequence with final countdown. The restart waits
+        in the fleet queue until no more than FLEET_MAX_CONCURRENT servers restart or
+        back up at once; the phase ends when the server is ready again.
+        """
+        server_name = server_name or self.current_server
+        if not server_name: return
+        log = lambda text: self.on_server_console(server_name, text)
 
-    def restart_server_sequence(self):
-        """Handles the automated restart sequence with final countdown."""
         def _restart():
+            # The server may have been stopped while this phase waited in the fleet queue
+            if not self.supervisor.is_running(server_name):
+                log("[System] Scheduled restart skipped: the server is no longer running.")
+                return
+
             # Final 5-second countdown
             for i in [5, 4, 3, 2]:
-                if self.server_runner and self.server_runner.running:
-                    self.server_console.log(f"[System] Restarting in {i}...")
+                runner = self.supervisor.get(server_name)
+                if runner and runner.running:
+                    log(f"[System] Restarting in {i}...")
                     # FIX: Use safe method
-                    self.server_runner.send_command(f"say Restarting in {i}...")
+                    runner.send_command(f"say Restarting in {i}...")
                 time.sleep(1)
             
             # Final message
-            if self.server_runner and self.server_runner.running:
-                self.server_console.log("[System] Restarting NOW!")
-                self.server_runner.send_command("say Restarting NOW!")
+            runner = self.supervisor.get(server_name)
+            if runner and runner.running:
+                log("[System] Restarting NOW!")
+                runner.send_command("say Restarting NOW!")
             
             time.sleep(1)
+            if not self.supervisor.is_running(server_name):
+                log("[System] Scheduled restart cancelled: the server was stopped during the countdown.")
+                return
             
-            # Stop Server (Main Thread safe call)
-            self.after(0, self.stop_server_action)
-            
-            # Wait for it to actually stop
-            timeout = AppConfig.SERVER_STOP_TIMEOUT
-            while timeout > 0:
-                if not self.server_runner: break
-                time.sleep(1)
-                timeout -= 1
+            # Stop Server and wait for it to actually exit (the stop never blocks the UI thread)
+            try:
+                self.supervisor.stop(server_name).result(timeout=AppConfig.STOP_HARD_TIMEOUT + AppConfig.SERVER_STOP_TIMEOUT)
+            except FuturesTimeout:
+                raise RuntimeError("Server did not stop in time. Scheduled restart aborted.")
             
-            time.sleep(5) # Cooldown
+            time.sleep(AppConfig.RESTART_COOLDOWN) # Cooldown
             
             # Start Server (Main Thread safe call)
-            self.after(0, self.start_server_action)
+            self.after(0, lambda: self.start_server_action(server_name))
             
-            # Wait for server to start
+            # Wait for server to start, then until it is ready (the boot is the expensive part)
             time.sleep(AppConfig.SERVER_START_WAIT)
-            
+            deadline = time.monotonic() + AppConfig.SUPERVISOR_BOOT_TIMEOUT
+            while self.supervisor.is_active(server_name) and time.monotonic() < deadline:
+                runner = self.supervisor.get(server_name)
+                if runner and runner.running and runner.boot_seconds is not None:
+                    break
+                time.sleep(1)
+
             # Check if restart was successful
-            if self.server_runner and self.server_runner.running:
-                self.server_console.log("[System] ✓ Scheduled restart completed successfully! Server is back online.")
-            else:
-                self.server_console.log("[System] ✗ ERROR: Server failed to restart automatically. Please check logs and start manually.")
-            
-        threading.Thread(target=_restart, daemon=True).start()
+            if not self.supervisor.is_active(server_name):
+                raise RuntimeError("Server failed to restart automatically. Please check logs and start manually.")
+            log("[System] ✓ Scheduled restart completed successfully! Server is back online.")
+
+        self.fleet.submit(server_name, PHASE_RESTART, _restart)
 
     # ... [Keep format_time, send_server_command, check_java, play_sound, load_servers, on_server_select, start_all] ...
     def _format_time_input(self, event=None):
@@ -318,13 +421,24 @@ class MCTunnelApp(ctk.CTk):
             self.entry_restart_time.insert(0, formatted)
 
     def send_server_command(self, event=None):
-        if not self.server_runner or not self.server_runner.running:
-            self.server_console.log("[UI] Server is not running.")
-            return
         cmd = self.entry_console.get()
-        if not cmd: return
-        self.server_runner.send_command(cmd)
+        if not cmd or not self.current_server: return
+        if self.server_runner and self.server_runner.running:
+            self.server_runner.send_command(cmd, priority=PRIORITY_HIGH)
+            self.entry_console.delete(0, "end")
+            return
+
+        # Not launched by this app: fall back to RCON when it is enabled
+        server_name = self.current_server
         self.entry_console.delete(0, "end")
+        def _send_rcon():
+            try:
+                reply = rcon_client.get_rcon_client(server_name).command(cmd)
+                self.on_server_console(server_name, f"> {cmd} (RCON)")
+                self.on_server_console(server_name, reply or "[RCON] (no reply)")
+            except rcon_client.RconError as e:
+                self.on_server_console(server_name, f"[UI] Server is not running. ({e})")
+        threading.Thread(target=_send_rcon, daemon=True).start()
 
     def check_java_startup(self):
         def _check():
@@ -350,10 +464,17 @@ class MCTunnelApp(ctk.CTk):
         except Exception as e:
             self.server_console.log(f"[Error] Failed to play notification sound: {e}")
 
+    def list_server_names(self):
+        if not os.path.exists(SERVERS_DIR): return []
+        # Dot-folders are internal (e.g. benchmark copies), not servers
+        return [d for d in os.listdir(SERVERS_DIR)
+                if not d.startswith(".") and os.path.isdir(os.path.join(SERVERS_DIR, d))]
+
     def load_servers(self):
         for widget in self.server_list_frame.winfo_children(): widget.destroy()
         if not os.path.exists(SERVERS_DIR): os.makedirs(SERVERS_DIR)
-        servers = [d for d in os.listdir(SERVERS_DIR) if os.path.isdir(os.path.join(SERVERS_DIR, d))]
+        servers = self.list_server_names()
+        self.scheduler_engine.sync()
         if not servers:
             lbl = ctk.CTkLabel(self.server_list_frame, text="No servers found.")
             lbl.pack(pady=10)
@@ -372,16 +493,32 @@ class MCTunnelApp(ctk.CTk):
         
         self.lbl_server_info.configure(text=f"🎮 {server_type}", text_color="white")
         
+        # Show this server's own console stream
+        self.server_console.clear()
+        for line in self.supervisor.get_console(server_name):
+            self.server_console.log(line)
+
         # UI State Logic
-        is_running = self.server_runner and self.server_runner.running and self.server_runner.server_name == server_name
+        is_running = self.supervisor.is_active(server_name)
+        runner = self.supervisor.get(server_name)
+        self.lbl_player_count.configure(text=f"Players: {runner.player_count if runner and runner.running else 0}")
         
         self.btn_start.configure(state="disabled" if is_running else "normal")
         self.btn_start_all.configure(state="disabled" if is_running else "normal")
         self.btn_stop.configure(state="normal" if is_running else "disabled")
         
-        if is_running:
+        if self.supervisor.is_restart_pending(server_name):
+            self.lbl_status.configure(text="✖ Crashed, restarting...", text_color=AppConfig.COLOR_STATUS_ERROR)
+            self.btn_edit_properties.configure(state="disabled")
+        elif is_running and not (runner and runner.boot_seconds is not None):
+            self.lbl_status.configure(text="⏳ Starting...", text_color=AppConfig.COLOR_STATUS_STARTING)
+            self.btn_edit_properties.configure(state="disabled")
+        elif is_running:
             self.lbl_status.configure(text="🟢 Running", text_color=AppConfig.COLOR_STATUS_ONLINE)
             self.btn_edit_properties.configure(state="disabled")
+        elif self.status_poller.get(server_name):
+            self._show_external_status(self.status_poller.get(server_name))
+            self.btn_edit_properties.configure(state="disabled")
         else:
             self.lbl_status.configure(text="⚪ Offline", text_color="white")
             props_path = os.path.join(SERVERS_DIR, server_name, "server.properties")
@@ -396,13 +533,14 @@ class MCTunnelApp(ctk.CTk):
         runner = self.start_server_action()
         if runner:
             self.server_console.log("[System] Starting server and tunnel...")
-            runner.events.on(ServerEvent.READY, lambda d: self.after(0, self.start_tunnel))
+            runner.events.on(ServerEvent.READY, lambda: self.after(0, self.start_tunnel))
 
     # ... [Keep update_management_ui, toggle_scheduler, save_scheduler, quick_backup, etc.] ...
     def update_management_ui(self):
         if not self.current_server: return
         scheduler = logic.Scheduler(self.current_server)
         schedule = scheduler.get_schedule()
+        self.show_cron_schedule(schedule["cron"] if schedule and schedule["type"] == "cron" else None)
         if schedule:
             self.var_scheduler_enabled.set(True)
             if schedule["type"] == "interval":
@@ -423,15 +561,78 @@ class MCTunnelApp(ctk.CTk):
         backups = backup_manager.list_backups()
         if backups: self.lbl_last_backup.configure(text=f"Last: {backups[0]['date']}")
         else: self.lbl_last_backup.configure(text="Last Backup: None")
+        self.update_pregen_ui(self.pregen.get_progress(self.current_server))
+
+    def update_pregen_ui(self, progress):
+        if not progress:
+            self.lbl_pregen.configure(text="Idle")
+            self.btn_pregen.configure(text="Start")
+            self.btn_pregen_cancel.configure(state="disabled")
+            return
+        status = progress["status"]
+        if status == STATUS_DONE:
+            self.lbl_pregen.configure(text="✓ Done")
+            self.btn_pregen.configure(text="Start")
+        elif status == STATUS_PAUSED:
+            self.lbl_pregen.configure(text=f"Paused {progress['percent']}%")
+            self.btn_pregen.configure(text="Resume")
+        else:
+            # Waits for the server to be started otherwise
+            text = f"{progress['percent']}% (x{progress['batch']})" if progress["active"] else f"Queued {progress['percent']}%"
+            self.lbl_pregen.configure(text=text)
+            self.btn_pregen.configure(text="Pause")
+        self.btn_pregen_cancel.configure(state="normal")
+
+    def on_pregen_progress(self, server_name, progress):
+        if server_name == self.current_server:
+            self.after(0, lambda: self.update_pregen_ui(progress))
+
+    def pregen_action(self):
+        if not self.current_server: return
+        progress = self.pregen.get_progress(self.current_server)
+        if progress and progress["status"] == STATUS_RUNNING:
+            self.pregen.pause(self.current_server)
+        elif progress and progress["status"] == STATUS_PAUSED:
+            self.pregen.resume(self.current_server)
+        else:
+            value = ctk.CTkInputDialog(text="Radius to pre-generate around 0, 0 (blocks):",
+                                       title="Chunk Pre-generation").get_input()
+            if value is None: return
+            value = value.strip() or str(AppConfig.PREGEN_DEFAULT_RADIUS)
+            if not value.isdigit() or int(value) < 16:
+                self.server_console.log("[Error] The radius must be a number of blocks (16 or more).")
+                return
+            self.pregen.start(self.current_server, int(value))
+
+    def cancel_pregen_action(self):
+        if self.current_server:
+            self.pregen.cancel(self.current_server)
 
     def toggle_scheduler_inputs(self):
         enabled = self.var_scheduler_enabled.get()
-        state = "normal" if enabled else "disabled"
+        state = "normal" if enabled and not self.schedule_cron else "disabled"
         self.combo_schedule_mode.configure(state=state)
         self.entry_scheduler_interval.configure(state=state)
         self.entry_restart_time.configure(state=state)
         self.btn_apply_schedule.configure(state=state)
 
+    def show_cron_schedule(self, cron):
+        """Shows a cron restart job read-only (None: back to the interval/daily inputs)."""
+        self.schedule_cron = cron
+        if cron:
+            self.combo_schedule_mode.grid_forget()
+            self.entry_scheduler_interval.grid_forget()
+            self.lbl_interval_unit.grid_forget()
+            self.entry_restart_time.grid_forget()
+            self.lbl_schedule_cron.configure(text=f"Cron {cron} (edit in Properties → Automation)")
+            self.lbl_schedule_cron.grid(row=1, column=1, padx=5, columnspan=3, sticky="w")
+            self.chk_scheduler.configure(state="disabled")
+        elif self.lbl_schedule_cron.winfo_manager():
+            self.lbl_schedule_cron.grid_forget()
+            self.combo_schedule_mode.grid(row=1, column=1, padx=5)
+            self.toggle_schedule_mode()
+            self.chk_scheduler.configure(state="normal")
+
     def toggle_schedule_mode(self, mode=None):
         if mode is None: mode = self.combo_schedule_mode.get()
         if mode == "Interval":
@@ -448,6 +649,13 @@ class MCTunnelApp(ctk.CTk):
         enabled = self.var_scheduler_enabled.get()
         mode = self.combo_schedule_mode.get()
         scheduler = logic.Scheduler(self.current_server)
+        schedule = scheduler.get_schedule()
+        if schedule and schedule["type"] == "cron":
+            # Saving interval/daily fields would drop the cron expression
+            self.server_console.log("[Error] This restart uses a cron schedule. Change it in Properties → Automation.")
+            self.show_cron_schedule(schedule["cron"])
+            self.toggle_scheduler_inputs()
+            return
         if mode == "Interval":
             interval = AppConfig.DEFAULT_INTERVAL_HOURS
             try: interval = int(self.entry_scheduler_interval.get())
@@ -493,49 +701,131 @@ class MCTunnelApp(ctk.CTk):
     def update_console(self, text):
         self.after(0, lambda: self.server_console.log(text))
 
+    def on_server_console(self, server_name, text):
+        """Console lines from any supervised server; only the selected one is displayed."""
+        def _log():
+            if server_name == self.current_server:
+                self.server_console.log(text)
+        self.after(0, _log)
+
     def update_tunnel_console(self, text):
         self.after(0, lambda: self.tunnel_console.log(text))
 
-    def start_server_action(self):
-        self.server_console.log("[Debug] start_server_action called.")
-        if not self.current_server: return
-        if self.server_runner and self.server_runner.running:
-            self.server_console.log("[Error] A server is already running.")
-            return
+    def start_server_action(self, server_name=None):
+        server_name = server_name or self.current_server
+        if not server_name: return
         
         config = load_config()
         ram = config.get("ram_allocation", "2G")
-        self.server_runner = ServerRunner(self.current_server, ram, self.update_console)
-        
-        self.server_runner.events.on(ServerEvent.READY, self.on_server_ready)
-        self.server_runner.events.on(ServerEvent.STOPPED, self.on_server_stopped)
-        self.server_runner.events.on(ServerEvent.PLAYER_COUNT, self.on_player_count_update)
+        runner = self.supervisor.start(server_name, ram)
+        if not runner: return
         
-        self.server_runner.start()
+        # UI/sound listeners are queued so the console reader thread never waits on Tk;
+        # player counts only need the latest value
+        self.detach_runner_listeners(server_name)
+        self.runner_listeners[server_name] = (runner, [
+            (ServerEvent.READY, runner.events.on(ServerEvent.READY, lambda: self.on_server_ready(server_name), queued=True)),
+            (ServerEvent.STOPPED, runner.events.on(ServerEvent.STOPPED, lambda: self.on_server_stopped(server_name))),
+            (ServerEvent.PLAYER_COUNT, runner.events.on(
+                ServerEvent.PLAYER_COUNT, lambda count: self.on_player_count_update(server_name, count),
+                queued=True, overflow=OVERFLOW_COALESCE_LATEST)),
+            (ServerEvent.ERROR, runner.events.on(ServerEvent.ERROR, lambda data: self.on_server_error(server_name, data))),
+        ])
         
-        self.lbl_status.configure(text="⏳ Starting...", text_color=AppConfig.COLOR_STATUS_STARTING)
-        self.btn_start.configure(state="disabled")
-        self.btn_start_all.configure(state="disabled")
-        self.btn_stop.configure(state="normal")
-        return self.server_runner
-
-    def on_server_ready(self, data=None):
-        self.after(0, lambda: self.lbl_status.configure(text="🟢 Running", text_color=AppConfig.COLOR_STATUS_ONLINE))
+        if server_name == self.current_server:
+            self.lbl_status.configure(text="⏳ Starting...", text_color=AppConfig.COLOR_STATUS_STARTING)
+            self.btn_start.configure(state="disabled")
+            self.btn_start_all.configure(state="disabled")
+            self.btn_stop.configure(state="normal")
+            self.btn_edit_properties.configure(state="disabled")
+        return runner
+
+    def detach_runner_listeners(self, server_name):
+        """
+        Unsubscribes start_server_action's listeners once a runner is done for good, which
+        also ends the worker threads of the queued ones. Crash restarts reuse the runner,
+        so a crash only detaches them when no restart follows.
+        """
+        runner, subscriptions = self.runner_listeners.pop(server_name, (None, []))
+        for event, callback in subscriptions:
+            runner.events.off(event, callback)
+
+    def on_server_ready(self, server_name):
+        def _update():
+            if server_name == self.current_server:
+                self.lbl_status.configure(text="🟢 Running", text_color=AppConfig.COLOR_STATUS_ONLINE)
+        self.after(0, _update)
         self.after(0, self.play_notification_sound)
+        self.status_poller.poll_now(server_name)
+        self.pregen.on_server_ready(server_name)
 
-    def on_player_count_update(self, count):
-        self.after(0, lambda: self.lbl_player_count.configure(text=f"Players: {count}"))
+    def on_player_count_update(self, server_name, count):
+        self.scheduler_engine.on_player_count(server_name, count)
+        def _update():
+            if server_name == self.current_server:
+                self.lbl_player_count.configure(text=f"Players: {count}")
+        self.after(0, _update)
 
-    def on_server_stopped(self, data=None):
-        self.after(0, lambda: self.lbl_status.configure(text="⚪ Offline", text_color=AppConfig.COLOR_STATUS_OFFLINE))
-        self.after(0, lambda: self.btn_start.configure(state="normal"))
-        self.after(0, lambda: self.btn_start_all.configure(state="normal"))
-        self.after(0, lambda: self.btn_stop.configure(state="disabled"))
+    def on_server_status(self, data):
+        """Server List Ping result from the status poller (any server, launched here or not)."""
+        def _update():
+            if data["server"] != self.current_server: return
+            status = data["status"]
+            if self.supervisor.is_active(data["server"]):
+                if status:
+                    self.lbl_player_count.configure(text=f"Players: {status.players_online}/{status.players_max}")
+            elif status:
+                self._show_external_status(status)
+            elif self.lbl_status.cget("text").startswith("🟢"):
+                # An externally started server went away
+                self.lbl_status.configure(text="⚪ Offline", text_color="white")
+                self.lbl_player_count.configure(text="Players: 0")
+        self.after(0, _update)
 
-    def stop_server_action(self):
-        if self.server_runner:
-            self.server_runner.stop()
-            self.on_server_stopped()
+    def _show_external_status(self, status):
+        """Shows a server that answers pings but was not started by this app."""
+        self.lbl_status.configure(text=f"🟢 Running (external, {status.version})", text_color=AppConfig.COLOR_STATUS_ONLINE)
+        self.lbl_player_count.configure(text=f"Players: {status.players_online}/{status.players_max}")
+
+    def on_server_stopped(self, server_name):
+        runner = self.supervisor.get(server_name)
+        if runner and not runner.running and not runner.crashed:
+            self.detach_runner_listeners(server_name)
+        def _update():
+            if server_name != self.current_server: return
+            self.lbl_status.configure(text="⚪ Offline", text_color=AppConfig.COLOR_STATUS_OFFLINE)
+            self.lbl_player_count.configure(text="Players: 0")
+            self.btn_start.configure(state="normal")
+            self.btn_start_all.configure(state="normal")
+            self.btn_stop.configure(state="disabled")
+            self.btn_edit_properties.configure(state="normal")
+        self.after(0, _update)
+
+    def on_server_error(self, server_name, data):
+        # The supervisor's own ERROR listener has already scheduled any automatic restart
+        if not self.supervisor.is_restart_pending(server_name):
+            self.detach_runner_listeners(server_name)
+        def _update():
+            if server_name != self.current_server: return
+            if self.supervisor.is_restart_pending(server_name):
+                # Stop stays available: it cancels the automatic restart
+                self.lbl_status.configure(text="✖ Crashed, restarting...", text_color=AppConfig.COLOR_STATUS_ERROR)
+                self.btn_start.configure(state="disabled")
+                self.btn_start_all.configure(state="disabled")
+                self.btn_stop.configure(state="normal")
+                self.btn_edit_properties.configure(state="disabled")
+            else:
+                self.lbl_status.configure(text="✖ Crashed", text_color=AppConfig.COLOR_STATUS_ERROR)
+        self.after(0, _update)
+
+    def stop_server_action(self, server_name=None):
+        server_name = server_name or self.current_server
+        if not server_name: return
+        self.supervisor.stop(server_name)
+        runner = self.supervisor.get(server_name)
+        if runner and not runner.running:
+            # Cancelled a queued start or a pending crash restart: no STOPPED from the process follows
+            self.detach_runner_listeners(server_name)
 
     def create_server_dialog(self):
         ServerWizard(self, on_complete_callback=self.on_wizard_complete)
@@ -569,6 +859,7 @@ class MCTunnelApp(ctk.CTk):
                     logic.apply_server_settings(name, config["ram"], config["seed"], config["game_mode"], 
                                               config["difficulty"], config["view_distance"], config["simulation_distance"])
                     if config.get("icon_path"): logic.save_server_icon(name, config["icon_path"])
+                    if config.get("pregen_radius"): self.pregen.start(name, config["pregen_radius"])
                     
                     self.server_console.log(f"[System] Server '{name}' created successfully.")
                     self.after(0, lambda: self._on_download_complete(dialog))
@@ -588,14 +879,17 @@ class MCTunnelApp(ctk.CTk):
         self.btn_tunnel_start.configure(state="disabled")
         self.btn_tunnel_stop.configure(state="normal")
         threading.Thread(target=self.playit_manager.start, daemon=True).start()
+        self.tunnel_health.start()
 
     def stop_tunnel(self):
+        self.tunnel_health.stop()
         self.playit_manager.stop()
         self.btn_tunnel_start.configure(state="normal")
         self.btn_tunnel_stop.configure(state="disabled")
 
     def reset_tunnel(self):
         if ctk.CTkInputDialog(text="Type 'yes' to confirm reset:", title="Confirm Reset").get_input() != "yes": return
+        self.tunnel_health.stop()
         self.playit_manager.reset()
         config = load_config()
         if "playit_dns" in config:
@@ -627,8 +921,29 @@ class MCTunnelApp(ctk.CTk):
                 self.btn_tunnel_start.configure(state="normal")
                 self.btn_tunnel_stop.configure(state="disabled")
                 self.btn_claim.pack_forget()
+                self.lbl_tunnel_latency.configure(text="")
+            elif status == "Starting...":
+                # Also reached when the health monitor restarts the agent
+                self.btn_tunnel_start.configure(state="disabled")
+                self.btn_tunnel_stop.configure(state="normal")
+        self.after(0, _update)
+
+    def update_tunnel_health(self, stats):
+        def _update():
+            last = stats["last"]
+            if last and last["ok"] and last["ping_ms"] is None:
+                # No server behind the tunnel: only the TCP connect was checked
+                self.lbl_tunnel_latency.configure(text=f"Connect: {last['connect_ms']:.0f} ms", text_color=AppConfig.COLOR_TEXT_GRAY)
+            elif last and last["ok"]:
+                self.lbl_tunnel_latency.configure(text=f"Ping: {last['ping_ms']:.0f} ms", text_color=AppConfig.COLOR_TEXT_GRAY)
+            elif last:
+                self.lbl_tunnel_latency.configure(text="Ping: unreachable", text_color=AppConfig.COLOR_STATUS_ERROR)
         self.after(0, _update)
 
+    def on_config_changed(self, config, changed):
+        if "playit_dns" in changed and config.get("playit_dns") and self.playit_manager.current_address:
+            self.after(0, lambda: self.lbl_public_ip.configure(text=f"Public IP: {config['playit_dns']}"))
+
     def on_playit_claim(self, url):
         self.claim_url = url
         def _show_ui():
@@ -645,8 +960,6 @@ class MCTunnelApp(ctk.CTk):
                     config["playit_dns"] = dns_name
                     save_config(config)
                     self.server_console.log(f"[System] Saved Playit DNS: {dns_name}")
-                    if self.playit_manager.current_address:
-                        self.lbl_public_ip.configure(text=f"Public IP: {dns_name}")
                 else:
                     self.server_console.log("[System] DNS entry skipped.")
             
@@ -662,12 +975,31 @@ class MCTunnelApp(ctk.CTk):
         else: self.tunnel_console.log(f"[Error] No claim URL available yet.")
 
     def on_close(self):
-        if self.server_runner: self.server_runner.stop()
-        if self.playit_manager: self.playit_manager.stop()
+        if self.closing: return
+        self.closing = True
+        # The window goes away at once; servers get the chance to finish saving in the
+        # background (waiting here would freeze the Tk thread for up to STOP_HARD_TIMEOUT)
+        self.withdraw()
+
+        def _shutdown():
+            try:
+                wait_futures(self.supervisor.stop_all(), timeout=AppConfig.STOP_HARD_TIMEOUT)
+                rcon_client.close_all()
+                self.status_poller.stop()
+                self.tunnel_health.stop()
+                if self.playit_manager: self.playit_manager.stop()
+            finally:
+                self.after(0, self._exit)
+        threading.Thread(target=_shutdown, daemon=True).start()
+
+    def _exit(self):
         self.destroy()
         sys.exit(0)
 
 if __name__ == "__main__":
+    # In the frozen (PyInstaller) build, world analyzer workers re-run this entry point:
+    # this turns them back into workers instead of opening another window
+    multiprocessing.freeze_support()
     app = MCTunnelApp()
     app.protocol("WM_DELETE_WINDOW", app.on_close)
     app.mainloop()
\ No newline at end of file
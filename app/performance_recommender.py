@@ -0,0 +1,102 @@
+import collections
+
+import psutil
+
+import app.jvm_profiles as jvm_profiles
+
+HostInfo = collections.namedtuple("HostInfo", "cores total_ram_mb available_ram_mb")
+
+# properties: dict of recommended values; jvm_profile: profile name;
+# reasons: {key: why} for every recommended value; warnings: list of str
+Recommendation = collections.namedtuple("Recommendation", "properties jvm_profile reasons warnings")
+
+# Heap the server itself needs before players are counted (world, plugins, caches)
+BASE_HEAP_MB = 1024
+
+# (heap MB per player, view-distance): each step roughly doubles the loaded chunks
+VIEW_DISTANCE_TIERS = [(512, 12), (256, 10), (128, 8), (0, 6)]
+# (min cores, simulation-distance)
+SIMULATION_DISTANCE_TIERS = [(8, 10), (4, 8), (0, 6)]
+
+
+def detect_host():
+    """Reads the host's logical core count and RAM."""
+    memory = psutil.virtual_memory()
+    return HostInfo(psutil.cpu_count() or 1, memory.total // (1024 * 1024), memory.available // (1024 * 1024))
+
+
+def _tier(value, tiers):
+    return next(result for threshold, result in tiers if value >= threshold)
+
+
+def recommend(host, ram_mb, players):
+    """
+    Computes a property set and JVM profile for a server.
+
+    Args:
+        host (HostInfo): Host cores and RAM (see detect_host()).
+        ram_mb (int): The server's RAM allocation.
+        players (int): Players expected online at the same time.
+
+    Returns:
+        Recommendation
+    """
+    players = max(1, int(players))
+    props, reasons, warnings = {}, {}, []
+
+    # View distance drives chunk memory: budget the heap left after the base per player
+    per_player_mb = max(0, ram_mb - BASE_HEAP_MB) / players
+    view_distance = _tier(per_player_mb, VIEW_DISTANCE_TIERS)
+    if host.cores <= 2:
+        view_distance = min(view_distance, 8)
+    props["view-distance"] = str(view_distance)
+    reasons["view-distance"] = f"~{per_player_mb:.0f} MB heap per player on {host.cores} cores"
+
+    # Simulation distance drives tick cost (entities, redstone, crops): budget by cores
+    simulation_distance = _tier(host.cores, SIMULATION_DISTANCE_TIERS)
+    if players >= 20:
+        simulation_distance = min(simulation_distance, 6)
+    simulation_distance = min(simulation_distance, view_distance)
+    props["simulation-distance"] = str(simulation_distance)
+    reasons["simulation-distance"] = f"{host.cores} cores for {players} player(s), never above view-distance"
+
+    props["sync-chunk-writes"] = "false"
+    reasons["sync-chunk-writes"] = "Writes chunks off the main thread; saves are still flushed on stop"
+
+    # Compression trades CPU for bandwidth; the tunnel makes bandwidth the scarcer one
+    props["network-compression-threshold"] = "512" if host.cores <= 2 else "256"
+    reasons["network-compression-threshold"] = ("Compress fewer packets to spare a small CPU" if host.cores <= 2
+                                                else "Compress most packets to save tunnel bandwidth")
+
+    props["entity-broadcast-range-percentage"] = "75" if host.cores <= 2 or players >= 20 else "100"
+    reasons["entity-broadcast-range-percentage"] = ("Send fewer entity updates" if props["entity-broadcast-range-percentage"] == "75"
+                                                    else "Full entity range; the host has headroom")
+
+    profile = jvm_profiles.recommend_profile(ram_mb, host.cores)
+    reasons["jvm_profile"] = jvm_profiles.JVM_PROFILES[profile]["desc"]
+
+    if ram_mb > host.total_ram_mb * 0.8:
+        warnings.append(f"The RAM allocation ({ram_mb} MB) is over 80% of the host's {host.total_ram_mb} MB; "
+                        f"the OS and other servers may start swapping.")
+    if ram_mb < BASE_HEAP_MB + 128 * players:
+        warnings.append(f"{ram_mb} MB is tight for {players} player(s); consider at least "
+                        f"{BASE_HEAP_MB + 128 * players} MB.")
+
+    return Recommendation(props, profile, reasons, warnings)
+
+
+def diff(current_props, current_profile, recommendation):
+    """
+    Returns the recommended changes as (key, current value, recommended value, reason),
+    with the JVM profile under the key "jvm_profile".
+    """
+    changes = []
+    for key, value in recommendation.properties.items():
+        current = current_props.get(key)
+        if current != value:
+            changes.append((key, current, value, recommendation.reasons.get(key, "")))
+    # "auto" already resolves to the recommended profile at every start
+    if current_profile not in ("auto", recommendation.jvm_profile):
+        changes.append(("jvm_profile", current_profile, recommendation.jvm_profile,
+                        recommendation.reasons.get("jvm_profile", "")))
+    return changes
@@ -0,0 +1,103 @@
+import re
+from collections import namedtuple
+
+# Noisy agent lines that are parsed but not shown in the console (unless they contain ERROR)
+SPAM_LOGS = [
+    "tunnel running",
+    "udp channel requires auth",
+    "udp session details received",
+    "send KeepAlive",
+    "agent registered details",
+    "authenticate control last_pong",
+    "session expired reason=SessionNotSetup",
+    "failed to send initial ping error=Os { code: 10051", # IPv6 noise on Windows
+    "failed to send initial ping error=Os { code: 101",   # IPv6 noise on Linux
+    "failed to ping tunnel server",
+    "failed to parse json", # Messy API errors
+    "ReqProtoRegister"
+]
+
+# Stripped from the raw bytes, before decoding
+ANSI_ESCAPE = re.compile(rb"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
+# All spam substrings in one alternation: a single scan per line instead of one `in` per entry
+SPAM_PATTERN = re.compile("|".join(re.escape(s) for s in SPAM_LOGS))
+
+# Everything the manager reacts to, as alternatives of one pattern so a line is scanned
+# once. Every alternative starts with a literal and there are no capture groups, which
+# lets re skip ahead on the first character; that keeps the scan cheap on the (vast
+# majority of) lines that match nothing. Domains are matched on their suffix and
+# extended backwards afterwards. Example lines:
+#   "Visit https://playit.gg/claim/abc123 to claim this agent"
+#   "address example.gl.joinmc.link => 127.0.0.1:25565"
+#   "tunnel_addr: 209.25.140.1:5525"
+LINE_PATTERN = re.compile(
+    r"https://playit\.gg/claim/[a-zA-Z0-9]+"
+    r"|\.(?:ply|playit)\.gg|\.joinmc\.link"
+    r"|tunnel_addr:\s*[0-9]+\.[0-9]+\.[0-9]+\.[0-9]+:[0-9]+"
+    r"|tunnel running"
+    r"|AgentDisabledOverLimit|Account limit reached"
+    r"|AgentVersionTooOld"
+)
+
+DOMAIN_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-.")
+
+
+def _domain_start(text, suffix_start):
+    """Index where the hostname ending in the suffix at suffix_start begins."""
+    start = suffix_start
+    while start > 0 and text[start - 1] in DOMAIN_CHARS:
+        start -= 1
+    return start
+
+
+PlayitLine = namedtuple("PlayitLine", [
+    "text",          # Decoded line without ANSI codes
+    "show",          # False for spam lines (unless they report an ERROR)
+    "claim_url",     # https://playit.gg/claim/... or None
+    "address",       # Tunnel domain (preferred) or tunnel_addr IP:PORT, or None
+    "running",       # Contains "tunnel running"
+    "limit_reached", # Agent/account limit error
+    "too_old",       # Agent version rejected
+])
+
+
+def parse_line(raw):
+    """
+    Parses one raw line of agent output in a single pass.
+
+    Args:
+        raw (bytes): Line without its line terminator.
+
+    Returns:
+        PlayitLine: Or None for blank lines.
+    """
+    text = ANSI_ESCAPE.sub(b"", raw).decode("utf-8", errors="replace").strip()
+    if not text:
+        return None
+
+    claim_url = domain = ip = None
+    running = limit_reached = too_old = False
+    for match in LINE_PATTERN.finditer(text):
+        token = match.group()
+        if token[0] == ".":
+            start = _domain_start(text, match.start())
+            if domain is None and start < match.start():
+                domain = text[start:match.end()].rstrip(".")
+        elif token.startswith("https"):
+            claim_url = claim_url or token
+        elif token.startswith("tunnel_addr"):
+            ip = ip or token.partition(":")[2].strip()
+        elif token == "tunnel running":
+            running = True
+        elif token == "AgentVersionTooOld":
+            too_old = True
+        else:
+            limit_reached = True
+
+    # Relay hosts like "*.at.ply.gg" are not the public address
+    if domain and "at.ply.gg" in domain:
+        domain = None
+
+    show = "ERROR" in text or not SPAM_PATTERN.search(text)
+    return PlayitLine(text, show, claim_url, domain or ip, running, limit_reached, too_old)
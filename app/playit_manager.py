@@ -8,6 +8,7 @@ import re
 import time
 
 from app.constants import BIN_DIR, CONFIG_DIR, PLAYIT_VERSION, PLAYIT_URL_WINDOWS, PLAYIT_URL_LINUX
+from app.playit_log_parser import parse_line
 
 class PlayitManager:
     def __init__(self, console_callback, status_callback, claim_callback, on_ready_callback=None):
@@ -27,6 +28,7 @@ class PlayitManager:
         self.binary_path = self._get_binary_path()
         self.claim_url_detected = False
         self.current_address = None
+        self.tunnel_endpoint = None  # Last tunnel_addr IP:PORT
 
     def _get_binary_path(self):
         system = platform.system()
@@ -93,6 +95,7 @@ class PlayitManager:
 
         self.claim_url_detected = False
         self.current_address = None
+        self.tunnel_endpoint = None
 
         if not self.ensure_binary():
             self.console_callback("[Debug] Binary check failed.")
@@ -149,6 +152,7 @@ class PlayitManager:
         # We manually set running to False just in case, though reader thread does it too
         self.running = False
         self.current_address = None
+        self.tunnel_endpoint = None
         self.status_callback("Offline", None)
 
     def reset(self):
@@ -169,123 +173,84 @@ class PlayitManager:
             self.console_callback("[Playit] Agent reset complete. You can now start a new tunnel.")
             self.claim_url_detected = False # Reset this too
             self.current_address = None
+            self.tunnel_endpoint = None
         except Exception as e:
             self.console_callback(f"[Playit] Reset failed: {e}")
 
-    SPAM_LOGS = [
-        "tunnel running",
-        "udp channel requires auth",
-        "udp session details received",
-        "send KeepAlive",
-        "agent registered details",
-        "authenticate control last_pong",
-        "session expired reason=SessionNotSetup",
-        "failed to send initial ping error=Os { code: 10051", # IPv6 noise on Windows
-        "failed to send initial ping error=Os { code: 101",   # IPv6 noise on Linux
-        "failed to ping tunnel server",
-        "failed to parse json", # Messy API errors
-        "ReqProtoRegister"
-    ]
+    READ_CHUNK_SIZE = 65536
+    LINE_SPLIT = re.compile(rb"[\r\n]+")
 
     def _read_output(self):
-        """Reads stdout from the process character by character (binary)."""
+        """Reads stdout from the process in large chunks and splits it into lines."""
         self.console_callback("[Debug] Output reader thread started.")
         try:
-            buffer = bytearray()
+            fd = self.process.stdout.fileno()
+            pending = b""
             while self.running and self.process:
-                # Read 1 byte
-                # self.console_callback("[Debug] Waiting for byte...") # Too spammy?
-                byte = self.process.stdout.read(1)
-                if not byte:
+                # Returns as soon as any output is available, up to READ_CHUNK_SIZE bytes
+                chunk = os.read(fd, self.READ_CHUNK_SIZE)
+                if not chunk:
                     self.console_callback("[Debug] EOF received.")
                     break
-                
-                # self.console_callback(f"[Debug] Byte: {byte}") # Very spammy but useful if stuck
-                
-                if byte == b'\n' or byte == b'\r':
-                    if buffer:
-                        try:
-                            line = buffer.decode('utf-8', errors='replace').strip()
-                        except:
-                            line = ""
-                            
-                        if line:
-                            # Remove ANSI escape codes
-                            clean_line = re.sub(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])', '', line)
-                            
-                            # Filter spam
-                            is_spam = any(s in clean_line for s in self.SPAM_LOGS)
-                            if not is_spam or "ERROR" in clean_line:
-                                self.console_callback(f"[Playit] {clean_line}")
-                                
-                            self._parse_line(clean_line)
-                        buffer = bytearray()
-                else:
-                    buffer.extend(byte)
-                    
+
+                lines = self.LINE_SPLIT.split(pending + chunk)
+                pending = lines.pop()  # Incomplete last line (b"" if the chunk ended on a newline)
+                for raw in lines:
+                    self._handle_line(raw)
+
+            if pending:
+                self._handle_line(pending)
+
         except Exception as e:
             self.console_callback(f"[Playit] Read error: {e}")
         finally:
             self.running = False
             self.process = None
             self.current_address = None
+            self.tunnel_endpoint = None
             self.status_callback("Offline", None)
             self.console_callback("[Playit] Agent process exited.")
 
-    def _parse_line(self, line):
-        """Parses a single line of output for relevant info."""
-        # 1. Check for Claim URL
-        # Pattern: "https://playit.gg/claim/..."
-        claim_match = re.search(r"(https://playit\.gg/claim/[a-zA-Z0-9]+)", line)
-        if claim_match:
-            url = claim_match.group(1)
-            if not self.claim_url_detected:
-                self.claim_url_detected = True
-                self.claim_callback(url)
+    def _handle_line(self, raw):
+        """Logs (unless spam) and acts on one raw output line."""
+        parsed = parse_line(raw)
+        if parsed is None:
+            return
+        if parsed.show:
+            self.console_callback(f"[Playit] {parsed.text}")
+        self._apply_line(parsed)
 
-        # 2. Check for Tunnel Address
-        # Pattern: looks for .ply.gg domains OR IP addresses in specific contexts
-        # Log examples:
-        # "tunnel_addr: 209.25.140.1:5525"
-        # "trying to establish tunnel connection addr=..."
-        
-        # 2. Check for Tunnel Address
-        # Priority 1: .ply.gg or .playit.gg domain (most user friendly)
-        domain_match = re.search(r"([a-z0-9-.]+\.(?:ply|playit)\.gg|[a-z0-9-.]+\.joinmc\.link)", line)
-        if domain_match:
-            address = domain_match.group(1).rstrip('.')
-            if "at.ply.gg" not in address:
-                if self.current_address is None and self.on_ready_callback:
-                    self.on_ready_callback()
-                self.current_address = address
-                self.status_callback("Online", address)
-                return
+    def _apply_line(self, line):
+        """Updates claim / address / status from a parsed line."""
+        # 1. Claim URL
+        if line.claim_url and not self.claim_url_detected:
+            self.claim_url_detected = True
+            self.claim_callback(line.claim_url)
 
-        # Priority 2: IP Address from "tunnel_addr: IP:PORT"
-        ip_match = re.search(r"tunnel_addr:\s*([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+:[0-9]+)", line)
-        if ip_match:
-            address = ip_match.group(1)
+        # 2. Tunnel address: .ply.gg / .playit.gg / .joinmc.link domain, else tunnel_addr IP:PORT
+        if line.address:
             if self.current_address is None and self.on_ready_callback:
                 self.on_ready_callback()
-            self.current_address = address
-            self.status_callback("Online", address)
+            self.current_address = line.address
+            if ":" in line.address:
+                # The tunnel_addr IP:PORT, kept for when a later domain's port can't be resolved
+                self.tunnel_endpoint = line.address
+            self.status_callback("Online", line.address)
             return
 
-        # Priority 3: "tunnel running" confirmation (fallback if no IP found yet)
-        if "tunnel running" in line:
-            if not getattr(self, "current_address", None):
-                 self.status_callback("Online", "Check Console")
+        # 3. "tunnel running" confirmation (fallback if no address found yet)
+        if line.running:
+            if not self.current_address:
+                self.status_callback("Online", "Check Console")
             return
 
-        # 3. Check for Errors
-        if "AgentDisabledOverLimit" in line or "Account limit reached" in line:
+        # 4. Errors
+        if line.limit_reached:
             self.status_callback("Error", None)
             self.console_callback("[Playit] ❌ ERROR: Account limit reached!")
             self.console_callback("[Playit] You have too many agents. Please go to https://playit.gg/dashboard/agents and delete unused agents.")
             return
-            
-        if "AgentVersionTooOld" in line:
-             self.console_callback("[Playit] ERROR: Agent version too old. Restarting to update...")
-             # The ensure_binary check on next start should handle this, but we can force it here if we want
-             # For now, just logging it is enough as the user will likely restart or we can trigger a restart
 
+        if line.too_old:
+            # The ensure_binary check on next start handles the update
+            self.console_callback("[Playit] ERROR: Agent version too old. Restarting to update...")
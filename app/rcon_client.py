@@ -0,0 +1,209 @@
+import socket
+import struct
+import threading
+
+import app.logic as logic
+
+# Source RCON packet types (as used by Minecraft)
+PACKET_RESPONSE = 0
+PACKET_COMMAND = 2
+PACKET_AUTH_RESPONSE = 2
+PACKET_LOGIN = 3
+# Unknown type: the server answers it with "Unknown request" after the reply to the
+# command before it, marking the end of a reply split over several packets. Only sent
+# once that reply has started: vanilla reads one buffer at a time and drops the
+# connection when a read holds more than one packet.
+PACKET_SENTINEL = 200
+
+DEFAULT_RCON_PORT = 25575
+MAX_COMMAND_LENGTH = 1446  # Minecraft rejects longer request bodies
+
+
+class RconError(Exception):
+    """Raised when the RCON connection fails or is not configured."""
+
+
+class RconAuthError(RconError):
+    """Raised when the server rejects the RCON password."""
+
+
+class RconClient:
+    """Persistent, reconnecting RCON connection with request/response (one request in flight at a time)."""
+
+    def __init__(self, host, port, password, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._sock = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_server(cls, server_name, host="127.0.0.1", timeout=5.0):
+        """Builds a client from enable-rcon / rcon.port / rcon.password in server.properties."""
+        props = logic.load_server_properties(server_name)
+        if props.get("enable-rcon", "false").lower() != "true":
+            raise RconError("RCON is disabled (enable-rcon=false).")
+        password = props.get("rcon.password", "")
+        if not password:
+            raise RconError("RCON has no password (rcon.password is empty).")
+        try:
+            port = int(props.get("rcon.port") or DEFAULT_RCON_PORT)
+        except ValueError:
+            port = DEFAULT_RCON_PORT
+        return cls(host, port, password, timeout)
+
+    # --- Connection ---
+
+    def connect(self):
+        """Opens the connection and logs in. Safe to call when already connected."""
+        with self._lock:
+            self._connect()
+
+    def _connect(self):
+        if self._sock:
+            return
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            raise RconError(f"Cannot connect to {self.host}:{self.port}: {e}")
+
+        self._sock = sock
+        try:
+            login_id = self._send(PACKET_LOGIN, self.password)
+            while True:
+                request_id, packet_type, _ = self._recv()
+                if packet_type == PACKET_AUTH_RESPONSE:
+                    break
+            if request_id == -1 or request_id != login_id:
+                raise RconAuthError("RCON password rejected.")
+        except Exception:
+            self._close()
+            raise
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._sock:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+
+    @property
+    def connected(self):
+        return self._sock is not None
+
+    # --- Wire format ---
+
+    def _send(self, packet_type, body):
+        request_id = self._next_id
+        self._next_id = self._next_id % 0x7FFFFFFF + 1
+        payload = struct.pack("<ii", request_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+        self._sock.sendall(struct.pack("<i", len(payload)) + payload)
+        return request_id
+
+    def _recv_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise RconError("Connection closed by server.")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _recv(self):
+        (length,) = struct.unpack("<i", self._recv_exact(4))
+        if length < 10 or length > 1024 * 1024:
+            raise RconError(f"Invalid RCON packet length: {length}")
+        payload = self._recv_exact(length)
+        request_id, packet_type = struct.unpack("<ii", payload[:8])
+        body = payload[8:-2].decode("utf-8", errors="replace")
+        return request_id, packet_type, body
+
+    # --- Commands ---
+
+    def command(self, command):
+        """Runs one command and returns its (possibly multi-packet) reply text."""
+        return self.command_many([command])[0]
+
+    def command_many(self, commands):
+        """
+        Runs several commands on one connection, one after the other: each request
+        is written only once the reply to the previous one has been read.
+
+        Returns:
+            list: Reply text for each command, in the same order.
+        """
+        for command in commands:
+            if len(command.encode("utf-8")) > MAX_COMMAND_LENGTH:
+                raise RconError(f"Command too long ({len(command)} > {MAX_COMMAND_LENGTH} bytes).")
+
+        with self._lock:
+            # Retry once on a fresh connection if a reused one turned out to be stale
+            retry = self._sock is not None
+            while True:
+                try:
+                    self._connect()
+                    return self._exchange(commands)
+                except RconAuthError:
+                    raise
+                except (OSError, RconError) as e:
+                    self._close()
+                    if not retry:
+                        raise e if isinstance(e, RconError) else RconError(f"RCON connection failed: {e}")
+                    retry = False
+
+    def _exchange(self, commands):
+        return [self._exchange_one(command) for command in commands]
+
+    def _exchange_one(self, command):
+        command_id = self._send(PACKET_COMMAND, command)
+        sentinel_id = None
+        parts = []
+        while True:
+            request_id, packet_type, body = self._recv()
+            if request_id == -1:
+                self._close()
+                raise RconAuthError("RCON session is no longer authenticated.")
+            if request_id == sentinel_id:
+                return "".join(parts)
+            if request_id == command_id and packet_type == PACKET_RESPONSE:
+                parts.append(body)
+                if sentinel_id is None:
+                    # The server answers requests in order: once the sentinel's reply
+                    # arrives, every packet of this reply has been read
+                    sentinel_id = self._send(PACKET_SENTINEL, "")
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_rcon_client(server_name):
+    """
+    Returns the pooled RCON client for a server, reusing its open connection.
+    A new client is created when rcon.port or rcon.password change.
+    """
+    fresh = RconClient.from_server(server_name)
+    with _clients_lock:
+        client = _clients.get(server_name)
+        if client and (client.port, client.password) == (fresh.port, fresh.password):
+            return client
+        if client:
+            client.close()
+        _clients[server_name] = fresh
+        return fresh
+
+
+def close_all():
+    """Closes every pooled RCON connection."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
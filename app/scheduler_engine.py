@@ -0,0 +1,193 @@
+import heapq
+import itertools
+import threading
+import time
+
+from app.app_config import AppConfig
+from app.scheduler_service import SchedulerService, RESTART_WARNINGS
+from app.server_metadata import get_server_metadata
+
+EVENT_WARNING = "warning"
+EVENT_JOB = "job"
+EVENT_WINDOW = "window"            # A deferrable restart may now happen as soon as the server is empty
+EVENT_EMPTY_CHECK = "empty_check"  # Restart if the server stayed empty for RESTART_EMPTY_SETTLE
+
+# Actions that only make sense while the server is running (backups also run when stopped)
+RUNNING_ONLY_ACTIONS = {"restart", "broadcast", "command", "pregen"}
+
+
+class SchedulerEngine:
+    """
+    Fires the scheduled jobs of every server (and the warnings before restarts)
+    from one thread. Events sit in a heap keyed by their absolute fire time and
+    the thread sleeps until the earliest one. A server's events are only
+    recomputed when its jobs change (through its ServerMetadata subscription).
+
+    Restart jobs with a "defer" setting ({"window_minutes": X, "deadline_minutes": Y})
+    restart at the first moment the server is empty from X minutes before their
+    time, and are forced Y minutes after it; the warnings count down to that
+    forced restart.
+    """
+
+    def __init__(self, servers_callback, is_running, on_warning, on_restart, on_job, player_count=None):
+        """
+        Args:
+            servers_callback: func() -> list (Names of all known servers)
+            is_running: func(str) -> bool (Whether a server is running)
+            on_warning: func(str, str) -> None (Server name, warning message)
+            on_restart: func(str) -> None (Server name; performs the restart)
+            on_job: func(str, dict) -> None (Server name, job; runs any other action)
+            player_count: func(str) -> int (Players online; feed changes to on_player_count())
+        """
+        self.servers_callback = servers_callback
+        self.is_running = is_running
+        self.on_warning = on_warning
+        self.on_restart = on_restart
+        self.on_job = on_job
+        self.player_count = player_count or (lambda server_name: 0)
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._generations = {}
+        self._awaiting_empty = {}  # server -> (generation, job) of a deferred restart in its window
+        self._empty_since = {}     # server -> time its player count last dropped to 0
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def start(self):
+        self.sync()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def sync(self):
+        """Starts tracking servers that appeared since the last call."""
+        for server_name in self.servers_callback():
+            if server_name not in self._generations:
+                self._watch(server_name)
+
+    def _watch(self, server_name):
+        with self._cond:
+            self._generations.setdefault(server_name, 0)
+
+        def _on_metadata_change(meta, changed):
+            if "jobs" in changed or "scheduler" in changed:
+                self.reschedule(server_name)
+        get_server_metadata(server_name).subscribe(_on_metadata_change)
+        self.reschedule(server_name)
+
+    def next_events(self, server_name=None):
+        """Pending (fire time, server name, kind, payload) tuples, earliest first."""
+        with self._cond:
+            entries = sorted(self._heap, key=lambda entry: entry[:2])
+            return [(fire_at, name, kind, payload) for fire_at, _, gen, name, kind, payload in entries
+                    if gen == self._generations.get(name) and (server_name is None or name == server_name)]
+
+    def reschedule(self, server_name):
+        """Drops a server's pending events and queues them again from its current jobs."""
+        with self._cond:
+            generation = self._generations[server_name] = self._generations.get(server_name, 0) + 1
+            self._awaiting_empty.pop(server_name, None)
+
+        # Computed outside the engine lock: reading metadata may notify back into reschedule()
+        next_runs = SchedulerService(server_name).get_next_runs()
+
+        with self._cond:
+            if self._generations.get(server_name) != generation:
+                return  # A newer reschedule superseded this one
+
+            now = time.time()
+            for next_run, job in next_runs:
+                run_at = next_run.timestamp()
+                defer = job.get("defer") if job["action"] == "restart" else None
+                if defer:
+                    window_at = run_at - defer.get("window_minutes", 0) * 60
+                    run_at += defer.get("deadline_minutes", 0) * 60
+                    self._push(window_at, generation, server_name, EVENT_WINDOW, job)
+                if job["action"] == "restart" and job.get("warnings", True):
+                    for seconds_before, _, message in RESTART_WARNINGS:
+                        # Warnings whose moment has already passed are not sent late
+                        if run_at - seconds_before > now:
+                            self._push(run_at - seconds_before, generation, server_name, EVENT_WARNING, message)
+                # Missed runs with catch-up "once" are in the past and fire right away
+                self._push(run_at, generation, server_name, EVENT_JOB, job)
+            self._cond.notify()
+
+    def _push(self, fire_at, generation, server_name, kind, payload):
+        heapq.heappush(self._heap, (fire_at, next(self._seq), generation, server_name, kind, payload))
+
+    def on_player_count(self, server_name, count):
+        """Feeds a server's player count (from its runner's PLAYER_COUNT events)."""
+        with self._cond:
+            if count:
+                self._empty_since.pop(server_name, None)
+                return
+            empty_since = self._empty_since.setdefault(server_name, time.time())
+            awaiting = self._awaiting_empty.get(server_name)
+            if awaiting:
+                generation, job = awaiting
+                self._push(empty_since + AppConfig.RESTART_EMPTY_SETTLE, generation, server_name, EVENT_EMPTY_CHECK, job)
+                self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    # Lazily discard events of superseded schedules
+                    while self._heap and self._heap[0][2] != self._generations.get(self._heap[0][3]):
+                        heapq.heappop(self._heap)
+                    delay = self._heap[0][0] - time.time() if self._heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    # Capped so a wall-clock change (DST, suspend/resume) is noticed
+                    self._cond.wait(AppConfig.SCHEDULER_MAX_SLEEP if delay is None else min(delay, AppConfig.SCHEDULER_MAX_SLEEP))
+                if self._stopped:
+                    return
+                _, _, generation, server_name, kind, payload = heapq.heappop(self._heap)
+
+            try:
+                self._fire(server_name, kind, payload, generation)
+            except Exception as e:
+                print(f"Scheduled {kind} failed for {server_name}: {e}")
+
+    def _fire(self, server_name, kind, payload, generation=None):
+        if kind == EVENT_WARNING:
+            if self.is_running(server_name):
+                self.on_warning(server_name, payload)
+            return
+
+        if kind == EVENT_WINDOW:
+            if not self.is_running(server_name):
+                return
+            with self._cond:
+                self._awaiting_empty[server_name] = (generation, payload)
+            # Checks right away (after the settle time) if nobody is online already
+            if not self.player_count(server_name):
+                self.on_player_count(server_name, 0)
+            return
+
+        if kind == EVENT_EMPTY_CHECK:
+            with self._cond:
+                empty_since = self._empty_since.get(server_name)
+                if (self._awaiting_empty.get(server_name, (None,))[0] != generation or empty_since is None
+                        or time.time() - empty_since < AppConfig.RESTART_EMPTY_SETTLE
+                        or self.player_count(server_name)):
+                    return  # Players came back, or a newer check is queued
+                self._awaiting_empty.pop(server_name, None)
+            # The early restart stamps last_run, which drops the forced restart and its warnings
+            kind = EVENT_JOB
+
+        job = payload
+        try:
+            if job["action"] not in RUNNING_ONLY_ACTIONS or self.is_running(server_name):
+                if job["action"] == "restart":
+                    self.on_restart(server_name)
+                else:
+                    self.on_job(server_name, job)
+        finally:
+            # Stamping last_run changes the jobs, which queues the next occurrence.
+            # Jobs of stopped servers are stamped too so they don't all fire at the next start.
+            SchedulerService(server_name).scheduler.update_job_last_run(job["id"])
@@ -1,8 +1,23 @@
 import datetime
+import zlib
+
+import app.cron as cron
 import app.logic as logic
+from app.app_config import AppConfig
+
+# Warnings broadcast before a scheduled restart: (seconds before, key, message)
+RESTART_WARNINGS = [
+    (3600, "1h", "Server will restart in 1 hour!"),
+    (1800, "30m", "Server will restart in 30 minutes!"),
+    (900, "15m", "Server will restart in 15 minutes!"),
+    (60, "1m", "Server will restart in 1 minute!"),
+]
 
 class SchedulerService:
-    """Handles the business logic for server restart scheduling."""
+    """Handles the business logic for server job scheduling."""
+
+    # A run this late still counts as on time; later ones follow the job's catch-up policy
+    MISSED_GRACE = datetime.timedelta(minutes=2)
 
     def __init__(self, server_name):
         """
@@ -12,64 +27,104 @@ class SchedulerService:
         """
         self.server_name = server_name
         self.scheduler = logic.Scheduler(server_name)
-        self.schedule = self.scheduler.get_schedule()
+        self.jobs = self.scheduler.get_jobs()
 
-    def get_status(self):
+    def get_jitter(self, job):
         """
-        Calculates the current scheduling status, including time remaining and due status.
-        
+        Seconds a cron job's runs are shifted by, so servers sharing a schedule don't
+        all fire at the same second. Derived from the server and job id, so it is
+        stable across restarts of the app. (Interval jobs are already spread out by
+        their own last run.)
+        """
+        jitter = int(job.get("jitter", AppConfig.SCHEDULER_DEFAULT_JITTER))
+        if jitter <= 0:
+            return datetime.timedelta(0)
+        seed = zlib.crc32(f"{self.server_name}/{job.get('id')}".encode())
+        return datetime.timedelta(seconds=seed % (jitter + 1))
+
+    def get_next_run(self, job, now=None):
+        """
+        Computes when a job should run next.
+
+        Args:
+            job (dict): The job (see logic.Scheduler).
+            now (datetime): Reference time (default: now).
+
         Returns:
-            dict: A dictionary containing 'is_due' (bool) and 'remaining_seconds' (int/None).
-                  Returns None if no schedule is active.
+            datetime: Absolute run time (in the past if a missed run should be caught
+                      up right away), or None if the job is disabled or never fires.
         """
-        if not self.schedule:
+        if not job.get("enabled", True):
             return None
 
-        now = datetime.datetime.now()
-        remaining_seconds = None
-
-        if self.schedule["type"] == "interval":
-            last_run_str = self.schedule.get("last_run")
-            if last_run_str:
-                last_run = datetime.datetime.fromisoformat(last_run_str)
-                interval = datetime.timedelta(hours=self.schedule["interval_hours"])
-                next_restart = last_run + interval
-                remaining_seconds = (next_restart - now).total_seconds()
-        
-        elif self.schedule["type"] == "time":
-            restart_time_str = self.schedule["restart_time"]
-            hour, minute = map(int, restart_time_str.split(":"))
-            target_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            remaining_seconds = (target_time - now).total_seconds()
+        now = now or datetime.datetime.now()
+        jitter = self.get_jitter(job)
+        # A deferred restart may run up to `window` early and `deadline` late (see SchedulerEngine)
+        defer = job.get("defer") or {}
+        window = datetime.timedelta(minutes=defer.get("window_minutes", 0))
+        deadline = datetime.timedelta(minutes=defer.get("deadline_minutes", 0))
+        last_run_str = job.get("last_run")
+        last_run = datetime.datetime.fromisoformat(last_run_str) if last_run_str else None
 
-        return {
-            "is_due": self.scheduler.check_due(),
-            "remaining_seconds": remaining_seconds
-        }
+        if job.get("interval_hours"):
+            interval = datetime.timedelta(hours=job["interval_hours"])
+            if not last_run:
+                # Start counting from now
+                self.scheduler.update_job_last_run(job["id"], now)
+                return now + interval
+            due = last_run + interval
+            if due + deadline < now - self.MISSED_GRACE and job.get("catch_up") != "once":
+                # Skip the missed runs but stay on the original cadence
+                missed = (now - due) // interval + 1
+                due += interval * missed
+            return due
+
+        try:
+            expression = cron.CronExpression(job["cron"])
+        except (cron.CronError, KeyError) as e:
+            print(f"Failed to schedule job {job.get('id')} of {self.server_name}: {e}")
+            return None
 
-    def get_warning_message(self, remaining_seconds, sent_warnings):
+        # Slots are compared without jitter; the jitter is added to the chosen slot.
+        # A run early in the window counts for the slot it was early for.
+        slot = expression.next_after((last_run + window if last_run else now) - jitter)
+        if slot is None:
+            return None
+        if slot + jitter + deadline < now - self.MISSED_GRACE and job.get("catch_up") != "once":
+            slot = expression.next_after(now - jitter - deadline)
+            if slot is None:
+                return None
+        return slot + jitter
+
+    def get_next_runs(self, now=None):
+        """Returns [(run time, job)] for every active job, earliest first."""
+        runs = [(self.get_next_run(job, now), job) for job in self.jobs]
+        return sorted(((when, job) for when, job in runs if when), key=lambda run: run[0])
+
+    def get_next_restart(self, now=None):
         """
-        Determines if a warning message should be sent based on the time remaining.
+        Computes when the next scheduled restart should happen.
 
-        Args:
-            remaining_seconds (int): Time until restart in seconds.
-            sent_warnings (set): A set of already sent warning keys (e.g., {'1h', '30m'}).
+        Returns:
+            datetime: Absolute restart time, or None if no restart is scheduled.
+        """
+        restarts = [when for when, job in self.get_next_runs(now) if job.get("action") == "restart"]
+        return restarts[0] if restarts else None
+
+    def get_status(self):
+        """
+        Calculates the current scheduling status, including time remaining and due status.
 
         Returns:
-            tuple: A tuple containing the warning key and the message string (e.g., ('1h', 'Server will restart...')),
-                   or (None, None) if no warning is needed.
+            dict: A dictionary containing 'is_due' (bool) and 'remaining_seconds' (int/None).
+                  Returns None if no schedule is active.
         """
-        if remaining_seconds is None or remaining_seconds <= 0:
-            return None, None
-
-        # Widened time windows to 30s to ensure they are not missed by the 30s polling loop.
-        if 3600 < remaining_seconds <= 3630 and '1h' not in sent_warnings:
-            return '1h', "Server will restart in 1 hour!"
-        elif 1800 < remaining_seconds <= 1830 and '30m' not in sent_warnings:
-            return '30m', "Server will restart in 30 minutes!"
-        elif 900 < remaining_seconds <= 930 and '15m' not in sent_warnings:
-            return '15m', "Server will restart in 15 minutes!"
-        elif 60 < remaining_seconds <= 90 and '1m' not in sent_warnings:
-            return '1m', "Server will restart in 1 minute!"
-        
-        return None, None
+        next_restart = self.get_next_restart()
+        if not next_restart:
+            return None
+
+        remaining_seconds = (next_restart - datetime.datetime.now()).total_seconds()
+        return {
+            "is_due": remaining_seconds <= 0,
+            "remaining_seconds": remaining_seconds
+        }
@@ -1,38 +1,241 @@
+import collections
+import inspect
+import threading
+import time
+
+from app.app_config import AppConfig
+
 class ServerEvent:
     STARTING = "starting"
     READY = "ready"
     STOPPED = "stopped"
     ERROR = "error"
     PLAYER_COUNT = "player_count"
+    STATUS = "status"  # Server List Ping result (ServerStatus, or None when unreachable)
+    LAG = "lag"  # "Can't keep up!" warning ({"behind_ms": int, "ticks": int})
+    ANY = "*"  # Wildcard: listener receives (event, data)
+
+# Overflow policies for queued listeners
+OVERFLOW_DROP_OLDEST = "drop_oldest"          # Discard the oldest pending event
+OVERFLOW_COALESCE_LATEST = "coalesce_latest"  # Keep only the newest pending data per event
+OVERFLOW_BLOCK = "block"                      # Make emit() wait for space (backpressure)
+
+def _count_positional_args(callback):
+    """How many positional arguments a callback accepts (capped at 2)."""
+    try:
+        params = inspect.signature(callback).parameters.values()
+    except (TypeError, ValueError):
+        return 1  # Builtins without a signature: assume they take the data
+    count = 0
+    for p in params:
+        if p.kind == p.VAR_POSITIONAL:
+            return 2
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
+            count += 1
+    return min(count, 2)
+
+class _Listener:
+    """A callback with its calling convention resolved once, at subscribe time."""
+    __slots__ = ("callback", "arity", "once")
+
+    def __init__(self, callback, once):
+        self.callback = callback
+        self.arity = _count_positional_args(callback)
+        self.once = once
+
+class _QueuedListener(_Listener):
+    """
+    A listener with its own bounded queue, drained on a worker thread (or on an
+    asyncio loop when one is given) so a slow callback never stalls emit().
+    """
+    __slots__ = ("event", "maxsize", "overflow", "loop", "_queue", "_cond", "_closed",
+                 "delivered", "dropped", "coalesced", "last_lag", "max_lag")
+
+    def __init__(self, event, callback, once, maxsize, overflow, loop):
+        super().__init__(callback, once)
+        self.event = event
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.loop = loop
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        if loop is None:
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, args):
+        enqueued_at = time.monotonic()
+        with self._cond:
+            if self._closed:
+                return
+            if self.overflow == OVERFLOW_COALESCE_LATEST:
+                # Same event (first arg of wildcard listeners) already pending: update in place
+                for i, (pending_args, pending_at) in enumerate(self._queue):
+                    if self.event != ServerEvent.ANY or pending_args[0] == args[0]:
+                        self._queue[i] = (args, pending_at)
+                        self.coalesced += 1
+                        return
+            if len(self._queue) >= self.maxsize:
+                if self.overflow == OVERFLOW_BLOCK:
+                    while len(self._queue) >= self.maxsize and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+            self._queue.append((args, enqueued_at))
+            self._cond.notify_all()
+
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._drain_one)
+
+    def _take(self, block):
+        with self._cond:
+            while block and not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            item = self._queue.popleft()
+            self._cond.notify_all()  # Wake producers blocked on a full queue
+            return item
+
+    def _deliver(self, item):
+        args, enqueued_at = item
+        lag = time.monotonic() - enqueued_at
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        try:
+            result = self.callback(*args[:self.arity])
+            if self.loop is not None and inspect.iscoroutine(result):
+                self.loop.create_task(result)
+        except Exception as e:
+            print(f"[Error] Queued event callback failed for {self.event}: {e}")
+        self.delivered += 1
+        if self.once:
+            self.close()  # Already unsubscribed by emit(); this ends the worker thread
+
+    def _worker(self):
+        while True:
+            item = self._take(block=True)
+            if item is None:
+                return  # Closed
+            self._deliver(item)
+
+    def _drain_one(self):
+        item = self._take(block=False)
+        if item is not None:
+            self._deliver(item)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def metrics(self):
+        name = getattr(self.callback, "__qualname__", repr(self.callback))
+        return {
+            "event": self.event,
+            "callback": name,
+            "queued": len(self._queue),
+            "maxsize": self.maxsize,
+            "overflow": self.overflow,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
 
 class ServerEventEmitter:
     """Observable pattern for server state changes."""
     def __init__(self):
         self._listeners = {}
+        self._lock = threading.Lock()
+
+    def on(self, event, callback, once=False, queued=False, maxsize=None, overflow=OVERFLOW_DROP_OLDEST, loop=None):
+        """
+        Register callback for event.
+        Callbacks take 0 or 1 argument (the event data). Listeners on ServerEvent.ANY
+        take up to 2: (event, data).
+
+        Args:
+            queued (bool): Deliver through a bounded per-listener queue on a worker thread
+                           instead of synchronously on the emitting thread.
+            maxsize (int): Queue bound (default AppConfig.EVENT_QUEUE_SIZE).
+            overflow (str): OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE_LATEST or OVERFLOW_BLOCK.
+            loop (asyncio.AbstractEventLoop): Drain the queue on this loop instead of a
+                                              thread. Coroutine callbacks are scheduled as tasks.
+        """
+        if queued or loop is not None:
+            listener = _QueuedListener(event, callback, once, maxsize or AppConfig.EVENT_QUEUE_SIZE, overflow, loop)
+        else:
+            listener = _Listener(callback, once)
+        with self._lock:
+            # Copy-on-write so emit() can iterate without holding the lock
+            self._listeners[event] = self._listeners.get(event, ()) + (listener,)
+        return callback
 
-    def on(self, event, callback):
-        """Register callback for event."""
-        if event not in self._listeners:
-            self._listeners[event] = []
-        self._listeners[event].append(callback)
+    def once(self, event, callback):
+        """Register callback for the next occurrence of event only."""
+        return self.on(event, callback, once=True)
+
+    def off(self, event, callback=None):
+        """Remove a callback from event, or every callback when callback is None."""
+        with self._lock:
+            current = self._listeners.get(event, ())
+            removed = [l for l in current if callback is None or l.callback == callback]
+            remaining = tuple(l for l in current if l not in removed)
+            if remaining:
+                self._listeners[event] = remaining
+            else:
+                self._listeners.pop(event, None)
+        for listener in removed:
+            if isinstance(listener, _QueuedListener):
+                listener.close()
+
+    def lag_metrics(self):
+        """Per-subscriber queue metrics for every queued listener."""
+        return [l.metrics() for listeners in list(self._listeners.values())
+                for l in listeners if isinstance(l, _QueuedListener)]
+
+    def _claim_once(self, key, listener):
+        """Removes a once-listener. Returns False if another emit already fired it."""
+        with self._lock:
+            current = self._listeners.get(key, ())
+            if listener not in current:
+                return False
+            remaining = tuple(l for l in current if l is not listener)
+            if remaining:
+                self._listeners[key] = remaining
+            else:
+                self._listeners.pop(key, None)
+            return True
 
     def emit(self, event, data=None):
         """Trigger event."""
-        if event in self._listeners:
-            for callback in self._listeners[event]:
-                try:
-                    # Inspect callback to see if it accepts arguments?
-                    # Simpler: just pass data if provided, or rely on callback signature matching.
-                    # For safety, let's try-except or assume consistent usage.
-                    # If data is None, call without args (or with None if callback expects it?)
-                    # Let's assume callbacks take 0 or 1 arg.
-                    
-                    import inspect
-                    sig = inspect.signature(callback)
-                    if len(sig.parameters) > 0:
-                        callback(data)
-                    else:
-                        callback()
-                        
-                except Exception as e:
-                    print(f"[Error] Event callback failed for {event}: {e}")
+        listeners = self._listeners.get(event)
+        if listeners:
+            self._dispatch(event, listeners, (data,))
+
+        wildcard = self._listeners.get(ServerEvent.ANY)
+        if wildcard:
+            self._dispatch(ServerEvent.ANY, wildcard, (event, data))
+
+    def _dispatch(self, key, listeners, args):
+        for listener in listeners:
+            if listener.once and not self._claim_once(key, listener):
+                continue
+            if isinstance(listener, _QueuedListener):
+                listener.submit(args)
+                continue
+            try:
+                listener.callback(*args[:listener.arity])
+            except Exception as e:
+                print(f"[Error] Event callback failed for {args[0] if key == ServerEvent.ANY else key}: {e}")
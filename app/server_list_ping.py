@@ -0,0 +1,337 @@
+import io
+import json
+import random
+import re
+import socket
+import struct
+import sys
+import time
+from collections import namedtuple
+
+DEFAULT_PORT = 25565
+PROTOCOL_VERSION = -1  # "Any": status requests don't depend on the protocol version
+MAX_PACKET_LENGTH = 2 * 1024 * 1024
+
+# Bare hostnames are looked up as _minecraft._tcp.<host> SRV records, like the game client does
+SRV_PREFIX = "_minecraft._tcp."
+DNS_PORT = 53
+DNS_TYPE_SRV = 33
+RESOLV_CONF = "/etc/resolv.conf"
+WINDOWS_TCPIP_KEY = r"SYSTEM\CurrentControlSet\Services\Tcpip\Parameters"
+
+
+# Legacy formatting codes (§a, §l, ...) inside MOTD text
+FORMATTING_CODE = re.compile("\u00a7[0-9a-fk-orx]", re.IGNORECASE)
+
+ServerStatus = namedtuple("ServerStatus", [
+    "motd",            # Plain MOTD text (formatting stripped)
+    "players_online",
+    "players_max",
+    "player_sample",   # Names listed by the server (may be empty or partial)
+    "version",         # Version name, e.g. "1.21.1" or "Paper 1.21.1"
+    "protocol",        # Protocol number
+    "connect_ms",      # TCP connect time
+    "latency_ms",      # Ping/pong round-trip
+])
+
+
+class ServerListPingError(Exception):
+    """Raised when a server does not answer the status handshake correctly."""
+
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    """
+    Splits "host:port" (or a bare host) into (host, port).
+    SRV records are not resolved (see resolve_srv()), so bare hosts use default_port.
+    """
+    host, sep, port = address.strip().rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return address.strip(), default_port
+
+
+# --- SRV lookup ---
+
+def _windows_nameservers():
+    """DNS servers of the system from the registry (static ones first, then DHCP-assigned)."""
+    import winreg
+
+    def _values(key):
+        found = []
+        for name in ("NameServer", "DhcpNameServer"):
+            try:
+                value = winreg.QueryValueEx(key, name)[0]
+            except OSError:
+                continue
+            found.extend(value.replace(",", " ").split())
+        return found
+
+    servers = []
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, WINDOWS_TCPIP_KEY) as params:
+            servers.extend(_values(params))
+            with winreg.OpenKey(params, "Interfaces") as interfaces:
+                for i in range(winreg.QueryInfoKey(interfaces)[0]):
+                    with winreg.OpenKey(interfaces, winreg.EnumKey(interfaces, i)) as interface:
+                        servers.extend(_values(interface))
+    except OSError:
+        pass
+    return list(dict.fromkeys(servers))
+
+
+def _nameservers():
+    """
+    DNS servers configured on the system. Public resolvers are never used instead:
+    networks that block outside DNS would make every lookup time out.
+    """
+    if sys.platform == "win32":
+        return _windows_nameservers()
+    try:
+        with open(RESOLV_CONF, encoding="utf-8") as f:
+            return [parts[1] for parts in (line.split() for line in f)
+                    if len(parts) >= 2 and parts[0] == "nameserver"]
+    except OSError:
+        return []
+
+
+def _dns_name(data, offset):
+    """Reads a (possibly compressed) domain name. Returns (name, offset after it)."""
+    labels = []
+    end = None
+    for _ in range(128):  # Bounds pointer loops in malformed replies
+        length = data[offset]
+        if length >= 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+        elif length:
+            labels.append(data[offset + 1:offset + 1 + length].decode("ascii", errors="replace"))
+            offset += 1 + length
+        else:
+            return ".".join(labels), end if end is not None else offset + 1
+    raise ValueError("DNS name too long.")
+
+
+def _parse_srv_reply(data, query_id):
+    """Returns the (priority, weight, port, target) records of an SRV reply."""
+    reply_id, flags, questions, answers = struct.unpack(">HHHH", data[:8])
+    if reply_id != query_id or not flags & 0x8000 or flags & 0x000F:
+        return []  # Not our reply, not a reply, or an error (NXDOMAIN, ...)
+    offset = 12
+    for _ in range(questions):
+        offset = _dns_name(data, offset)[1] + 4
+    records = []
+    for _ in range(answers):
+        offset = _dns_name(data, offset)[1]
+        record_type, _, _, length = struct.unpack(">HHIH", data[offset:offset + 10])
+        offset += 10
+        if record_type == DNS_TYPE_SRV:
+            priority, weight, port = struct.unpack(">HHH", data[offset:offset + 6])
+            records.append((priority, weight, port, _dns_name(data, offset + 6)[0]))
+        offset += length
+    return records
+
+
+def resolve_srv(host, timeout=3.0):
+    """
+    Looks up the _minecraft._tcp SRV record of a hostname (stdlib only: one UDP query
+    to each nameserver of the system in turn).
+
+    Returns:
+        tuple: (target host, port) of the preferred record, or None if there is none,
+               no nameserver is configured or none answered.
+    """
+    query_id = random.randrange(0x10000)
+    question = b"".join(bytes([len(label)]) + label.encode("idna")
+                        for label in (SRV_PREFIX + host.rstrip(".")).split(".") if label)
+    query = struct.pack(">HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + question + b"\x00" + struct.pack(">HH", DNS_TYPE_SRV, 1)
+    for nameserver in _nameservers():
+        try:
+            with socket.socket(socket.AF_INET6 if ":" in nameserver else socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.settimeout(timeout)
+                sock.sendto(query, (nameserver, DNS_PORT))
+                data = sock.recv(4096)
+            records = _parse_srv_reply(data, query_id)
+        except (OSError, ValueError, struct.error, IndexError, UnicodeError):
+            continue
+        if records:
+            # Lowest priority first, then the heaviest weight
+            _, _, port, target = min(records, key=lambda r: (r[0], -r[1]))
+            return target.rstrip("."), port
+        return None  # The nameserver answered: there is no record
+    return None
+
+
+# --- Wire format ---
+
+def _varint(value):
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _string(text):
+    data = text.encode("utf-8")
+    return _varint(len(data)) + data
+
+
+def _packet(packet_id, payload=b""):
+    body = _varint(packet_id) + payload
+    return _varint(len(body)) + body
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ServerListPingError("Connection closed by server.")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _read_varint(read):
+    result = 0
+    for shift in range(0, 35, 7):
+        chunk = read(1)
+        if not chunk:
+            raise ServerListPingError("Truncated VarInt.")
+        byte = chunk[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise ServerListPingError("VarInt too long.")
+
+
+def _recv_packet(sock):
+    """Returns (packet_id, payload bytes)."""
+    length = _read_varint(lambda n: _recv_exact(sock, n))
+    if length <= 0 or length > MAX_PACKET_LENGTH:
+        raise ServerListPingError(f"Invalid packet length: {length}")
+    body = io.BytesIO(_recv_exact(sock, length))
+    packet_id = _read_varint(body.read)
+    return packet_id, body.read()
+
+
+# --- Ping ---
+
+def _connect(host, port, timeout):
+    """Returns (connected socket, connect ms)."""
+    started = time.perf_counter()
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except OSError as e:
+        raise ServerListPingError(f"Cannot connect to {host}:{port}: {e}")
+    return sock, round((time.perf_counter() - started) * 1000, 1)
+
+
+def connect(host, port=DEFAULT_PORT, timeout=5.0):
+    """
+    Opens and closes a TCP connection without speaking the protocol.
+
+    Returns:
+        float: Connect time in ms.
+
+    Raises:
+        ServerListPingError: If the connection fails.
+    """
+    sock, connect_ms = _connect(host, port, timeout)
+    sock.close()
+    return connect_ms
+
+
+def ping(host, port=DEFAULT_PORT, timeout=5.0):
+    """
+    Performs a Server List Ping (handshake, status request, ping/pong).
+
+    Args:
+        host (str): Server address.
+        port (int): Server port.
+        timeout (float): Socket timeout in seconds for connect and each read.
+
+    Returns:
+        tuple: (status dict as sent by the server, connect ms, ping round-trip ms)
+
+    Raises:
+        ServerListPingError: On connection failure or a malformed reply.
+    """
+    sock, connect_ms = _connect(host, port, timeout)
+    try:
+        with sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            handshake = _varint(PROTOCOL_VERSION) + _string(host) + struct.pack(">H", port) + _varint(1)
+            sock.sendall(_packet(0x00, handshake) + _packet(0x00))
+
+            packet_id, payload = _recv_packet(sock)
+            if packet_id != 0x00:
+                raise ServerListPingError(f"Unexpected status packet id {packet_id}.")
+            body = io.BytesIO(payload)
+            length = _read_varint(body.read)
+            try:
+                status = json.loads(body.read(length).decode("utf-8"))
+            except ValueError as e:
+                raise ServerListPingError(f"Invalid status JSON: {e}")
+
+            token = int(time.time() * 1000)
+            sent = time.perf_counter()
+            sock.sendall(_packet(0x01, struct.pack(">q", token)))
+            packet_id, payload = _recv_packet(sock)
+            ping_ms = (time.perf_counter() - sent) * 1000
+            if packet_id != 0x01 or payload[:8] != struct.pack(">q", token):
+                raise ServerListPingError("Invalid pong.")
+    except OSError as e:
+        raise ServerListPingError(f"Status ping to {host}:{port} failed: {e}")
+
+    return status, connect_ms, round(ping_ms, 1)
+
+
+def _flatten_text(component):
+    """Flattens a chat component (str, dict with text/extra, or list) to plain text."""
+    if isinstance(component, str):
+        return component
+    if isinstance(component, list):
+        return "".join(_flatten_text(c) for c in component)
+    if isinstance(component, dict):
+        return _flatten_text(component.get("text", "")) + _flatten_text(component.get("extra", []))
+    return ""
+
+
+def parse_status(status, connect_ms=None, latency_ms=None):
+    """Converts a raw status dict into a ServerStatus."""
+    players = status.get("players") or {}
+    version = status.get("version") or {}
+    motd = FORMATTING_CODE.sub("", _flatten_text(status.get("description", ""))).strip()
+    return ServerStatus(
+        motd=motd,
+        players_online=int(players.get("online", 0)),
+        players_max=int(players.get("max", 0)),
+        player_sample=[p.get("name", "") for p in players.get("sample") or [] if isinstance(p, dict)],
+        version=version.get("name", ""),
+        protocol=version.get("protocol"),
+        connect_ms=connect_ms,
+        latency_ms=latency_ms,
+    )
+
+
+def query_status(host, port=DEFAULT_PORT, timeout=5.0):
+    """
+    Pings a server and returns its parsed status.
+
+    Returns:
+        ServerStatus
+
+    Raises:
+        ServerListPingError: If the server is unreachable or answers incorrectly.
+    """
+    status, connect_ms, latency_ms = ping(host, port, timeout)
+    try:
+        return parse_status(status, connect_ms, latency_ms)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ServerListPingError(f"Unexpected status format: {e}")
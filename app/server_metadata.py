@@ -0,0 +1,51 @@
+import atexit
+import os
+import threading
+
+from app.app_config import AppConfig
+from app.config_store import ConfigStore
+from app.constants import SERVERS_DIR
+
+
+class ServerMetadata(ConfigStore):
+    """
+    Cached metadata.json of one server. All readers share the in-memory copy and
+    all writers go through the store lock, so concurrent updates can't clobber
+    each other; changes are flushed atomically after METADATA_SAVE_DELAY.
+    """
+
+    def __init__(self, server_name):
+        self.server_name = server_name
+        super().__init__(os.path.join(SERVERS_DIR, server_name, "metadata.json"), {},
+                         save_delay=AppConfig.METADATA_SAVE_DELAY, write_defaults=False)
+
+    def _write(self):
+        # Never recreate the folder of a server that was deleted meanwhile
+        if not os.path.isdir(os.path.dirname(self.path)):
+            self._dirty = False
+            return
+        super()._write()
+
+
+_metadata = {}
+_metadata_lock = threading.Lock()
+
+
+def get_server_metadata(server_name):
+    """Returns the shared ServerMetadata of a server."""
+    with _metadata_lock:
+        meta = _metadata.get(server_name)
+        if meta is None:
+            meta = _metadata[server_name] = ServerMetadata(server_name)
+        return meta
+
+
+def flush_all():
+    """Writes every server's pending metadata changes now."""
+    with _metadata_lock:
+        stores = list(_metadata.values())
+    for meta in stores:
+        meta.flush()
+
+
+atexit.register(flush_all)
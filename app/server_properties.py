@@ -0,0 +1,258 @@
+import os
+import threading
+
+from app.config_store import atomic_write_text
+from app.constants import SERVERS_DIR
+
+WHITESPACE = " \t\f"
+# Characters escaped with a backslash when writing (as java.util.Properties.store does)
+ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\f": "\\f",
+           "=": "\\=", ":": "\\:", "#": "\\#", "!": "\\!"}
+UNESCAPES = {"t": "\t", "n": "\n", "r": "\r", "f": "\f"}
+
+
+def _continues(line):
+    """A line ending in an odd number of backslashes continues on the next one."""
+    count = len(line) - len(line.rstrip("\\"))
+    return count % 2 == 1
+
+
+def unescape(text):
+    """Decodes Java properties escapes (\\t, \\n, \\uXXXX, \\= ...)."""
+    if "\\" not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c != "\\" or i + 1 == len(text):
+            out.append(c)
+            i += 1
+            continue
+        c = text[i + 1]
+        if c == "u" and len(text) >= i + 6:
+            try:
+                out.append(chr(int(text[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            except ValueError:
+                pass  # Malformed: keep the "u" like an unknown escape
+        out.append(UNESCAPES.get(c, c))
+        i += 2
+    result = "".join(out)
+    # Characters outside the BMP arrive as two \\u surrogates
+    return result.encode("utf-16", "surrogatepass").decode("utf-16", "surrogatepass")
+
+
+def escape(text, is_key=False):
+    """
+    Encodes text for a properties file: keys escape all spaces, values only a
+    leading one, and anything outside printable ASCII becomes \\uXXXX.
+    """
+    out = []
+    for i, c in enumerate(text):
+        if c == " ":
+            out.append("\\ " if is_key or i == 0 else " ")
+        elif c in ESCAPES:
+            out.append(ESCAPES[c])
+        elif " " <= c <= "~":
+            out.append(c)
+        else:
+            units = c.encode("utf-16-be", "surrogatepass")
+            out.extend(f"\\u{int.from_bytes(units[j:j + 2], 'big'):04X}" for j in range(0, len(units), 2))
+    return "".join(out)
+
+
+def _split_pair(logical):
+    """Splits a logical line into its raw (still escaped) key and value."""
+    i, length = 0, len(logical)
+    while i < length:
+        c = logical[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c in "=:" or c in WHITESPACE:
+            break
+        i += 1
+    key = logical[:i]
+
+    # Separator: whitespace, then at most one '=' or ':', then whitespace
+    while i < length and logical[i] in WHITESPACE:
+        i += 1
+    if i < length and logical[i] in "=:":
+        i += 1
+    while i < length and logical[i] in WHITESPACE:
+        i += 1
+    return key, logical[i:]
+
+
+class _Entry:
+    __slots__ = ("key", "value", "raw")
+
+    def __init__(self, key, value, raw):
+        self.key = key        # None for comments and blank lines
+        self.value = value
+        self.raw = raw        # Original text incl. line breaks; None once the value changed
+
+
+def parse(text):
+    """Parses properties text into a list of entries that renders back byte for byte."""
+    entries = []
+    lines = text.splitlines(keepends=True)
+    i = 0
+    while i < len(lines):
+        start = i
+        stripped = lines[i].rstrip("\r\n").lstrip(WHITESPACE)
+        if not stripped or stripped[0] in "#!":
+            # Comments and blank lines are never continued
+            entries.append(_Entry(None, None, lines[i]))
+            i += 1
+            continue
+
+        logical = stripped
+        while _continues(logical):
+            logical = logical[:-1]
+            if i + 1 == len(lines):
+                break
+            i += 1
+            logical += lines[i].rstrip("\r\n").lstrip(WHITESPACE)
+        i += 1
+
+        key, value = _split_pair(logical)
+        entries.append(_Entry(unescape(key), unescape(value), "".join(lines[start:i])))
+    return entries
+
+
+class ServerProperties:
+    """
+    server.properties as an ordered document (entries, comments, blank lines) in
+    Java properties syntax. The file is parsed once and re-read only when its
+    mtime or size changes; updates rewrite just the changed entries and skip
+    the write entirely when nothing changed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = []
+        self._index = {}
+        self._signature = None
+        self._loaded = False
+        self._newline = "\n"
+        self._encoding = "utf-8"
+        self._lock = threading.RLock()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        signature = self._stat_signature()
+        if self._loaded and signature == self._signature:
+            return
+        self._loaded = True
+        self._signature = signature
+        if signature is None:
+            self._set_entries([])
+            return
+
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Failed to read {self.path}: {e}")
+            self._set_entries([])
+            return
+
+        # Recent servers write UTF-8; older ones (and Properties.store) ISO-8859-1
+        try:
+            text, self._encoding = data.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            text, self._encoding = data.decode("latin-1"), "latin-1"
+        self._newline = "\r\n" if "\r\n" in text else "\n"
+        self._set_entries(parse(text))
+
+    def _set_entries(self, entries):
+        self._entries = entries
+        # Like java.util.Properties, the last occurrence of a key wins
+        self._index = {entry.key: entry for entry in entries if entry.key is not None}
+
+    def exists(self):
+        return self._stat_signature() is not None
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._index.get(key)
+            return entry.value if entry else default
+
+    def as_dict(self):
+        """Returns all properties (in file order) as a new dict of strings."""
+        with self._lock:
+            self._reload_if_changed()
+            return {key: entry.value for key, entry in self._index.items()}
+
+    def render(self):
+        """The document as text."""
+        with self._lock:
+            self._reload_if_changed()
+            parts = []
+            for entry in self._entries:
+                if entry.raw is not None:
+                    parts.append(entry.raw)
+                else:
+                    parts.append(f"{escape(entry.key, is_key=True)}={escape(entry.value)}{self._newline}")
+            return "".join(parts)
+
+    def update(self, values):
+        """
+        Sets properties (new keys are appended). Values are stored as strings, booleans
+        as "true"/"false". Writes the file only if something actually changed.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            changed = False
+            for key, value in values.items():
+                value = ("true" if value else "false") if isinstance(value, bool) else str(value)
+                entry = self._index.get(key)
+                if entry is None:
+                    if self._entries and self._entries[-1].raw and not self._entries[-1].raw.endswith(("\n", "\r")):
+                        self._entries[-1].raw += self._newline
+                    entry = _Entry(key, value, None)
+                    self._entries.append(entry)
+                    self._index[key] = entry
+                    changed = True
+                elif entry.value != value:
+                    entry.value = value
+                    entry.raw = None
+                    changed = True
+
+            if not changed:
+                return False
+            try:
+                atomic_write_text(self.path, self.render(), encoding=self._encoding)
+                self._signature = self._stat_signature()
+            except OSError as e:
+                print(f"Failed to save {self.path}: {e}")
+                self._loaded = False  # Re-read the file as it is on disk
+                return False
+            return True
+
+
+_documents = {}
+_documents_lock = threading.Lock()
+
+
+def get_server_properties(server_name):
+    """Returns the shared ServerProperties document of a server."""
+    with _documents_lock:
+        document = _documents.get(server_name)
+        if document is None:
+            document = _documents[server_name] = ServerProperties(
+                os.path.join(SERVERS_DIR, server_name, "server.properties"))
+        return document
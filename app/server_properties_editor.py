@@ -3,7 +3,11 @@ from tkinter import filedialog, messagebox
 import os
 import threading
 from app.app_config import AppConfig
-from app.ui_components import ToolTip
+from app.ui_components import ToolTip, BootTimelineWidget
+from app.jvm_profiles import JVM_PROFILES
+import app.performance_recommender as performance_recommender
+import app.benchmark_harness as benchmark_harness
+import app.world_analyzer as world_analyzer
 
 
 SETTINGS_METADATA = {
@@ -38,6 +42,8 @@ SETTINGS_METADATA = {
     "prevent-proxy-connections": {"desc": "Blocks players using VPNs or Proxies.", "impact": "Low"},
     "enforce-secure-profile": {"desc": "Requires Mojang-signed public keys for players.", "impact": "Low"},
     "enable-rcon": {"desc": "Allows remote console access (for bots/panels).", "impact": "Medium"},
+    "rcon.port": {"desc": "TCP port for remote console access (Default: 25575).", "impact": "Low"},
+    "rcon.password": {"desc": "Password for remote console access. Also lets this app send commands to servers it did not start.", "impact": "Low"},
     "enable-query": {"desc": "Allows external tools to see server status.", "impact": "Low"},
 }
 
@@ -75,6 +81,7 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
         self.geometry("700x600")
         self.resizable(True, True)
         
+        self.parent = parent
         self.server_name = server_name
         self.logic = logic_module
         self.properties = self.logic.load_server_properties(server_name)
@@ -99,6 +106,7 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
         self.tab_advanced = self.tabview.add("Advanced")
         self.tab_backups = self.tabview.add("Backups")
         self.tab_automation = self.tabview.add("Automation")
+        self.tab_performance = self.tabview.add("Performance")
         
         # Set tab change command for optimization
         self.tabview.configure(command=self._on_tab_changed)
@@ -121,6 +129,9 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
 
         self.frame_automation = ctk.CTkFrame(self.tab_automation, fg_color="transparent")
         self.frame_automation.pack(fill="both", expand=True)
+
+        self.frame_performance = ctk.CTkScrollableFrame(self.tab_performance)
+        self.frame_performance.pack(fill="both", expand=True)
         
         # Tracking
         self.widgets = {}
@@ -128,6 +139,8 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
         
         # UI Variables for validation (initialized for lazy loading safety)
         self.entry_ram = None
+        self.combo_jvm_profile = None
+        self.switch_cds = None
         self.var_auto_restart = None
         self.entry_interval = None
         
@@ -168,6 +181,8 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
         elif tab == "Backups":
             self.setup_backups_tab()
             self.refresh_backups()
+        elif tab == "Performance":
+            self.setup_performance_tab()
             
         self.loaded_tabs.add(tab)
 
@@ -240,6 +255,183 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
             else:
                 messagebox.showerror("Error", "Failed to restore backup.")
 
+    def setup_performance_tab(self):
+        self.setup_recommendation_card()
+        self.setup_ab_benchmark_card()
+
+        card = self.create_section_frame(self.frame_performance, "Boot Timeline")
+        history = self.logic.get_boot_history(self.server_name)
+
+        if not history:
+            ctk.CTkLabel(card, text="No boots recorded yet. Start the server to capture a timeline.",
+                         font=AppConfig.FONT_NOTE, text_color=AppConfig.COLOR_TEXT_NOTE).grid(row=0, column=0, sticky="w", padx=12, pady=10)
+            return
+
+        latest = history[-1]
+        previous = history[-2] if len(history) > 1 else None
+        BootTimelineWidget(card, latest, previous).grid(row=0, column=0, columnspan=4, sticky="ew", padx=12, pady=10)
+
+    def setup_recommendation_card(self):
+        card = self.create_section_frame(self.frame_performance, "Recommended Settings")
+
+        ctk.CTkLabel(card, text="Expected Players", font=self.font_bold, anchor="w").grid(row=0, column=0, sticky="w", padx=(12, 5), pady=8)
+        ctrl = ctk.CTkFrame(card, fg_color="transparent")
+        ctrl.grid(row=0, column=3, sticky="e", padx=12, pady=3)
+        vcmd = (self.register(self.validate_int), '%P')
+        self.entry_expected_players = ctk.CTkEntry(ctrl, width=60, height=28, validate="key", validatecommand=vcmd)
+        max_players = self._current_value("max-players")
+        self.entry_expected_players.insert(0, str(min(int(max_players), 10)) if str(max_players).isdigit() else "10")
+        self.entry_expected_players.pack(side="left", padx=(0, 5))
+        ctk.CTkButton(ctrl, text="Analyze", width=80, height=28, command=self.show_recommendation).pack(side="left")
+
+        self.recommendation_frame = ctk.CTkFrame(card, fg_color="transparent")
+        self.recommendation_frame.grid(row=1, column=0, columnspan=4, sticky="ew", padx=12, pady=(0, 8))
+        self.recommendation_frame.grid_columnconfigure(0, weight=1)
+
+    def _current_value(self, key):
+        """A property as currently shown in the form (or as saved, if its tab isn't loaded)."""
+        if key in self.widgets:
+            widget, w_type = self.widgets[key]
+            if w_type == "checkbox":
+                return "true" if widget.get() == 1 else "false"
+            return widget.get()
+        return self.properties.get(key)
+
+    def _set_current_value(self, key, value):
+        self.properties[key] = value
+        if key in self.widgets:
+            widget, w_type = self.widgets[key]
+            if w_type == "checkbox":
+                widget.select() if value == "true" else widget.deselect()
+            elif w_type == "dropdown":
+                widget.set(value)
+            else:
+                widget.delete(0, "end")
+                widget.insert(0, value)
+
+    def show_recommendation(self):
+        for widget in self.recommendation_frame.winfo_children():
+            widget.destroy()
+
+        players = self.entry_expected_players.get()
+        ram_mb = int(self.entry_ram.get()) if self.entry_ram and self.entry_ram.get().isdigit() else self.logic.get_server_ram(self.server_name)
+        profile = self.combo_jvm_profile.get() if self.combo_jvm_profile else self.logic.get_server_jvm_profile(self.server_name)
+        host = performance_recommender.detect_host()
+        recommendation = performance_recommender.recommend(host, ram_mb, int(players) if players.isdigit() else 1)
+        current = {key: self._current_value(key) for key in recommendation.properties}
+        changes = performance_recommender.diff(current, profile, recommendation)
+
+        ctk.CTkLabel(self.recommendation_frame, text=f"Host: {host.cores} cores, {host.total_ram_mb} MB RAM  ·  Server: {ram_mb} MB",
+                     font=AppConfig.FONT_NOTE, text_color=AppConfig.COLOR_TEXT_NOTE, anchor="w").grid(row=0, column=0, columnspan=2, sticky="w")
+        row = 1
+        for warning in recommendation.warnings:
+            ctk.CTkLabel(self.recommendation_frame, text=f"⚠ {warning}", text_color="orange", anchor="w",
+                         justify="left", wraplength=560).grid(row=row, column=0, columnspan=2, sticky="w")
+            row += 1
+
+        if not changes:
+            ctk.CTkLabel(self.recommendation_frame, text="✓ Settings already match the recommendation.",
+                         anchor="w").grid(row=row, column=0, columnspan=2, sticky="w", pady=4)
+            return
+
+        for key, old, new, reason in changes:
+            lbl = ctk.CTkLabel(self.recommendation_frame, text=f"{key}:  {old if old not in (None, '') else '(unset)'}  →  {new}",
+                               font=self.font_bold, anchor="w")
+            lbl.grid(row=row, column=0, sticky="w", pady=1)
+            lbl.tooltip_ref = ToolTip(lbl, reason)
+            row += 1
+
+        ctk.CTkButton(self.recommendation_frame, text="Apply All", width=100, height=28,
+                      command=lambda: self.apply_recommendation(changes)).grid(row=row, column=1, sticky="e", pady=(6, 0))
+
+    def apply_recommendation(self, changes):
+        """Saves the recommended values right away and mirrors them in the form."""
+        props = {key: new for key, _, new, _ in changes if key != "jvm_profile"}
+        for key, value in props.items():
+            self._set_current_value(key, value)
+        if props:
+            self.logic.save_server_properties(self.server_name, props)
+
+        profile = next((new for key, _, new, _ in changes if key == "jvm_profile"), None)
+        if profile:
+            self.logic.set_server_jvm_profile(self.server_name, profile)
+            if self.combo_jvm_profile:
+                self.combo_jvm_profile.set(profile)
+
+        self.show_recommendation()
+
+    def setup_ab_benchmark_card(self):
+        card = self.create_section_frame(self.frame_performance, "A/B Benchmark")
+
+        ctk.CTkLabel(card, text="Config B", font=self.font_bold, anchor="w").grid(row=0, column=0, sticky="w", padx=(12, 5), pady=8)
+        ctrl = ctk.CTkFrame(card, fg_color="transparent")
+        ctrl.grid(row=0, column=3, sticky="e", padx=12, pady=3)
+        self.entry_ab_overrides = ctk.CTkEntry(ctrl, width=260, height=28, placeholder_text="view-distance=8 jvm_profile=zgc")
+        self.entry_ab_overrides.pack(side="left", padx=(0, 5))
+        self.btn_ab_benchmark = ctk.CTkButton(ctrl, text="Run A/B", width=80, height=28, command=self.run_ab_benchmark)
+        self.btn_ab_benchmark.pack(side="left")
+
+        ctk.CTkLabel(card, text="A is the saved settings, B the same with these overrides (properties, jvm_profile, ram). "
+                                "Each boots on a copy of the world and force-loads the area around spawn.",
+                     font=AppConfig.FONT_NOTE, text_color=AppConfig.COLOR_TEXT_NOTE, anchor="w",
+                     justify="left", wraplength=600).grid(row=1, column=0, columnspan=4, sticky="w", padx=12, pady=(0, 8))
+
+        self.txt_ab_report = ctk.CTkTextbox(card, height=130, font=AppConfig.FONT_MONO)
+        self.txt_ab_report.grid(row=2, column=0, columnspan=4, sticky="ew", padx=12, pady=(0, 10))
+        self.txt_ab_report.configure(state="disabled")
+
+    def run_ab_benchmark(self):
+        overrides = {}
+        for token in self.entry_ab_overrides.get().replace(",", " ").split():
+            if "=" not in token:
+                messagebox.showerror("Invalid Input", f"Expected key=value, got '{token}'.")
+                return
+            key, value = token.split("=", 1)
+            overrides[key.strip()] = value.strip()
+
+        profile = overrides.pop("jvm_profile", None)
+        if profile and profile not in JVM_PROFILES:
+            messagebox.showerror("Invalid Input", f"Unknown JVM profile '{profile}'.")
+            return
+        ram = overrides.pop("ram", None)
+        if ram is not None and (not ram.isdigit() or int(ram) < 512):
+            messagebox.showerror("Invalid Input", f"ram must be a whole number of MB (at least 512), got '{ram}'.")
+            return
+        config_a = benchmark_harness.BenchmarkConfig("A", {}, None, None)
+        config_b = benchmark_harness.BenchmarkConfig("B", overrides, profile, ram)
+
+        confirm = messagebox.askyesno(
+            "A/B Benchmark",
+            f"A copy of the server will be booted twice, for about {AppConfig.BENCHMARK_LOAD_SECONDS}s of load each "
+            f"plus boot and save. This can take several minutes.\n\nContinue?"
+        )
+        if not confirm:
+            return
+
+        self.btn_ab_benchmark.configure(state="disabled", text="Running...")
+        console = getattr(self.parent, "update_console", print)
+
+        supervisor = getattr(self.parent, "supervisor", None)
+
+        def run():
+            # Whatever happens, the card must come back with a report and the button enabled
+            try:
+                result_a, result_b = benchmark_harness.run_ab(self.server_name, config_a, config_b, console,
+                                                              get_runner=supervisor.get if supervisor else None)
+                report = benchmark_harness.format_report(result_a, result_b)
+            except Exception as e:
+                report = f"Benchmark failed: {e}"
+            self._after_if_open(lambda: self._on_ab_benchmark_done(report))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_ab_benchmark_done(self, report):
+        self.btn_ab_benchmark.configure(state="normal", text="Run A/B")
+        self.txt_ab_report.configure(state="normal")
+        self.txt_ab_report.delete("1.0", "end")
+        self.txt_ab_report.insert("1.0", report)
+        self.txt_ab_report.configure(state="disabled")
+
     def setup_automation_tab(self):
         self.scheduler = self.logic.Scheduler(self.server_name)
         schedule = self.scheduler.get_schedule()
@@ -273,16 +465,104 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
             self.entry_interval.insert(0, str(schedule["interval_hours"]))
         else:
             self.entry_interval.insert(0, "6") # Default
+
+        # Player-aware deferral
+        self.lbl_defer = ctk.CTkLabel(card, text="Restart When Empty:", font=self.font_bold, anchor="w")
+        self.lbl_defer.grid(row=3, column=0, sticky="w", padx=(12, 5), pady=8)
+        self.switch_defer = ctk.CTkSwitch(card, text="")
+        self.switch_defer.grid(row=3, column=2, sticky="e", padx=12, pady=3)
+        if schedule and schedule.get("defer"):
+            self.switch_defer.select()
+        ToolTip(self.lbl_defer, f"Restart up to {AppConfig.RESTART_DEFER_WINDOW} min early as soon as nobody is online; "
+                                f"if players stay on, wait up to {AppConfig.RESTART_DEFER_DEADLINE} min past the scheduled time.")
             
         self.toggle_automation_inputs()
+        self.setup_jobs_card()
+
+    def setup_jobs_card(self):
+        card = self.create_section_frame(self.frame_automation, "Scheduled Jobs")
+
+        self.jobs_list_frame = ctk.CTkFrame(card, fg_color="transparent")
+        self.jobs_list_frame.grid(row=0, column=0, columnspan=4, sticky="ew", padx=12, pady=(8, 0))
+
+        add_frame = ctk.CTkFrame(card, fg_color="transparent")
+        add_frame.grid(row=1, column=0, columnspan=4, sticky="ew", padx=12, pady=8)
+        add_frame.grid_columnconfigure((1, 2), weight=1)
+
+        self.combo_job_action = ctk.CTkOptionMenu(add_frame, values=self.logic.JOB_ACTIONS, width=110, height=28)
+        self.combo_job_action.grid(row=0, column=0, padx=(0, 5))
+        self.entry_job_schedule = ctk.CTkEntry(add_frame, height=28, placeholder_text="Cron (0 4 * * *) or hours (6h)")
+        self.entry_job_schedule.grid(row=0, column=1, sticky="ew", padx=5)
+        self.entry_job_arg = ctk.CTkEntry(add_frame, height=28, placeholder_text="Message / command / radius")
+        self.entry_job_arg.grid(row=0, column=2, sticky="ew", padx=5)
+        ctk.CTkButton(add_frame, text="Add", width=60, height=28, command=self.add_job).grid(row=0, column=3, padx=(5, 0))
+
+        ctk.CTkLabel(card, text="Cron fields: minute hour day month weekday. Runs are spread by up to "
+                                f"{AppConfig.SCHEDULER_DEFAULT_JITTER}s so servers don't all fire together.",
+                     font=AppConfig.FONT_NOTE, text_color=AppConfig.COLOR_TEXT_NOTE, anchor="w").grid(row=2, column=0, columnspan=4, sticky="w", padx=12, pady=(0, 8))
+
+        self.refresh_jobs()
+
+    def refresh_jobs(self):
+        for widget in self.jobs_list_frame.winfo_children():
+            widget.destroy()
+
+        jobs = self.scheduler.get_jobs()
+        if not jobs:
+            ctk.CTkLabel(self.jobs_list_frame, text="No jobs scheduled.", anchor="w").pack(fill="x")
+            return
+
+        for job in jobs:
+            when = job.get("cron") or f"every {job.get('interval_hours')}h"
+            detail = next(iter(job.get("args", {}).values()), "")
+            text = f"{job['action']}  ·  {when}" + (f"  ·  {detail}" if detail != "" else "")
+            row = ctk.CTkFrame(self.jobs_list_frame, fg_color="transparent")
+            row.pack(fill="x", pady=1)
+            ctk.CTkLabel(row, text=text, anchor="w").pack(side="left")
+            ctk.CTkButton(row, text="Remove", width=60, height=24, fg_color="gray40",
+                          command=lambda job_id=job["id"]: self.remove_job(job_id)).pack(side="right")
+
+    def add_job(self):
+        action = self.combo_job_action.get()
+        schedule = self.entry_job_schedule.get().strip()
+        arg = self.entry_job_arg.get().strip()
+
+        job = {"action": action}
+        if schedule.lower().endswith("h") and schedule[:-1].isdigit():
+            job["interval_hours"] = int(schedule[:-1])
+        else:
+            job["cron"] = schedule
+        if action == "broadcast":
+            job["args"] = {"message": arg}
+        elif action == "command":
+            job["args"] = {"command": arg.lstrip("/")}
+        elif action == "pregen":
+            job["args"] = {"radius": int(arg) if arg.isdigit() else AppConfig.PREGEN_DEFAULT_RADIUS}
+
+        try:
+            self.scheduler.save_job(job)
+        except ValueError as e:
+            messagebox.showerror("Invalid Job", str(e))
+            return
+        self.entry_job_schedule.delete(0, "end")
+        self.entry_job_arg.delete(0, "end")
+        self.refresh_jobs()
+
+    def remove_job(self, job_id):
+        self.scheduler.remove_job(job_id)
+        self.refresh_jobs()
 
     def toggle_automation_inputs(self):
         if self.var_auto_restart.get():
             self.entry_interval.configure(state="normal")
+            self.switch_defer.configure(state="normal")
             self.lbl_interval.configure(text_color=("black", "white"))
+            self.lbl_defer.configure(text_color=("black", "white"))
         else:
             self.entry_interval.configure(state="disabled")
+            self.switch_defer.configure(state="disabled")
             self.lbl_interval.configure(text_color="gray")
+            self.lbl_defer.configure(text_color="gray")
 
     def save_automation(self):
         if not self.var_auto_restart:
@@ -294,8 +574,13 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
             interval = int(self.entry_interval.get())
         except:
             pass
-            
-        self.scheduler.set_restart_schedule(enabled, interval)
+
+        # This tab only edits interval restarts; leave daily/cron ones and unchanged intervals alone
+        schedule = self.scheduler.get_schedule()
+        if not (enabled and schedule and (schedule["type"] != "interval" or schedule["interval_hours"] == interval)):
+            self.scheduler.set_restart_schedule(enabled, interval)
+        if enabled:
+            self.scheduler.set_restart_defer(self.switch_defer.get() == 1)
 
     def validate_int(self, P):
         """Callback to allow only digits."""
@@ -441,6 +726,50 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
         self.entry_ram.insert(0, str(self.logic.get_server_ram(self.server_name)))
         self.entry_ram.pack(fill="x")
 
+        ctk.CTkFrame(card_res, height=1, fg_color=("gray90", "gray25")).grid(row=1, column=0, columnspan=4, sticky="ew", padx=10, pady=2)
+
+        ctk.CTkLabel(card_res, text="JVM Profile", font=self.font_bold, anchor="w").grid(row=2, column=0, sticky="w", padx=(12, 5), pady=8)
+        help_icon = ctk.CTkLabel(card_res, text="?", font=self.font_small,
+                                 width=18, height=18, corner_radius=9,
+                                 fg_color=("gray85", "gray30"), text_color=("gray40", "gray70"))
+        help_icon.grid(row=2, column=1, sticky="w", padx=2)
+        help_icon.tooltip_ref = ToolTip(help_icon, text="\n".join(f"{k}: {v['desc']}" for k, v in JVM_PROFILES.items()))
+
+        profile_ctrl = ctk.CTkFrame(card_res, fg_color="transparent", width=200, height=28)
+        profile_ctrl.grid(row=2, column=2, sticky="e", padx=12, pady=3)
+        profile_ctrl.pack_propagate(False)
+        self.combo_jvm_profile = self._create_widget(profile_ctrl, "dropdown",
+                                                     self.logic.get_server_jvm_profile(self.server_name),
+                                                     list(JVM_PROFILES.keys()))
+
+        self.btn_benchmark = ctk.CTkButton(card_res, text="Benchmark Profiles", command=self.benchmark_profiles,
+                                           width=140, height=28, fg_color="transparent", border_width=1, text_color=("gray10", "gray90"))
+        self.btn_benchmark.grid(row=3, column=2, sticky="e", padx=12, pady=(0, 8))
+        self.benchmarking = False
+        self._refresh_benchmark_button()
+
+        ctk.CTkFrame(card_res, height=1, fg_color=("gray90", "gray25")).grid(row=4, column=0, columnspan=4, sticky="ew", padx=10, pady=2)
+
+        ctk.CTkLabel(card_res, text="Class Data Sharing", font=self.font_bold, anchor="w").grid(row=5, column=0, sticky="w", padx=(12, 5), pady=8)
+        cds_help = ctk.CTkLabel(card_res, text="?", font=self.font_small,
+                                width=18, height=18, corner_radius=9,
+                                fg_color=("gray85", "gray30"), text_color=("gray40", "gray70"))
+        cds_help.grid(row=5, column=1, sticky="w", padx=2)
+        cds_help.tooltip_ref = ToolTip(cds_help, text="Archives loaded classes on the first run and reuses them on later starts to cut boot time. Rebuilt automatically when the jar or Java version changes.")
+
+        cds_ctrl = ctk.CTkFrame(card_res, fg_color="transparent", width=200, height=28)
+        cds_ctrl.grid(row=5, column=2, sticky="e", padx=12, pady=3)
+        cds_ctrl.pack_propagate(False)
+        self.switch_cds = self._create_widget(cds_ctrl, "checkbox", str(self.logic.get_server_cds_enabled(self.server_name)).lower())
+
+        history = self.logic.get_boot_history(self.server_name)
+        if history:
+            recent = ", ".join(
+                f"{h['seconds']}s" + (f" ({h['cds']})" if h.get("cds") else "") for h in history[-3:]
+            )
+            ctk.CTkLabel(card_res, text=f"Recent boot times: {recent}", font=AppConfig.FONT_NOTE,
+                         text_color=AppConfig.COLOR_TEXT_NOTE, anchor="w").grid(row=6, column=0, columnspan=4, sticky="w", padx=12, pady=(0, 8))
+
         # 3. Gameplay Section
         card_game = self.create_section_frame(self.frame_general, "Gameplay Rules")
         self.add_field_to_section(card_game, "max-players", "Max Players", default_val="20")
@@ -452,6 +781,42 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
 
     def setup_world_tab(self):
         self._build_tab_from_config(self.frame_world, "World")
+        self.setup_world_analysis_card()
+
+    def setup_world_analysis_card(self):
+        card = self.create_section_frame(self.frame_world, "World Size")
+
+        ctk.CTkLabel(card, text="Region Files", font=self.font_bold, anchor="w").grid(row=0, column=0, sticky="w", padx=(12, 5), pady=8)
+        self.btn_analyze_world = ctk.CTkButton(card, text="Analyze", width=80, height=28, command=self.analyze_world)
+        self.btn_analyze_world.grid(row=0, column=3, sticky="e", padx=12, pady=3)
+
+        ctk.CTkLabel(card, text="Reads only the headers of the region files: chunks, disk use and unused space per "
+                                "dimension, the largest regions and heatmaps of chunk density and last write.",
+                     font=AppConfig.FONT_NOTE, text_color=AppConfig.COLOR_TEXT_NOTE, anchor="w",
+                     justify="left", wraplength=600).grid(row=1, column=0, columnspan=4, sticky="w", padx=12, pady=(0, 8))
+
+        self.txt_world_report = ctk.CTkTextbox(card, height=260, font=AppConfig.FONT_MONO, wrap="none")
+        self.txt_world_report.grid(row=2, column=0, columnspan=4, sticky="ew", padx=12, pady=(0, 10))
+        self.txt_world_report.configure(state="disabled")
+
+    def analyze_world(self):
+        self.btn_analyze_world.configure(state="disabled", text="Reading...")
+
+        def run():
+            try:
+                report = world_analyzer.format_report(world_analyzer.analyze_world(self.server_name))
+            except Exception as e:
+                report = f"World analysis failed: {e}"
+            self._after_if_open(lambda: self._on_world_analyzed(report))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_world_analyzed(self, report):
+        self.btn_analyze_world.configure(state="normal", text="Analyze")
+        self.txt_world_report.configure(state="normal")
+        self.txt_world_report.delete("1.0", "end")
+        self.txt_world_report.insert("1.0", report)
+        self.txt_world_report.configure(state="disabled")
 
     def setup_network_tab(self):
         self._build_tab_from_config(self.frame_network, "Network")
@@ -469,6 +834,66 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
             if key not in used_keys and "rcon" not in key and "query" not in key:
                 self.add_field_to_section(card_other, key, key, "entry")
 
+    def _server_running(self):
+        supervisor = getattr(self.parent, "supervisor", None)
+        return bool(supervisor and supervisor.is_running(self.server_name))
+
+    def _after_if_open(self, callback):
+        """
+        Runs callback on the Tk thread unless the editor has been closed by then.
+        Safe from worker threads, which must not query the editor's widgets themselves.
+        """
+        def _run():
+            if self.winfo_exists():
+                callback()
+        self.parent.after(0, _run)
+
+    def _refresh_benchmark_button(self):
+        """Keeps "Benchmark Profiles" disabled while the server runs (it may be started after the editor opened)."""
+        if not self.winfo_exists():
+            return
+        if not self.benchmarking:
+            self.btn_benchmark.configure(state="disabled" if self._server_running() else "normal")
+        self.after(2000, self._refresh_benchmark_button)
+
+    def benchmark_profiles(self):
+        """Boots the server once per GC profile and reports startup time and GC pauses."""
+        if self._server_running():
+            messagebox.showerror("Benchmark JVM Profiles", "Stop the server before benchmarking JVM profiles.")
+            return
+        confirm = messagebox.askyesno(
+            "Benchmark JVM Profiles",
+            "The server will be started and stopped once per profile. This can take several minutes.\n\nContinue?"
+        )
+        if not confirm:
+            return
+
+        self.benchmarking = True
+        self.btn_benchmark.configure(state="disabled", text="Benchmarking...")
+        console = getattr(self.parent, "update_console", print)
+        profiles = [p for p in JVM_PROFILES if p not in ("auto", "none")]
+
+        def run():
+            # Whatever happens, the button must come back with a report
+            lines = []
+            try:
+                results = benchmark_harness.benchmark_jvm_profiles(self.server_name, profiles, console,
+                                                                 is_running=lambda name: self._server_running())
+            except Exception as e:
+                results, lines = [], [f"Benchmark failed: {e}"]
+            for r in results:
+                startup = f"{r['startup_seconds']}s" if r["startup_seconds"] is not None else "failed"
+                lines.append(f"{r['profile']}: startup {startup}, {r['gc_pauses']} GC pauses, "
+                             f"total {r['gc_pause_total_ms']} ms, max {r['gc_pause_max_ms']} ms")
+            self._after_if_open(lambda: self._on_benchmark_done("\n".join(lines)))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_benchmark_done(self, report):
+        self.benchmarking = False
+        self.btn_benchmark.configure(state="disabled" if self._server_running() else "normal", text="Benchmark Profiles")
+        messagebox.showinfo("Benchmark Results", report or "No results.")
+
     def change_icon(self):
         file_path = filedialog.askopenfilename(
             title="Select Server Icon",
@@ -495,6 +920,11 @@ class ServerPropertiesEditor(ctk.CTkToplevel):
             except:
                 pass
 
+        if self.combo_jvm_profile:
+            self.logic.set_server_jvm_profile(self.server_name, self.combo_jvm_profile.get())
+        if self.switch_cds:
+            self.logic.set_server_cds_enabled(self.server_name, self.switch_cds.get() == 1)
+
         # 2. Validate Automation Interval (Automation Tab)
         if self.var_auto_restart and self.var_auto_restart.get():
             interval_input = self.entry_interval.get()
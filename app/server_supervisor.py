@@ -0,0 +1,264 @@
+import collections
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import psutil
+
+import app.logic as logic
+from app.app_config import AppConfig
+from app.server_events import ServerEvent
+
+DEFAULT_SERVER_PORT = 25565
+
+# psutil priority classes per platform for the "process_priority" metadata key
+PRIORITY_LEVELS = {
+    "high": (-5, "HIGH_PRIORITY_CLASS"),
+    "normal": (0, "NORMAL_PRIORITY_CLASS"),
+    "below_normal": (5, "BELOW_NORMAL_PRIORITY_CLASS"),
+    "low": (10, "IDLE_PRIORITY_CLASS"),
+}
+
+
+class ServerSupervisor:
+    """Owns a pool of ServerRunners keyed by server name and staggers their startups."""
+
+    def __init__(self, console_callback, stagger_seconds=None, boot_timeout=None):
+        """
+        Args:
+            console_callback: func(str, str) -> None (Server name, log message)
+            stagger_seconds (int): Minimum gap between two JVM launches.
+            boot_timeout (int): Max seconds to wait for a booting server to become
+                                READY before launching the next one.
+        """
+        self.console_callback = console_callback
+        self.stagger_seconds = AppConfig.SUPERVISOR_STAGGER_SECONDS if stagger_seconds is None else stagger_seconds
+        self.boot_timeout = AppConfig.SUPERVISOR_BOOT_TIMEOUT if boot_timeout is None else boot_timeout
+
+        self.runners = {}
+        self.consoles = {}
+        self._queued = set()
+        self._crash_times = {}
+        self._pending_restarts = {}
+        self._lock = threading.Lock()
+        self._start_queue = queue.Queue()
+        threading.Thread(target=self._start_loop, daemon=True).start()
+
+    # --- Lookup ---
+
+    def get(self, server_name):
+        """Returns the runner for a server, or None if it was never started."""
+        return self.runners.get(server_name)
+
+    def is_running(self, server_name):
+        runner = self.runners.get(server_name)
+        return bool(runner and runner.running)
+
+    def is_active(self, server_name):
+        """True if the server is running, waiting in the start queue or about to be restarted after a crash."""
+        return server_name in self._queued or server_name in self._pending_restarts or self.is_running(server_name)
+
+    def is_restart_pending(self, server_name):
+        """True while a crashed server waits for its automatic restart."""
+        return server_name in self._pending_restarts
+
+    def running_servers(self):
+        return [name for name, runner in self.runners.items() if runner.running]
+
+    def ready_servers(self):
+        """Running servers that finished booting (and so answer on their port)."""
+        return [name for name, runner in self.runners.items() if runner.running and runner.boot_seconds is not None]
+
+    def get_console(self, server_name):
+        """Returns the buffered console lines of a server."""
+        return list(self.consoles.get(server_name, []))
+
+    # --- Ports ---
+
+    def get_server_port(self, server_name):
+        props = logic.load_server_properties(server_name)
+        try:
+            return int(props.get("server-port") or DEFAULT_SERVER_PORT)
+        except ValueError:
+            return DEFAULT_SERVER_PORT
+
+    def find_port_conflict(self, server_name):
+        """Returns the name of an active server using the same server-port, or None."""
+        port = self.get_server_port(server_name)
+        for other in list(self.runners):
+            if other != server_name and self.is_active(other) and self.get_server_port(other) == port:
+                return other
+        return None
+
+    # --- Lifecycle ---
+
+    def _log(self, server_name, text):
+        self.consoles.setdefault(server_name, collections.deque(maxlen=AppConfig.CONSOLE_BUFFER_LINES)).append(text)
+        self.console_callback(server_name, text)
+
+    def start(self, server_name, ram_allocation):
+        """
+        Queues a server start. Startups are launched one at a time, each waiting for
+        the previous boot to reach READY (or boot_timeout) and at least stagger_seconds.
+
+        Returns:
+            ServerRunner: The runner (events can be subscribed before it launches),
+                          or None if the server is already active or its port is taken.
+        """
+        pending = self._pending_restarts.pop(server_name, None)
+        if pending:
+            pending.cancel()
+            self._log(server_name, "[System] Pending crash restart replaced by this start.")
+
+        with self._lock:
+            if self.is_active(server_name):
+                self._log(server_name, "[Error] This server is already running.")
+                return None
+
+            conflict = self.find_port_conflict(server_name)
+            if conflict:
+                port = self.get_server_port(server_name)
+                self._log(server_name, f"[Error] Port {port} is already used by running server '{conflict}'. "
+                                       f"Change server-port in its properties.")
+                return None
+
+            runner = logic.ServerRunner(server_name, ram_allocation, lambda text: self._log(server_name, text))
+            runner.events.on(ServerEvent.ERROR, lambda data: self._on_crash(server_name, data))
+            self.runners[server_name] = runner
+            self.consoles[server_name] = collections.deque(maxlen=AppConfig.CONSOLE_BUFFER_LINES)
+            # A manual start resets crash-loop tracking
+            self._crash_times.pop(server_name, None)
+            self._queued.add(server_name)
+
+        self._enqueue(server_name)
+        return runner
+
+    def _enqueue(self, server_name):
+        with self._lock:
+            self._queued.add(server_name)
+        if self._start_queue.qsize() > 0 or self._booting():
+            self._log(server_name, "[System] Queued for a staggered start...")
+        self._start_queue.put(server_name)
+
+    def _booting(self):
+        return any(r.running and r.boot_seconds is None for r in self.runners.values())
+
+    def _start_loop(self):
+        last_launch = 0.0
+        while True:
+            server_name = self._start_queue.get()
+            runner = self.runners.get(server_name)
+            if not runner or server_name not in self._queued:
+                continue
+
+            # Let the previous boot reach READY so simultaneous boots don't thrash the CPU
+            deadline = time.monotonic() + self.boot_timeout
+            while self._booting() and time.monotonic() < deadline:
+                time.sleep(0.5)
+
+            gap = self.stagger_seconds - (time.monotonic() - last_launch)
+            if gap > 0:
+                time.sleep(gap)
+
+            with self._lock:
+                if server_name not in self._queued:
+                    continue  # Cancelled while waiting
+                self._queued.discard(server_name)
+
+            runner.start()
+            last_launch = time.monotonic()
+            if runner.running:
+                self._apply_resource_limits(server_name, runner)
+
+    def _apply_resource_limits(self, server_name, runner):
+        """Applies 'cpu_affinity' and 'process_priority' from metadata.json to the JVM."""
+        affinity, priority = logic.get_server_resource_limits(server_name)
+        if not affinity and not priority:
+            return
+
+        try:
+            proc = psutil.Process(runner.process.pid)
+            if affinity and hasattr(proc, "cpu_affinity"):
+                proc.cpu_affinity(affinity)
+                self._log(server_name, f"[System] CPU affinity set to cores {affinity}.")
+            if priority in PRIORITY_LEVELS:
+                nice_value, win_class = PRIORITY_LEVELS[priority]
+                proc.nice(getattr(psutil, win_class) if os.name == "nt" else nice_value)
+                self._log(server_name, f"[System] Process priority set to {priority}.")
+        except (psutil.Error, OSError, ValueError) as e:
+            self._log(server_name, f"[Warning] Failed to apply resource limits: {e}")
+
+    # --- Crash supervision ---
+
+    def _on_crash(self, server_name, data):
+        """Restarts a crashed server with exponential backoff, giving up on crash loops."""
+        if not logic.get_server_crash_restart(server_name):
+            return
+
+        now = time.monotonic()
+        window_start = now - AppConfig.CRASH_FAILURE_WINDOW
+        crashes = [t for t in self._crash_times.get(server_name, []) if t >= window_start]
+        crashes.append(now)
+        self._crash_times[server_name] = crashes
+
+        if len(crashes) > AppConfig.CRASH_MAX_FAILURES:
+            self._log(server_name, f"[Error] Server crashed {len(crashes)} times in "
+                                   f"{AppConfig.CRASH_FAILURE_WINDOW // 60} minutes. Giving up on automatic restarts.")
+            return
+
+        delay = min(AppConfig.CRASH_RESTART_BASE_DELAY * 2 ** (len(crashes) - 1), AppConfig.CRASH_RESTART_MAX_DELAY)
+        self._log(server_name, f"[System] Restarting crashed server in {delay}s "
+                               f"(attempt {len(crashes)}/{AppConfig.CRASH_MAX_FAILURES})...")
+
+        timer = threading.Timer(delay, self._restart_after_crash, args=(server_name,))
+        timer.daemon = True
+        self._pending_restarts[server_name] = timer
+        timer.start()
+
+    def _restart_after_crash(self, server_name):
+        self._pending_restarts.pop(server_name, None)
+        if self.is_active(server_name):
+            return
+        # Reuse the same runner so existing event subscriptions keep working
+        self._enqueue(server_name)
+
+    def stop(self, server_name, callback=None):
+        """
+        Stops a running server (without blocking), or removes it from the start queue.
+
+        Returns:
+            concurrent.futures.Future: Resolves with the exit code once the server is down.
+        """
+        pending = self._pending_restarts.pop(server_name, None)
+        if pending:
+            pending.cancel()
+            self._log(server_name, "[System] Pending crash restart cancelled.")
+            runner = self.runners.get(server_name)
+            if runner and not runner.running:
+                runner.events.emit(ServerEvent.STOPPED)  # Lets the UI leave its "restarting" state
+
+        with self._lock:
+            if server_name in self._queued:
+                self._queued.discard(server_name)
+                self._log(server_name, "[System] Queued start cancelled.")
+                runner = self.runners.get(server_name)
+                if runner:
+                    runner.events.emit(ServerEvent.STOPPED)
+                future = Future()
+                future.set_result(None)
+                if callback:
+                    callback(None)
+                return future
+
+        runner = self.runners.get(server_name)
+        if runner:
+            return runner.stop(callback)
+        future = Future()
+        future.set_result(None)
+        return future
+
+    def stop_all(self):
+        """Stops every server. Returns the list of stop futures."""
+        return [self.stop(server_name) for server_name in list(self.runners)]
@@ -25,6 +25,7 @@ class ServerWizard(ctk.CTkToplevel):
             "difficulty": "normal",
             "view_distance": "10",
             "simulation_distance": "10",
+            "pregen_radius": 0,
             "location": "default",
             "icon_path": None
         }
@@ -265,6 +266,13 @@ class ServerWizard(ctk.CTkToplevel):
         self.entry_sim_distance.pack(fill="x")
         if self.wizard_data["simulation_distance"]: self.entry_sim_distance.insert(0, self.wizard_data["simulation_distance"])
 
+        # --- Bottom Row: Pre-generation ---
+        pregen_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        pregen_frame.pack(fill="x", expand=True, pady=(20, 0))
+        ctk.CTkLabel(pregen_frame, text="Pre-generate Radius (blocks, optional):").pack(anchor="w", pady=(0, 5))
+        self.entry_pregen_radius = ctk.CTkEntry(pregen_frame, placeholder_text="e.g. 2000 - generated in the background after the first start")
+        self.entry_pregen_radius.pack(fill="x")
+        if self.wizard_data["pregen_radius"]: self.entry_pregen_radius.insert(0, str(self.wizard_data["pregen_radius"]))
 
 
     def show_step_4(self):
@@ -333,7 +341,8 @@ class ServerWizard(ctk.CTkToplevel):
             f"Game Mode: {self.wizard_data['game_mode']}\n"
             f"Difficulty: {self.wizard_data['difficulty']}\n"
             f"View Distance: {self.wizard_data['view_distance']}\n"
-            f"Simulation Distance: {self.wizard_data['simulation_distance']}\n\n"
+            f"Simulation Distance: {self.wizard_data['simulation_distance']}\n"
+            f"Pre-generate: {str(self.wizard_data['pregen_radius']) + ' blocks' if self.wizard_data['pregen_radius'] else 'No'}\n\n"
             f"Icon: {icon_status}\n"
             f"Location: {SERVERS_DIR / self.wizard_data['name']}"
         )
@@ -394,6 +403,13 @@ class ServerWizard(ctk.CTkToplevel):
                 self.entry_view_distance.configure(border_color="red")
                 self.entry_sim_distance.configure(border_color="red")
                 return
+
+            pregen = self.entry_pregen_radius.get().strip() or "0"
+            if not pregen.isdigit():
+                self.entry_pregen_radius.configure(border_color="red")
+                return
+            self.entry_pregen_radius.configure(border_color=["#979da2", "#565b5e"])
+            self.wizard_data["pregen_radius"] = int(pregen)
             
             
         elif self.current_step == 6:
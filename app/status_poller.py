@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.app_config import AppConfig
+from app.server_events import ServerEvent, ServerEventEmitter
+from app.server_list_ping import query_status, ServerListPingError
+
+
+class StatusPoller:
+    """
+    Polls every known server on localhost with Server List Ping, independently of
+    whether this app launched it. Pings run on a small shared worker pool and a
+    server is never polled twice at once, so slow or dead servers can't pile up.
+
+    Servers share ports (most keep the default 25565): a port held by a server this
+    app runs belongs to that server, and the others on it are not pinged.
+
+    READY still comes from the "Done (" console line rather than a first successful
+    ping: the port is bound before that line is printed, and servers with
+    enable-status=false never answer pings, so gating on one would hang their READY.
+    A ping is requested right after READY instead (poll_now).
+    """
+
+    def __init__(self, supervisor, servers_callback, interval=None, max_workers=None):
+        """
+        Args:
+            supervisor (ServerSupervisor): Used for server ports and running runners.
+            servers_callback: func() -> list (Names of all known servers)
+            interval (int): Seconds between two polls of the same server.
+            max_workers (int): Concurrent pings across all servers.
+        """
+        self.supervisor = supervisor
+        self.servers_callback = servers_callback
+        self.interval = interval or AppConfig.STATUS_POLL_INTERVAL
+        self.events = ServerEventEmitter()
+        self.statuses = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or AppConfig.STATUS_POLL_WORKERS,
+                                            thread_name_prefix="status-poll")
+        self._stop_event = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get(self, server_name):
+        """Last ServerStatus of a server, or None if it is offline or was never polled."""
+        return self.statuses.get(server_name)
+
+    def poll_now(self, server_name):
+        """Schedules an immediate poll (no-op if one is already running)."""
+        with self._lock:
+            if server_name in self._in_flight or self._stop_event.is_set():
+                return
+            self._in_flight.add(server_name)
+        self._executor.submit(self._poll, server_name)
+
+    def _loop(self):
+        while True:
+            for server_name in self.servers_callback():
+                self.poll_now(server_name)
+            if self._stop_event.wait(self.interval):
+                return
+
+    def _poll(self, server_name):
+        try:
+            port = self.supervisor.get_server_port(server_name)
+            if not self.supervisor.is_active(server_name) and self.supervisor.find_port_conflict(server_name):
+                status = None  # Whatever answers is the running server that owns the port
+            else:
+                try:
+                    status = query_status("127.0.0.1", port, timeout=AppConfig.STATUS_POLL_TIMEOUT)
+                except ServerListPingError:
+                    status = None
+
+            self.statuses[server_name] = status
+            self.events.emit(ServerEvent.STATUS, {"server": server_name, "status": status})
+
+            runner = self.supervisor.get(server_name)
+            if runner and runner.running:
+                runner.update_status(status)
+        except Exception as e:
+            print(f"Failed to poll status of {server_name}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(server_name)
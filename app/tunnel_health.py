@@ -0,0 +1,168 @@
+import collections
+import threading
+import time
+
+import app.logic as logic
+from app.app_config import AppConfig
+from app.server_list_ping import connect, ping, parse_address, resolve_srv, ServerListPingError
+
+
+class TunnelHealthMonitor:
+    """
+    Periodically probes the public tunnel address and restarts the playit agent with
+    backoff when probes keep failing.
+
+    While a local server is up, a probe is a full Minecraft status ping through the
+    tunnel. Otherwise the ping could only fail (nothing answers behind the tunnel), so
+    the probe is a plain TCP connect to the tunnel's public end.
+    """
+
+    def __init__(self, playit_manager, console_callback, health_callback=None,
+                 interval=None, window=None, failure_threshold=None, local_server_up=None):
+        """
+        Args:
+            playit_manager (PlayitManager): Agent to probe and restart.
+            console_callback: func(str) -> None (Log message)
+            health_callback: func(dict) -> None (Called with stats() after every probe)
+            interval (int): Seconds between probes.
+            window (int): Number of probes kept for the rolling statistics.
+            failure_threshold (int): Consecutive failures that trigger an agent restart.
+            local_server_up: func() -> bool (True while a local server has finished booting)
+        """
+        self.playit_manager = playit_manager
+        self.console_callback = console_callback
+        self.health_callback = health_callback or (lambda stats: None)
+        self.local_server_up = local_server_up or (lambda: True)
+        self.interval = interval or AppConfig.TUNNEL_HEALTH_INTERVAL
+        self.failure_threshold = failure_threshold or AppConfig.TUNNEL_HEALTH_FAILURES
+        self.samples = collections.deque(maxlen=window or AppConfig.TUNNEL_HEALTH_WINDOW)
+        self.consecutive_failures = 0
+        self.restart_attempts = 0
+        self._port_unknown_logged = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive() and not self._stop_event.is_set():
+            return
+        # Each run gets its own event: a stopped thread still finishing a probe must not
+        # keep a new run from starting, nor pick up its cleared event and carry on
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._loop, args=(self._stop_event,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.samples.clear()
+        self.consecutive_failures = 0
+        self.restart_attempts = 0
+        self._port_unknown_logged = False
+
+    def get_address(self):
+        """
+        Public address to probe: the stored playit_dns name, else the agent's address,
+        else the agent's tunnel_addr IP:PORT. Names without a port are resolved like the
+        game client does, through their _minecraft._tcp SRV record (joinmc.link tunnels
+        only publish their port there).
+
+        Returns:
+            tuple: (host, port), or None while the port is unknown.
+        """
+        candidates = (logic.load_config().get("playit_dns"), self.playit_manager.current_address,
+                      self.playit_manager.tunnel_endpoint)
+        for address in candidates:
+            if not address:
+                continue
+            host, port = parse_address(address, default_port=None)
+            if port is None:
+                record = resolve_srv(host, timeout=AppConfig.TUNNEL_HEALTH_TIMEOUT)
+                if record:
+                    host, port = record
+            if port is not None:
+                return host, port
+        return None
+
+    # --- Probing ---
+
+    def probe(self, host, port, status=True):
+        """
+        Probes one address.
+
+        Args:
+            status (bool): Send a status ping after connecting (False: TCP connect only).
+
+        Returns:
+            dict: 'time', 'ok', 'connect_ms', 'ping_ms' (None without a status ping) and 'error'.
+        """
+        sample = {"time": time.time(), "ok": False, "connect_ms": None, "ping_ms": None, "error": None}
+        try:
+            if status:
+                _, sample["connect_ms"], sample["ping_ms"] = ping(host, port, timeout=AppConfig.TUNNEL_HEALTH_TIMEOUT)
+            else:
+                sample["connect_ms"] = connect(host, port, timeout=AppConfig.TUNNEL_HEALTH_TIMEOUT)
+            sample["ok"] = True
+        except ServerListPingError as e:
+            sample["error"] = str(e)
+        return sample
+
+    def stats(self):
+        """Rolling statistics over the probe window."""
+        samples = list(self.samples)
+        ok = [s for s in samples if s["ok"]]
+        pinged = [s for s in ok if s["ping_ms"] is not None]
+        return {
+            "samples": len(samples),
+            "success_rate": round(len(ok) / len(samples), 2) if samples else None,
+            "avg_connect_ms": round(sum(s["connect_ms"] for s in ok) / len(ok), 1) if ok else None,
+            "avg_ping_ms": round(sum(s["ping_ms"] for s in pinged) / len(pinged), 1) if pinged else None,
+            "last": samples[-1] if samples else None,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+    def _loop(self, stop_event):
+        while not stop_event.wait(self.interval):
+            # Nothing to check until the agent reports its address
+            if not self.playit_manager.running or not self.playit_manager.current_address:
+                continue
+            target = self.get_address()
+            if target is None:
+                # A wrong guess (25565) would fail every probe and restart a healthy agent
+                if not self._port_unknown_logged:
+                    self._port_unknown_logged = True
+                    self.console_callback("[Warning] Tunnel port unknown (no port in the address and no "
+                                          "_minecraft._tcp SRV record). Tunnel health checks paused.")
+                continue
+            self._port_unknown_logged = False
+            address = f"{target[0]}:{target[1]}"
+            local_up = self.local_server_up()
+            sample = self.probe(*target, status=local_up)
+            if not sample["ok"] and local_up and not self.local_server_up():
+                # The server went down during the ping: only the tunnel itself is judged
+                sample = self.probe(*target, status=False)
+            if stop_event.is_set():
+                return  # Stopped during the probe: the result belongs to the old run
+            self.samples.append(sample)
+
+            if sample["ok"]:
+                self.consecutive_failures = 0
+                self.restart_attempts = 0
+            else:
+                self.consecutive_failures += 1
+                self.console_callback(f"[Warning] Tunnel probe to {address} failed "
+                                      f"({self.consecutive_failures}/{self.failure_threshold}): {sample['error']}")
+            self.health_callback(self.stats())
+
+            if self.consecutive_failures >= self.failure_threshold:
+                self._restart_agent(stop_event)
+
+    def _restart_agent(self, stop_event):
+        self.restart_attempts += 1
+        delay = min(AppConfig.TUNNEL_RESTART_BASE_DELAY * 2 ** (self.restart_attempts - 1),
+                    AppConfig.TUNNEL_RESTART_MAX_DELAY)
+        self.console_callback(f"[System] Tunnel unreachable. Restarting agent in {delay}s "
+                              f"(attempt {self.restart_attempts})...")
+        self.playit_manager.stop()
+        if stop_event.wait(delay):
+            return  # Monitoring stopped (tunnel stopped by the user) while waiting
+        self.consecutive_failures = 0
+        self.playit_manager.start()
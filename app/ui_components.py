@@ -85,6 +85,11 @@ class ConsoleWidget(ctk.CTkTextbox):
             wrap="word"
         )
         
+    def clear(self):
+        self.configure(state="normal")
+        self.delete("1.0", "end")
+        self.configure(state="disabled")
+
     def log(self, message):
         self.configure(state="normal")
         self.insert("end", "> " + message + "\n")
@@ -291,4 +296,41 @@ class TunnelSetupDialog(ctk.CTkToplevel):
 
     def get_input(self):
         self.master.wait_window(self)
-        return self.result
\ No newline at end of file
+        return self.result
+
+class BootTimelineWidget(ctk.CTkFrame):
+    """Waterfall view of one boot timeline (see BootProfiler.finish)."""
+
+    PHASE_COLORS = ["#94a3b8", "#6366f1", "#3b82f6", "#f97316", "#22c55e", "#34d399"]
+
+    def __init__(self, master, boot, previous=None, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.grid_columnconfigure(1, weight=1)
+
+        total = boot.get("seconds") or 0
+        header = f"Boot on {boot.get('date', '?')[:16].replace('T', ' ')}: {total}s"
+        if previous and previous.get("seconds"):
+            delta = round(total - previous["seconds"], 2)
+            header += f" ({'+' if delta >= 0 else ''}{delta}s vs previous)"
+        ctk.CTkLabel(self, text=header, font=AppConfig.FONT_BODY, anchor="w").grid(
+            row=0, column=0, columnspan=2, sticky="w", padx=5, pady=(0, 6))
+
+        phases = boot.get("phases") or []
+        if not phases or total <= 0:
+            ctk.CTkLabel(self, text="No phase data recorded for this boot.", font=AppConfig.FONT_NOTE,
+                         text_color=AppConfig.COLOR_TEXT_NOTE).grid(row=1, column=0, columnspan=2, sticky="w", padx=5)
+            return
+
+        for i, phase in enumerate(phases):
+            duration = phase["end"] - phase["start"]
+            ctk.CTkLabel(self, text=f"{phase['phase']} ({duration:.2f}s)", font=AppConfig.FONT_BODY_SMALL,
+                         anchor="w", width=170).grid(row=i + 1, column=0, sticky="w", padx=5, pady=1)
+
+            track = ctk.CTkFrame(self, height=14, fg_color=("gray90", "gray20"), corner_radius=3)
+            track.grid(row=i + 1, column=1, sticky="ew", padx=5, pady=1)
+
+            bar = ctk.CTkFrame(track, height=14, corner_radius=3,
+                               fg_color=self.PHASE_COLORS[i % len(self.PHASE_COLORS)])
+            # Waterfall: each bar starts where the phase started on the shared time axis
+            bar.place(relx=min(phase["start"] / total, 1.0), rely=0,
+                      relwidth=max(duration / total, 0.005), relheight=1.0)
@@ -0,0 +1,346 @@
+import array
+import collections
+import datetime
+import gzip
+import mmap
+import multiprocessing
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from app.app_config import AppConfig
+from app.constants import SERVERS_DIR
+from app.server_properties import get_server_properties
+
+# Anvil (.mca): 1024 chunk locations (3-byte sector offset + 1-byte sector count),
+# then 1024 big-endian last-modified timestamps; everything in 4 KiB sectors
+SECTOR_BYTES = 4096
+HEADER_BYTES = 2 * SECTOR_BYTES
+HEADER_SECTORS = 2
+REGION_NAME = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+# Folders of .mca files: chunks, entities (1.17+) and points of interest (1.14+)
+REGION_KINDS = ("region", "entities", "poi")
+# Vanilla folder names of the built-in dimensions
+DIMENSION_NAMES = {"": "overworld", "DIM-1": "the_nether", "DIM1": "the_end"}
+
+# One region file. chunks: chunks present; used_sectors: header + chunk sectors;
+# file_sectors: file size in sectors; newest/oldest: chunk timestamps (epoch seconds,
+# None without chunks); invalid: locations pointing outside the file
+RegionStats = collections.namedtuple(
+    "RegionStats", "dimension kind x z file_bytes chunks used_sectors file_sectors newest oldest invalid error path"
+)
+
+WorldReport = collections.namedtuple("WorldReport", "world_dir regions seconds")
+
+# NBT tag ids -> struct codes of fixed-size values (1-6) and of array elements (7, 11, 12)
+NBT_SCALARS = {1: ">b", 2: ">h", 3: ">i", 4: ">q", 5: ">f", 6: ">d"}
+NBT_ARRAYS = {7: "b", 11: "i", 12: "q"}
+NBT_STRING, NBT_LIST, NBT_COMPOUND = 8, 9, 10
+
+# Heatmap cells, from emptiest / oldest to fullest / newest
+DENSITY_RAMP = " .:-=+*#%@"
+# (max age in seconds, cell)
+AGE_BUCKETS = [(86400, "@"), (7 * 86400, "#"), (30 * 86400, "+"), (365 * 86400, ":")]
+AGE_OLDER = "."
+
+
+def _words(data):
+    """Big-endian 32-bit words as an array (C speed, no per-entry Python loop)."""
+    words = array.array("I", data)
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words
+
+
+def _nbt_value(data, offset, tag):
+    """Decodes one NBT payload. Returns (value, offset after it)."""
+    if tag in NBT_SCALARS:
+        fmt = NBT_SCALARS[tag]
+        return struct.unpack_from(fmt, data, offset)[0], offset + struct.calcsize(fmt)
+    if tag in NBT_ARRAYS:
+        (length,) = struct.unpack_from(">i", data, offset)
+        fmt = f">{length}{NBT_ARRAYS[tag]}"
+        return list(struct.unpack_from(fmt, data, offset + 4)), offset + 4 + struct.calcsize(fmt)
+    if tag == NBT_STRING:
+        (length,) = struct.unpack_from(">H", data, offset)
+        return data[offset + 2:offset + 2 + length].decode("utf-8", errors="replace"), offset + 2 + length
+    if tag == NBT_LIST:
+        item_tag, length = struct.unpack_from(">bi", data, offset)
+        offset += 5
+        items = []
+        for _ in range(length):
+            item, offset = _nbt_value(data, offset, item_tag)
+            items.append(item)
+        return items, offset
+    if tag == NBT_COMPOUND:
+        compound = {}
+        while data[offset]:
+            child_tag = data[offset]
+            name, offset = _nbt_value(data, offset + 1, NBT_STRING)
+            compound[name], offset = _nbt_value(data, offset, child_tag)
+        return compound, offset + 1
+    raise ValueError(f"Unknown NBT tag {tag}.")
+
+
+def get_world_dir(server_name):
+    """Folder of a server's world (level-name)."""
+    level_name = get_server_properties(server_name).get("level-name") or "world"
+    return os.path.join(SERVERS_DIR, server_name, level_name)
+
+
+def world_spawn(world_path):
+    """
+    Reads the world spawn from level.dat.
+
+    Returns:
+        tuple: (x, z) in blocks, or None if level.dat is missing or unreadable.
+    """
+    try:
+        with gzip.open(os.path.join(world_path, "level.dat"), "rb") as f:
+            data = f.read()
+        if data[0] != NBT_COMPOUND:
+            return None
+        _, offset = _nbt_value(data, 1, NBT_STRING)  # Root name
+        level = _nbt_value(data, offset, NBT_COMPOUND)[0].get("Data", {})
+    except (OSError, EOFError, zlib.error, ValueError, IndexError, struct.error):
+        return None
+    if "SpawnX" in level and "SpawnZ" in level:
+        return level["SpawnX"], level["SpawnZ"]
+    pos = (level.get("spawn") or {}).get("pos")  # 1.21.9+: spawn {dimension, pos: [I; x, y, z], ...}
+    return (pos[0], pos[2]) if isinstance(pos, list) and len(pos) == 3 else None
+
+
+def read_header(path):
+    """
+    Memory-maps a region file and copies out only its 8 KiB header.
+
+    Returns:
+        tuple: (file size in bytes, header bytes or None if the file is shorter than a header)
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER_BYTES:
+            return size, None  # Empty (0 bytes) or truncated: the server rewrites it
+        with mmap.mmap(f.fileno(), HEADER_BYTES, access=mmap.ACCESS_READ) as view:
+            return size, view[:HEADER_BYTES]
+
+
+def analyze_region(dimension, kind, path):
+    """Reads the header of one region file. Never raises: failures end up in .error."""
+    match = REGION_NAME.match(os.path.basename(path))
+    x, z = (int(match.group(1)), int(match.group(2))) if match else (None, None)
+    try:
+        size, header = read_header(path)
+    except (OSError, ValueError) as e:
+        return RegionStats(dimension, kind, x, z, 0, 0, 0, 0, None, None, 0, str(e), path)
+
+    file_sectors = -(-size // SECTOR_BYTES)
+    if header is None:
+        return RegionStats(dimension, kind, x, z, size, 0, 0, file_sectors, None, None, 0, None, path)
+
+    # Only C-level passes (count/min/max/filter/sum) over the 1024 entries per file
+    locations = _words(header[:SECTOR_BYTES])
+    chunks = len(locations) - locations.count(0)  # Empty slots are 0
+    # The low byte of every location is its sector count
+    used_sectors = HEADER_SECTORS + sum(header[3:SECTOR_BYTES:4])
+    # Every entry is checked: a small offset can carry a large sector count, so the
+    # lowest and highest offsets alone don't bound the file
+    invalid = sum(1 for location in locations if location and (
+        (location >> 8) < HEADER_SECTORS or (location >> 8) + (location & 0xFF) > file_sectors)) if chunks else 0
+
+    stamps = _words(header[SECTOR_BYTES:])
+    newest = max(stamps) or None
+    oldest = min(filter(None, stamps), default=None)
+    return RegionStats(dimension, kind, x, z, size, chunks, used_sectors, file_sectors, newest, oldest, invalid, None,
+                       path)
+
+
+def _analyze_batch(files):
+    # Module-level so worker processes can unpickle it
+    return [analyze_region(*item) for item in files]
+
+
+def chunk_heatmap(path):
+    """
+    Last-modified timestamps of the 32x32 chunks of one region file.
+
+    Returns:
+        list: 32 rows (z) of 32 timestamps (x); 0 where the chunk doesn't exist.
+    """
+    size, header = read_header(path)
+    if header is None:
+        return [[0] * 32 for _ in range(32)]
+    stamps = _words(header[SECTOR_BYTES:])
+    return [list(stamps[row * 32:row * 32 + 32]) for row in range(32)]
+
+
+def _dimension_name(relative):
+    parts = [p for p in relative.replace("\\", "/").split("/") if p not in ("", ".")]
+    if len(parts) >= 3 and parts[-3] == "dimensions":
+        return f"{parts[-2]}:{parts[-1]}"  # Datapack dimension: dimensions/<namespace>/<name>
+    return DIMENSION_NAMES.get(parts[-1] if parts else "", "/".join(parts))
+
+
+def find_region_files(world_dir):
+    """
+    Lists the .mca files of a world, including the <level>_nether / <level>_the_end
+    folders Bukkit-based servers use.
+
+    Returns:
+        list: (dimension, kind, path) tuples.
+    """
+    files = []
+    for root in (world_dir, f"{world_dir}_nether", f"{world_dir}_the_end"):
+        for dirpath, dirnames, filenames in os.walk(root):
+            kind = os.path.basename(dirpath)
+            if kind not in REGION_KINDS:
+                continue
+            dirnames.clear()  # Region folders have no subfolders worth walking
+            dimension = _dimension_name(os.path.relpath(os.path.dirname(dirpath), root))
+            files.extend((dimension, kind, os.path.join(dirpath, name)) for name in filenames if name.endswith(".mca"))
+    return files
+
+
+def analyze_world(server_name, max_workers=None):
+    """
+    Reads the header of every region file of a server's world (level-name). Large
+    worlds are split into batches over a process pool; small ones are read inline,
+    where starting the workers would take longer than the work.
+
+    Returns:
+        WorldReport
+    """
+    world_path = get_world_dir(server_name)
+    started = time.monotonic()
+    files = find_region_files(world_path)
+
+    if len(files) < AppConfig.WORLD_ANALYZER_POOL_MIN_FILES:
+        regions = _analyze_batch(files)
+    else:
+        size = AppConfig.WORLD_ANALYZER_BATCH
+        batches = [files[i:i + size] for i in range(0, len(files), size)]
+        regions = []
+        # Spawned, never forked, workers on every platform: forking the Tk process with its
+        # threads is unsafe. Frozen builds also rely on freeze_support() in main.py here
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+            for result in pool.map(_analyze_batch, batches):
+                regions.extend(result)
+    return WorldReport(world_path, regions, round(time.monotonic() - started, 2))
+
+
+def _mb(sectors):
+    return sectors * SECTOR_BYTES / (1024 * 1024)
+
+
+def _grid(regions, cell_value, width):
+    """
+    Renders region coordinates as a text grid (north up), merging regions into one
+    cell when the world is wider than `width` cells.
+
+    Args:
+        cell_value: func(list of RegionStats) -> str (One character for a cell.)
+    """
+    placed = [r for r in regions if r.x is not None]
+    if not placed:
+        return []
+    min_x, max_x = min(r.x for r in placed), max(r.x for r in placed)
+    min_z, max_z = min(r.z for r in placed), max(r.z for r in placed)
+    scale = max(1, -(-(max(max_x - min_x, max_z - min_z) + 1) // width))
+
+    cells = collections.defaultdict(list)
+    for r in placed:
+        cells[((r.x - min_x) // scale, (r.z - min_z) // scale)].append(r)
+    columns, rows = (max_x - min_x) // scale + 1, (max_z - min_z) // scale + 1
+    lines = [f"x {min_x * 512}..{max_x * 512 + 511}, z {min_z * 512}..{max_z * 512 + 511} "
+             f"(1 cell = {scale}x{scale} regions)"]
+    for row in range(rows):
+        lines.append("|" + "".join(cell_value(cells[(col, row)]) if (col, row) in cells else " "
+                                   for col in range(columns)) + "|")
+    return lines
+
+
+def _density_cell(regions):
+    fill = sum(r.chunks for r in regions) / (1024 * len(regions))
+    return DENSITY_RAMP[min(len(DENSITY_RAMP) - 1, round(fill * (len(DENSITY_RAMP) - 1)))] if fill else "·"
+
+
+def _age_char(now, stamp):
+    if not stamp:
+        return "·"
+    age = now - stamp
+    return next((char for limit, char in AGE_BUCKETS if age < limit), AGE_OLDER)
+
+
+def _age_cell(now):
+    return lambda regions: _age_char(now, max((r.newest for r in regions if r.newest), default=None))
+
+
+def _chunk_map(region, now):
+    """Last write of every chunk of one region as 32 text rows (north up), or [] if it can't be read."""
+    try:
+        rows = chunk_heatmap(region.path)
+    except (OSError, ValueError):
+        return []
+    return ["|" + "".join(_age_char(now, stamp) for stamp in row) + "|" for row in rows]
+
+
+def format_report(report, top=10, now=None):
+    """Text report: totals per dimension and folder, the largest and most fragmented regions, heatmaps."""
+    now = now or time.time()
+    regions = report.regions
+    lines = [f"{report.world_dir}: {len(regions)} region files read in {report.seconds}s", ""]
+    if not regions:
+        return "\n".join(lines + ["No region files found (has the server been started yet?)."])
+
+    totals = collections.OrderedDict()
+    for r in sorted(regions, key=lambda r: (r.dimension != "overworld", r.dimension, r.kind)):
+        t = totals.setdefault((r.dimension, r.kind), [0, 0, 0, 0])
+        t[0] += 1
+        t[1] += r.chunks
+        t[2] += r.file_sectors
+        t[3] += max(0, r.file_sectors - r.used_sectors)
+    lines.append(f"{'Dimension / folder':<30} {'Files':>7} {'Chunks':>9} {'Size MB':>9} {'Unused MB':>10}")
+    for (dimension, kind), (count, chunks, sectors, unused) in totals.items():
+        lines.append(f"{dimension + ' / ' + kind:<30} {count:>7} {chunks:>9} {_mb(sectors):>9.1f} {_mb(unused):>10.1f}")
+
+    def row(r):
+        unused = max(0, r.file_sectors - r.used_sectors)
+        fragmentation = unused / r.file_sectors * 100 if r.file_sectors else 0
+        newest = datetime.datetime.fromtimestamp(r.newest).strftime("%Y-%m-%d") if r.newest else "-"
+        return (f"  {r.dimension}/{r.kind} r.{r.x}.{r.z}: {r.chunks} chunks, {_mb(r.file_sectors):.1f} MB, "
+                f"{fragmentation:.0f}% unused, last write {newest}")
+
+    lines += ["", "Largest regions:"]
+    lines += [row(r) for r in sorted(regions, key=lambda r: r.file_sectors, reverse=True)[:top]]
+    fragmented = [r for r in regions if r.file_sectors > r.used_sectors > 0]
+    if fragmented:
+        lines += ["", "Most unused space (freed sectors left behind by rewritten chunks):"]
+        lines += [row(r) for r in sorted(fragmented, key=lambda r: r.file_sectors - r.used_sectors, reverse=True)[:top]]
+
+    problems = [r for r in regions if r.error or r.invalid]
+    if problems:
+        lines += ["", "Unreadable or damaged headers:"]
+        lines += [f"  {r.dimension}/{r.kind} r.{r.x}.{r.z}: {r.error or f'{r.invalid} chunk(s) point outside the file'}"
+                  for r in problems[:top]]
+
+    width = AppConfig.WORLD_HEATMAP_WIDTH
+    for dimension in dict.fromkeys(d for d, kind in totals if kind == "region"):
+        chunk_regions = [r for r in regions if r.dimension == dimension and r.kind == "region"]
+        lines += ["", f"{dimension}: chunks per region ('{DENSITY_RAMP[1]}' few .. '{DENSITY_RAMP[-1]}' full, '·' empty)"]
+        lines += _grid(chunk_regions, _density_cell, width)
+        lines += ["", f"{dimension}: last write ('@' day, '#' week, '+' month, ':' year, '.' older)"]
+        lines += _grid(chunk_regions, _age_cell(now), width)
+
+    # Inside the largest regions, chunk by chunk: shows which part of a big file is still in use
+    largest = sorted((r for r in regions if r.kind == "region" and r.chunks and r.x is not None),
+                     key=lambda r: r.file_sectors, reverse=True)[:AppConfig.WORLD_CHUNK_MAPS]
+    for r in largest:
+        lines += ["", f"{r.dimension} r.{r.x}.{r.z}: last write per chunk (x {r.x * 512}..{r.x * 512 + 511}, "
+                      f"z {r.z * 512}..{r.z * 512 + 511})"]
+        lines += _chunk_map(r, now)
+    return "\n".join(lines)
@@ -0,0 +1,132 @@
+import re
+import unittest
+from pathlib import Path
+
+import app.playit_log_parser as playit_log_parser
+from app.playit_manager import PlayitManager
+
+CORPUS = Path(__file__).parent / "data" / "playit_agent.log"
+
+
+class RecordingManager(PlayitManager):
+    """PlayitManager that records its callbacks instead of driving the UI."""
+
+    def __init__(self):
+        self.events = []
+        super().__init__(
+            console_callback=lambda text: self.events.append(("console", text)),
+            status_callback=lambda status, address: self.events.append(("status", status, address)),
+            claim_callback=lambda url: self.events.append(("claim", url)),
+            on_ready_callback=lambda: self.events.append(("ready",)),
+        )
+
+    def feed(self, data):
+        for raw in self.LINE_SPLIT.split(data):
+            self._handle_line(raw)
+
+
+class LegacyManager(RecordingManager):
+    """The per-line regex parser the single-pass parser replaced, kept verbatim as the reference."""
+
+    def _handle_line(self, raw):
+        line = raw.decode('utf-8', errors='replace').strip()
+        if not line:
+            return
+
+        clean_line = re.sub(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])', '', line)
+
+        is_spam = any(s in clean_line for s in playit_log_parser.SPAM_LOGS)
+        if not is_spam or "ERROR" in clean_line:
+            self.console_callback(f"[Playit] {clean_line}")
+
+        self._parse_line(clean_line)
+
+    def _parse_line(self, line):
+        claim_match = re.search(r"(https://playit\.gg/claim/[a-zA-Z0-9]+)", line)
+        if claim_match:
+            url = claim_match.group(1)
+            if not self.claim_url_detected:
+                self.claim_url_detected = True
+                self.claim_callback(url)
+
+        domain_match = re.search(r"([a-z0-9-.]+\.(?:ply|playit)\.gg|[a-z0-9-.]+\.joinmc\.link)", line)
+        if domain_match:
+            address = domain_match.group(1).rstrip('.')
+            if "at.ply.gg" not in address:
+                if self.current_address is None and self.on_ready_callback:
+                    self.on_ready_callback()
+                self.current_address = address
+                self.status_callback("Online", address)
+                return
+
+        ip_match = re.search(r"tunnel_addr:\s*([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+:[0-9]+)", line)
+        if ip_match:
+            address = ip_match.group(1)
+            if self.current_address is None and self.on_ready_callback:
+                self.on_ready_callback()
+            self.current_address = address
+            self.status_callback("Online", address)
+            return
+
+        if "tunnel running" in line:
+            if not getattr(self, "current_address", None):
+                self.status_callback("Online", "Check Console")
+            return
+
+        if "AgentDisabledOverLimit" in line or "Account limit reached" in line:
+            self.status_callback("Error", None)
+            self.console_callback("[Playit] ❌ ERROR: Account limit reached!")
+            self.console_callback("[Playit] You have too many agents. Please go to https://playit.gg/dashboard/agents and delete unused agents.")
+            return
+
+        if "AgentVersionTooOld" in line:
+            self.console_callback("[Playit] ERROR: Agent version too old. Restarting to update...")
+
+
+def _normalized(events):
+    # The old parser stripped before removing ANSI codes, so "\x1b[0m  text" kept its
+    # leading spaces; the new one strips afterwards. That is the only intended difference.
+    return [(kind, " ".join(rest[0].split()), *rest[1:]) if kind == "console" else (kind, *rest)
+            for kind, *rest in events]
+
+
+class PlayitLogParserTest(unittest.TestCase):
+    def setUp(self):
+        self.data = CORPUS.read_bytes()
+
+    def test_manager_reacts_like_legacy_parser(self):
+        legacy, current = LegacyManager(), RecordingManager()
+        legacy.feed(self.data)
+        current.feed(self.data)
+        self.assertEqual(_normalized(current.events), _normalized(legacy.events))
+        self.assertEqual(current.current_address, legacy.current_address)
+
+    def test_every_line_matches_legacy_parser(self):
+        # Line by line on a fresh manager, so no line's effect is masked by an earlier one
+        for raw in PlayitManager.LINE_SPLIT.split(self.data):
+            with self.subTest(line=raw):
+                legacy, current = LegacyManager(), RecordingManager()
+                legacy.feed(raw)
+                current.feed(raw)
+                self.assertEqual(_normalized(current.events), _normalized(legacy.events))
+
+    def test_corpus_covers_every_field(self):
+        parsed = [p for p in map(playit_log_parser.parse_line, PlayitManager.LINE_SPLIT.split(self.data)) if p]
+        self.assertTrue(any(p.claim_url for p in parsed))
+        self.assertTrue(any(p.address and p.address[0].isdigit() for p in parsed))
+        self.assertTrue(any(p.address and not p.address[0].isdigit() for p in parsed))
+        self.assertTrue(any(p.running for p in parsed))
+        self.assertTrue(any(p.limit_reached for p in parsed))
+        self.assertTrue(any(p.too_old for p in parsed))
+        self.assertTrue(any(not p.show for p in parsed))
+
+    def test_relay_host_is_not_an_address(self):
+        line = playit_log_parser.parse_line(b"connecting relay=ord.at.ply.gg tunnel_addr: 209.25.140.1:5525")
+        self.assertEqual(line.address, "209.25.140.1:5525")
+
+    def test_blank_line(self):
+        self.assertIsNone(playit_log_parser.parse_line(b" \x1b[0m\t"))
+
+
+if __name__ == "__main__":
+    unittest.main()
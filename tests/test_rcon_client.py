@@ -0,0 +1,102 @@
+import socket
+import struct
+import threading
+import time
+import unittest
+
+import app.rcon_client as rcon_client
+
+PASSWORD = "secret"
+READ_BUFFER = 1460  # Vanilla reads each request into one buffer of this size
+
+
+def _packet(request_id, packet_type, body):
+    payload = struct.pack("<ii", request_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+
+class FakeVanillaRcon:
+    """
+    RCON server behaving like vanilla's: one recv() per request, the connection is
+    dropped when that read holds anything but exactly one packet, and long replies
+    are split over several packets.
+    """
+
+    def __init__(self, replies):
+        self.replies = replies  # command -> list of reply packet bodies
+        self.commands = []
+        self.dropped = False
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._server.close()
+
+    def _serve(self):
+        try:
+            conn, _ = self._server.accept()
+        except OSError:
+            return
+        with conn:
+            authenticated = False
+            while True:
+                time.sleep(0.05)  # Like a busy server thread: packets written back to back arrive in one read
+                data = conn.recv(READ_BUFFER)
+                if not data:
+                    return
+                (length,) = struct.unpack("<i", data[:4])
+                if len(data) != length + 4:
+                    self.dropped = True
+                    return
+                request_id, packet_type = struct.unpack("<ii", data[4:12])
+                body = data[12:-2].decode("utf-8")
+                if packet_type == rcon_client.PACKET_LOGIN:
+                    authenticated = body == PASSWORD
+                    conn.sendall(_packet(request_id if authenticated else -1, rcon_client.PACKET_AUTH_RESPONSE, ""))
+                elif not authenticated:
+                    return
+                elif packet_type == rcon_client.PACKET_COMMAND:
+                    self.commands.append(body)
+                    conn.sendall(b"".join(_packet(request_id, rcon_client.PACKET_RESPONSE, part)
+                                          for part in self.replies.get(body, [f"Unknown command: {body}"])))
+                else:
+                    conn.sendall(_packet(request_id, rcon_client.PACKET_RESPONSE, f"Unknown request {packet_type:x}"))
+
+
+class RconClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeVanillaRcon({
+            "list": ["There are 0 of a max of 20 players online: "],
+            "help": ["/advancement ...", "/ban ...", "/whitelist ..."],
+        })
+        self.client = rcon_client.RconClient("127.0.0.1", self.server.port, PASSWORD, timeout=2.0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test_single_reply(self):
+        self.assertEqual(self.client.command("list"), "There are 0 of a max of 20 players online: ")
+        self.assertFalse(self.server.dropped)
+
+    def test_multi_packet_reply_is_joined(self):
+        self.assertEqual(self.client.command("help"), "/advancement .../ban .../whitelist ...")
+        self.assertFalse(self.server.dropped)
+
+    def test_command_many_sends_one_packet_per_read(self):
+        replies = self.client.command_many(["help", "list", "help"])
+        self.assertEqual(replies, ["/advancement .../ban .../whitelist ...",
+                                   "There are 0 of a max of 20 players online: ",
+                                   "/advancement .../ban .../whitelist ..."])
+        self.assertEqual(self.server.commands, ["help", "list", "help"])
+        self.assertFalse(self.server.dropped)
+
+    def test_wrong_password(self):
+        self.client.password = "wrong"
+        with self.assertRaises(rcon_client.RconAuthError):
+            self.client.command("list")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+import json
+import socket
+import struct
+import threading
+import time
+import unittest
+from unittest import mock
+
+import app.server_list_ping as server_list_ping
+from app.app_config import AppConfig
+from app.tunnel_health import TunnelHealthMonitor
+
+STATUS = {"version": {"name": "1.21.1", "protocol": 767}, "players": {"online": 1, "max": 20}, "description": "A server"}
+
+
+def _read_packet(stream):
+    length = server_list_ping._read_varint(stream.read)
+    return stream.read(length)
+
+
+class FakeTunnel:
+    """
+    Local stand-in for the public end of a tunnel. With a server behind it, it speaks
+    the status protocol; without one it accepts the connection and closes it at once,
+    like the playit edge does when the agent can't reach the local server.
+    """
+
+    def __init__(self, server_up=True, reply_delay=0.0):
+        self.server_up = server_up
+        self.reply_delay = reply_delay
+        self.connections = 0
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._server.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn, conn.makefile("rb") as stream:
+            if not self.server_up:
+                return
+            try:
+                _read_packet(stream)  # Handshake
+                _read_packet(stream)  # Status request
+                time.sleep(self.reply_delay)
+                conn.sendall(server_list_ping._packet(0x00, server_list_ping._string(json.dumps(STATUS))))
+                ping = _read_packet(stream)
+                conn.sendall(server_list_ping._packet(0x01, ping[1:]))
+            except (OSError, server_list_ping.ServerListPingError):
+                pass
+
+
+class FakeAgent:
+    """PlayitManager stand-in: an address and counted restarts."""
+
+    def __init__(self, address):
+        self.running = True
+        self.current_address = address
+        self.tunnel_endpoint = None
+        self.stops = 0
+        self.starts = 0
+
+    def stop(self):
+        self.stops += 1
+
+    def start(self):
+        self.starts += 1
+
+
+def _unused_port():
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        return sock.getsockname()[1]
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@mock.patch.object(AppConfig, "TUNNEL_HEALTH_TIMEOUT", 1)
+@mock.patch.object(AppConfig, "TUNNEL_RESTART_BASE_DELAY", 0.05)
+@mock.patch("app.tunnel_health.logic.load_config", return_value={})
+class TunnelHealthMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.tunnel = None
+        self.monitor = None
+        self.log = []
+
+    def tearDown(self):
+        if self.monitor:
+            self.monitor.stop()
+        if self.tunnel:
+            self.tunnel.close()
+
+    def _monitor(self, agent, local_server_up=True, **kwargs):
+        self.monitor = TunnelHealthMonitor(agent, console_callback=self.log.append, interval=0.02,
+                                           failure_threshold=3, local_server_up=lambda: local_server_up, **kwargs)
+        return self.monitor
+
+    def test_success_and_rolling_stats(self, _config):
+        self.tunnel = FakeTunnel()
+        monitor = self._monitor(FakeAgent(f"127.0.0.1:{self.tunnel.port}"), window=3)
+        reports = []
+        monitor.health_callback = reports.append
+        monitor.start()
+        self.assertTrue(_wait_until(lambda: len(reports) >= 5))
+        monitor.stop()
+
+        stats = reports[-1]
+        self.assertEqual(stats["samples"], 3)
+        self.assertEqual(stats["success_rate"], 1.0)
+        self.assertEqual(stats["consecutive_failures"], 0)
+        self.assertIsNotNone(stats["avg_connect_ms"])
+        self.assertIsNotNone(stats["avg_ping_ms"])
+        self.assertTrue(stats["last"]["ok"])
+
+    def test_restart_after_failure_threshold(self, _config):
+        agent = FakeAgent(f"127.0.0.1:{_unused_port()}")
+        monitor = self._monitor(agent)
+        monitor.start()
+        self.assertTrue(_wait_until(lambda: agent.starts >= 1))
+        self.assertEqual(agent.stops, 1)
+        self.assertEqual(monitor.restart_attempts, 1)
+        failures = [line for line in self.log if "Tunnel probe to" in line]
+        self.assertTrue(failures[2].endswith("(3/3): " + monitor.samples[2]["error"]))
+
+    def test_no_restart_while_local_server_is_down(self, _config):
+        self.tunnel = FakeTunnel(server_up=False)
+        agent = FakeAgent(f"127.0.0.1:{self.tunnel.port}")
+        monitor = self._monitor(agent, local_server_up=False)
+        monitor.start()
+        self.assertTrue(_wait_until(lambda: self.tunnel.connections >= 6))
+        monitor.stop()
+
+        self.assertEqual(agent.stops, 0)
+        self.assertTrue(all(s["ok"] and s["ping_ms"] is None for s in monitor.samples))
+        self.assertIsNone(monitor.stats()["avg_ping_ms"])
+
+    def test_status_ping_failures_count_while_local_server_is_up(self, _config):
+        self.tunnel = FakeTunnel(server_up=False)
+        agent = FakeAgent(f"127.0.0.1:{self.tunnel.port}")
+        self._monitor(agent).start()
+        self.assertTrue(_wait_until(lambda: agent.stops >= 1))
+
+    def test_restart_while_probe_in_flight(self, _config):
+        self.tunnel = FakeTunnel(reply_delay=0.3)
+        monitor = self._monitor(FakeAgent(f"127.0.0.1:{self.tunnel.port}"))
+        monitor.start()
+        self.assertTrue(_wait_until(lambda: self.tunnel.connections >= 1))
+        monitor.stop()
+        monitor.start()  # The first thread is still waiting for its reply
+        self.assertTrue(_wait_until(lambda: len(monitor.samples) >= 2))
+
+    def test_port_unknown_pauses_probing(self, _config):
+        agent = FakeAgent("example-words.gl.joinmc.link")
+        monitor = self._monitor(agent)
+        with mock.patch("app.tunnel_health.resolve_srv", return_value=None) as resolve:
+            monitor.start()
+            self.assertTrue(_wait_until(lambda: resolve.call_count >= 3))
+            monitor.stop()
+        self.assertEqual(len(monitor.samples), 0)
+        self.assertEqual(sum("Tunnel port unknown" in line for line in self.log), 1)
+
+    def test_port_from_srv_record(self, _config):
+        self.tunnel = FakeTunnel()
+        monitor = self._monitor(FakeAgent("example-words.gl.joinmc.link"))
+        with mock.patch("app.tunnel_health.resolve_srv", return_value=("127.0.0.1", self.tunnel.port)) as resolve:
+            self.assertEqual(monitor.get_address(), ("127.0.0.1", self.tunnel.port))
+        resolve.assert_called_with("example-words.gl.joinmc.link", timeout=AppConfig.TUNNEL_HEALTH_TIMEOUT)
+
+    def test_tunnel_endpoint_when_srv_fails(self, _config):
+        agent = FakeAgent("example-words.gl.joinmc.link")
+        agent.tunnel_endpoint = "209.25.140.1:5525"
+        monitor = self._monitor(agent)
+        with mock.patch("app.tunnel_health.resolve_srv", return_value=None):
+            self.assertEqual(monitor.get_address(), ("209.25.140.1", 5525))
+
+
+class FakeNameserver:
+    """UDP DNS stand-in answering every query with one SRV record."""
+
+    def __init__(self, target, port):
+        self.target = target
+        self.srv_port = port
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._sock.close()
+
+    def _serve(self):
+        try:
+            query, client = self._sock.recvfrom(512)
+        except OSError:
+            return
+        question = query[12:]
+        target = b"".join(bytes([len(label)]) + label.encode() for label in self.target.split(".")) + b"\x00"
+        rdata = struct.pack(">HHH", 10, 5, self.srv_port) + target
+        answer = b"\xc0\x0c" + struct.pack(">HHIH", server_list_ping.DNS_TYPE_SRV, 1, 60, len(rdata)) + rdata
+        header = struct.pack(">HHHHHH", struct.unpack(">H", query[:2])[0], 0x8180, 1, 1, 0, 0)
+        self._sock.sendto(header + question + answer, client)
+
+
+class ResolveSrvTest(unittest.TestCase):
+    def test_srv_record(self):
+        nameserver = FakeNameserver("relay.example.net", 31337)
+        try:
+            with mock.patch.object(server_list_ping, "DNS_PORT", nameserver.port), \
+                    mock.patch.object(server_list_ping, "_nameservers", return_value=["127.0.0.1"]):
+                self.assertEqual(server_list_ping.resolve_srv("example-words.gl.joinmc.link", timeout=2.0),
+                                 ("relay.example.net", 31337))
+        finally:
+            nameserver.close()
+
+    def test_no_nameserver(self):
+        with mock.patch.object(server_list_ping, "_nameservers", return_value=[]):
+            self.assertIsNone(server_list_ping.resolve_srv("example-words.gl.joinmc.link"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import app.world_analyzer as world_analyzer
+from app.app_config import AppConfig
+
+SECTOR = world_analyzer.SECTOR_BYTES
+
+
+def _write_region(path, chunks, extra_sectors=0, bad_entry=False):
+    """Writes a region file whose first `chunks` chunks take one sector each."""
+    locations = [0] * 1024
+    stamps = [0] * 1024
+    for i in range(chunks):
+        locations[i] = ((2 + i) << 8) | 1
+        stamps[i] = 1_700_000_000 + i * 60
+    if bad_entry:
+        locations[1023] = (2 << 8) | 200  # Small offset, sector count past the end of the file
+    header = struct.pack(">1024I", *locations) + struct.pack(">1024I", *stamps)
+    with open(path, "wb") as f:
+        f.write(header + b"\x00" * SECTOR * (chunks + extra_sectors))
+
+
+class AnalyzeWorldTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.world = os.path.join(self._tmp.name, "world")
+        layout = {
+            os.path.join(self.world, "region"): [(0, 0, 12), (-1, 0, 3), (0, -1, 0), (1, 1, 40)],
+            os.path.join(self.world, "entities"): [(0, 0, 2)],
+            os.path.join(self.world, "DIM-1", "region"): [(0, 0, 5), (-2, -3, 1)],
+            os.path.join(f"{self.world}_the_end", "DIM1", "region"): [(0, 0, 7)],
+        }
+        for folder, regions in layout.items():
+            os.makedirs(folder)
+            for x, z, chunks in regions:
+                _write_region(os.path.join(folder, f"r.{x}.{z}.mca"), chunks, extra_sectors=x % 2, bad_entry=z < 0)
+        open(os.path.join(self.world, "region", "r.5.5.mca"), "wb").close()  # Empty file
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _analyze(self, pool_min_files):
+        with mock.patch.object(world_analyzer, "get_world_dir", return_value=self.world), \
+                mock.patch.object(AppConfig, "WORLD_ANALYZER_POOL_MIN_FILES", pool_min_files), \
+                mock.patch.object(AppConfig, "WORLD_ANALYZER_BATCH", 3):
+            return world_analyzer.analyze_world("test", max_workers=2)
+
+    def test_pool_matches_inline(self):
+        inline = self._analyze(pool_min_files=1_000_000)
+        pooled = self._analyze(pool_min_files=1)
+        self.assertEqual(len(inline.regions), 9)
+        self.assertEqual(sorted(pooled.regions, key=lambda r: r.path), sorted(inline.regions, key=lambda r: r.path))
+
+    def test_region_stats(self):
+        regions = {(r.dimension, r.kind, r.x, r.z): r for r in self._analyze(pool_min_files=1_000_000).regions}
+        full = regions[("overworld", "region", 1, 1)]
+        self.assertEqual((full.chunks, full.used_sectors, full.file_sectors, full.invalid), (40, 42, 43, 0))
+        self.assertEqual((full.oldest, full.newest), (1_700_000_000, 1_700_000_000 + 39 * 60))
+        self.assertEqual(regions[("overworld", "region", 0, -1)].invalid, 1)
+        self.assertEqual(regions[("overworld", "region", 5, 5)].file_bytes, 0)
+        self.assertIn(("the_nether", "region", -2, -3), regions)
+        self.assertIn(("the_end", "region", 0, 0), regions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for ServerEventEmitter.emit().
+
+Emits PLAYER_COUNT to four listeners (two taking the payload, two taking
+nothing) through the current emitter and through the pre-rewrite one, which
+called inspect.signature() for every listener on every event.
+
+Run from the project root:
+    python -m tools.bench_event_emitter [emits]
+"""
+import inspect
+import platform
+import sys
+import time
+
+from app.server_events import ServerEvent, ServerEventEmitter
+
+
+class LegacyEmitter:
+    """The emitter before listeners were wrapped on registration."""
+
+    def __init__(self):
+        self._listeners = {}
+
+    def on(self, event, callback):
+        self._listeners.setdefault(event, []).append(callback)
+
+    def emit(self, event, data=None):
+        if event in self._listeners:
+            for callback in self._listeners[event]:
+                try:
+                    sig = inspect.signature(callback)
+                    if len(sig.parameters) > 0:
+                        callback(data)
+                    else:
+                        callback()
+                except Exception as e:
+                    print(f"[Error] Event callback failed for {event}: {e}")
+
+
+def _register(emitter):
+    counts = []
+    emitter.on(ServerEvent.PLAYER_COUNT, lambda count: counts.append(count))
+    emitter.on(ServerEvent.PLAYER_COUNT, lambda count: None)
+    emitter.on(ServerEvent.PLAYER_COUNT, lambda: None)
+    emitter.on(ServerEvent.PLAYER_COUNT, lambda: None)
+    return counts
+
+
+def bench(emitter, emits):
+    """Returns events per second for `emits` PLAYER_COUNT emits."""
+    counts = _register(emitter)
+    start = time.perf_counter()
+    for i in range(emits):
+        emitter.emit(ServerEvent.PLAYER_COUNT, i)
+    elapsed = time.perf_counter() - start
+    assert len(counts) == emits
+    return emits / elapsed
+
+
+def main():
+    emits = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{emits:,} PLAYER_COUNT emits, 4 listeners, {platform.python_implementation()} {platform.python_version()}")
+    print(f"  before: {bench(LegacyEmitter(), emits):>12,.0f} events/s")
+    print(f"  after:  {bench(ServerEventEmitter(), emits):>12,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
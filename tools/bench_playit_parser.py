@@ -0,0 +1,66 @@
+"""
+Per-line cost of parsing playit agent output.
+
+Runs every line of the agent log corpus (tests/data/playit_agent.log) through the
+current single-pass parse_line and through the old per-line parser, which ran
+an ANSI substitution, a spam scan and up to four regex searches per line.
+
+Run from the project root:
+    python -m tools.bench_playit_parser [passes]
+"""
+import platform
+import re
+import sys
+import time
+from pathlib import Path
+
+from app.playit_log_parser import SPAM_LOGS, parse_line
+from app.playit_manager import PlayitManager
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "data" / "playit_agent.log"
+
+
+def legacy_parse(raw):
+    """The old _handle_line + _parse_line, minus the callbacks. Returns what they reacted to."""
+    line = raw.decode('utf-8', errors='replace').strip()
+    if not line:
+        return None
+    clean_line = re.sub(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])', '', line)
+    show = not any(s in clean_line for s in SPAM_LOGS) or "ERROR" in clean_line
+
+    claim_match = re.search(r"(https://playit\.gg/claim/[a-zA-Z0-9]+)", clean_line)
+    domain_match = re.search(r"([a-z0-9-.]+\.(?:ply|playit)\.gg|[a-z0-9-.]+\.joinmc\.link)", clean_line)
+    if domain_match and "at.ply.gg" not in domain_match.group(1):
+        return clean_line, show, claim_match, domain_match
+    ip_match = re.search(r"tunnel_addr:\s*([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+:[0-9]+)", clean_line)
+    if ip_match:
+        return clean_line, show, claim_match, ip_match
+    if "tunnel running" in clean_line:
+        return clean_line, show, claim_match, "running"
+    if "AgentDisabledOverLimit" in clean_line or "Account limit reached" in clean_line:
+        return clean_line, show, claim_match, "limit"
+    if "AgentVersionTooOld" in clean_line:
+        return clean_line, show, claim_match, "too_old"
+    return clean_line, show, claim_match, None
+
+
+def bench(parse, lines, passes):
+    """Returns microseconds per line."""
+    start = time.perf_counter()
+    for _ in range(passes):
+        for raw in lines:
+            parse(raw)
+    return (time.perf_counter() - start) / (passes * len(lines)) * 1_000_000
+
+
+def main():
+    passes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    lines = PlayitManager.LINE_SPLIT.split(CORPUS.read_bytes())
+    print(f"{len(lines)} corpus lines x {passes:,} passes, "
+          f"{platform.python_implementation()} {platform.python_version()}")
+    print(f"  before: {bench(legacy_parse, lines, passes):5.2f} us/line")
+    print(f"  after:  {bench(parse_line, lines, passes):5.2f} us/line")
+
+
+if __name__ == "__main__":
+    main()
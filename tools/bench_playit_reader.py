@@ -0,0 +1,100 @@
+"""
+Throughput benchmark for PlayitManager._read_output().
+
+Replays the agent log corpus (tests/data/playit_agent.log: ANSI-coloured lines,
+mixed \\n and \\r\\n endings, spam and ERROR lines), repeated up to the requested size,
+through a child process's stdout and reads it with the current chunked reader
+and with the old byte-at-a-time reader. Both hand every line to the same
+_handle_line, so only the read loop differs. tools/bench_playit_parser.py
+measures the parsing on the same corpus.
+
+Run from the project root:
+    python -m tools.bench_playit_reader [megabytes]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.playit_manager import PlayitManager
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "data" / "playit_agent.log"
+
+
+def write_log(path, megabytes):
+    """Writes the corpus to path, repeated until it holds about `megabytes` MB."""
+    corpus = CORPUS.read_bytes()
+    if not corpus.endswith(b"\n"):
+        corpus += b"\n"  # Keep the last line from running into the next copy
+    copies = max(1, round(megabytes * 1_000_000 / len(corpus)))
+    with open(path, "wb") as f:
+        for _ in range(copies):
+            f.write(corpus)
+    return copies * len(corpus)
+
+
+class BenchManager(PlayitManager):
+    def __init__(self):
+        self.console_lines = 0
+        super().__init__(console_callback=self._count, status_callback=lambda status, address: None,
+                         claim_callback=lambda url: None)
+
+    def _count(self, text):
+        if text.startswith("[Playit] "):
+            self.console_lines += 1
+
+
+class LegacyReader(BenchManager):
+    """The read loop before chunked reads: one read(1) per byte."""
+
+    def _read_output(self):
+        try:
+            buffer = bytearray()
+            while self.running and self.process:
+                byte = self.process.stdout.read(1)
+                if not byte:
+                    break
+                if byte == b'\n' or byte == b'\r':
+                    if buffer:
+                        self._handle_line(bytes(buffer))
+                        buffer = bytearray()
+                else:
+                    buffer.extend(byte)
+        finally:
+            self.running = False
+            self.process = None
+            self.current_address = None
+            self.status_callback("Offline", None)
+            self.console_callback("[Playit] Agent process exited.")
+
+
+def bench(manager, path, size):
+    """Returns (MB/s, reader CPU seconds, console lines) for one pass over the log."""
+    # A child process that copies the log to its stdout, like `cat` but portable
+    copy = "import shutil, sys; shutil.copyfileobj(open(sys.argv[1], 'rb'), sys.stdout.buffer)"
+    manager.process = subprocess.Popen([sys.executable, "-c", copy, path], stdout=subprocess.PIPE)
+    manager.running = True
+    process = manager.process
+    start, cpu_start = time.perf_counter(), time.thread_time()
+    manager._read_output()
+    cpu = time.thread_time() - cpu_start
+    elapsed = time.perf_counter() - start
+    process.wait()
+    return size / elapsed / 1_000_000, cpu, manager.console_lines
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "agent.log")
+        size = write_log(path, megabytes)
+        print(f"{size / 1_000_000:.1f} MB agent log")
+        for label, manager in (("before", LegacyReader()), ("after ", BenchManager())):
+            rate, cpu, lines = bench(manager, path, size)
+            print(f"  {label}: {rate:5.2f} MB/s, {cpu:6.2f} s reader CPU   ({lines:,} console lines)")
+
+
+if __name__ == "__main__":
+    main()